@@ -0,0 +1,415 @@
+"""
+Throughput benchmarks for clio's hot paths.
+
+Drives ``get_input``, ``write_output`` and a trivial ``command_with_io`` command
+across the Source x TypeName x OutputDest matrix and records MB/s, per-call
+latency and peak RSS for each case. Every case runs in a fresh interpreter so
+peak RSS is attributable to that case alone.
+
+    python benchmarks/bench_io.py run --sizes 1KB,1MB,64MB --output bench.json
+    python benchmarks/bench_io.py compare old.json new.json --threshold 10
+
+Clipboard and signal sources are not benchmarked: both are latency-bound and
+need a display or a second process.
+"""
+
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import click
+
+from clio.__version__ import __version__
+from clio.click_utils import command_with_io
+from clio.input import Source, TypeName, get_input
+from clio.output import OutputDest, write_output
+
+# env values and argv entries are limited by the kernel (MAX_ARG_STRLEN)
+INLINE_LIMIT = 64 * 1024
+BLOCK = 1 << 20
+_UNITS = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+_TEXT = "2025-01-01T00:00:00 INFO clio benchmark payload line with some text"
+_LINE = f"{_TEXT} \u2713\n".encode()
+
+INPUT_SOURCES = (Source.FILE, Source.PIPE, Source.ENV, Source.ARG)
+INLINE_SOURCES = {Source.ENV, Source.ARG}
+OUTPUT_DATA = ("str", "bytes", "path", "bufferedio", "chunks")
+OUTPUT_DESTS = (OutputDest.FILE, OutputDest.PIPE, OutputDest.ENV)
+COMMAND_TYPES = (TypeName.STR, TypeName.BYTES, TypeName.CHUNKS)
+
+
+@dataclass(frozen=True)
+class Case:
+    kind: str  # "input", "output" or "command"
+    size: int
+    source: str = ""
+    as_type: str = ""
+    dest: str = ""
+
+    @property
+    def case_id(self) -> str:
+        size = _format_size(self.size)
+        parts = [self.kind, self.source, self.as_type, self.dest, size]
+        return "/".join(p for p in parts if p)
+
+
+def _parse_size(text: str) -> int:
+    match = re.fullmatch(r"\s*(\d+)\s*([KMG]?B)\s*", text.upper())
+    if not match:
+        msg = f"Invalid size: {text!r} (use e.g. 1KB, 64MB, 2GB)"
+        raise click.BadParameter(msg)
+    return int(match[1]) * _UNITS[match[2]]
+
+
+def _format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def _is_inline(case: Case) -> bool:
+    is_text = case.as_type in {TypeName.STR, TypeName.BYTES}
+    return case.source in INLINE_SOURCES and is_text
+
+
+def build_matrix(sizes: list[int]) -> list[Case]:
+    cases: list[Case] = []
+    for size in sizes:
+        for source in INPUT_SOURCES:
+            # STREAM input only exists for async functions, which the input cases
+            # do not run
+            for as_type in (t for t in TypeName if t != TypeName.STREAM):
+                case = Case("input", size, source=source, as_type=as_type)
+                if _is_inline(case) and size > INLINE_LIMIT:
+                    continue
+                is_streamed = as_type in {TypeName.LINES, TypeName.CHUNKS}
+                if source in INLINE_SOURCES and is_streamed:
+                    continue
+                cases.append(case)
+        for data in OUTPUT_DATA:
+            for dest in OUTPUT_DESTS:
+                if dest is OutputDest.ENV and size > INLINE_LIMIT:
+                    continue
+                cases.append(Case("output", size, as_type=data, dest=dest))
+        cases.extend(
+            Case("command", size, source=src, as_type=as_type)
+            for as_type in COMMAND_TYPES
+            for src in (Source.PIPE, Source.FILE)
+        )
+    return cases
+
+
+def write_payload(path: Path, size: int) -> None:
+    block = (_LINE * (BLOCK // len(_LINE) + 1))[:BLOCK]
+    with path.open("wb") as f:
+        remaining = size
+        while remaining > 0:
+            _ = f.write(block[: min(remaining, BLOCK)])
+            remaining -= BLOCK
+    # Keep the payload valid UTF-8 even when a block boundary splits a character
+    with path.open("r+b") as f:
+        _ = f.seek(max(size - 4, 0))
+        tail = f.read()
+        _ = f.seek(max(size - 4, 0))
+        _ = f.write(b"." * len(tail))
+
+
+# ----------------------------------------------------------------- child side
+
+
+def _rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _feed_stdin(payload: Path) -> threading.Thread:
+    """Replace fd 0 with a fresh pipe fed from *payload* by a background thread."""
+    read_fd, write_fd = os.pipe()
+
+    def pump() -> None:
+        with payload.open("rb") as src, os.fdopen(write_fd, "wb") as dst:
+            while block := src.read(BLOCK):
+                _ = dst.write(block)
+
+    thread = threading.Thread(target=pump, daemon=True)
+    thread.start()
+    os.dup2(read_fd, 0)
+    os.close(read_fd)
+    sys.stdin = open(0, encoding="utf-8", closefd=False)  # noqa: PTH123, SIM115
+    return thread
+
+
+def _consume(data: Any) -> None:  # noqa: ANN401
+    if isinstance(data, memoryview):
+        if len(data):
+            _ = data.obj.find(b"\0")  # pyright:ignore[reportAttributeAccessIssue]
+    elif hasattr(data, "read"):
+        while data.read(BLOCK):
+            pass
+        data.close()
+    elif isinstance(data, Iterator):
+        for _ in data:
+            pass
+
+
+def _chunks(payload: Path) -> Iterator[bytes]:
+    with payload.open("rb") as f:
+        while chunk := f.read(BLOCK):
+            yield chunk
+
+
+def _output_data(kind: str, payload: Path) -> Any:  # noqa: ANN401
+    match kind:
+        case "str":
+            return payload.read_text(encoding="utf-8")
+        case "bytes":
+            return payload.read_bytes()
+        case "path":
+            return payload
+        case "bufferedio":
+            return payload.open("rb")
+        case _:
+            return _chunks(payload)
+
+
+@command_with_io
+def _identity(data: Any) -> Any:  # noqa: ANN401
+    return data
+
+
+def _run_once(case: Case, payload: Path, scratch: Path) -> float:
+    """Run one call of *case* and return its wall time in seconds."""
+    feeder = None
+    if case.source == Source.PIPE:
+        feeder = _feed_stdin(payload)
+    name: str | None = str(payload)
+    if _is_inline(case):
+        value = payload.read_text(encoding="utf-8")
+        os.environ["CLIO_BENCH"] = value
+        sys.argv = ["bench", value]
+    elif case.source in INLINE_SOURCES:
+        os.environ["CLIO_BENCH"] = str(payload)
+        sys.argv = ["bench", str(payload)]
+    if case.source == Source.ENV:
+        name = "CLIO_BENCH"
+    elif case.source == Source.ARG:
+        name = "1"
+
+    out = scratch / "out.bin"
+    out.unlink(missing_ok=True)
+    match case.kind:
+        case "input":
+            start = time.perf_counter()
+            as_type = TypeName(case.as_type)
+            _consume(get_input(Source(case.source), name=name, as_type=as_type))
+        case "output":
+            data = _output_data(case.as_type, payload)
+            target = "CLIO_BENCH_OUT" if case.dest == "env" else str(out)
+            start = time.perf_counter()
+            write_output(data, dest=OutputDest(case.dest), name=target)
+            sys.stdout.flush()
+        case _:
+            args = ["--input-source", case.source, "--input-type", case.as_type]
+            if case.source == Source.FILE:
+                args += ["--input-name", str(payload)]
+                args += ["--output-dest", "file", "--output-name", str(out)]
+            start = time.perf_counter()
+            _identity.main(args, standalone_mode=False)
+            sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    if feeder is not None:
+        feeder.join()
+    return elapsed
+
+
+@dataclass
+class Result:
+    case_id: str
+    kind: str
+    source: str
+    as_type: str
+    dest: str
+    size: int
+    repeat: int
+    latency_s: float
+    latency_min_s: float
+    mb_per_s: float
+    peak_rss: int
+    rss_delta: int
+
+
+def _run_case(case: Case, payload: Path, repeat: int) -> Result:
+    baseline = _rss_bytes()
+    with tempfile.TemporaryDirectory(prefix="clio-bench-") as scratch:
+        timings = [_run_once(case, payload, Path(scratch)) for _ in range(repeat)]
+    latency = statistics.median(timings)
+    peak = _rss_bytes()
+    return Result(
+        case_id=case.case_id,
+        kind=case.kind,
+        source=case.source,
+        as_type=case.as_type,
+        dest=case.dest,
+        size=case.size,
+        repeat=repeat,
+        latency_s=latency,
+        latency_min_s=min(timings),
+        mb_per_s=case.size / _UNITS["MB"] / latency if latency else 0.0,
+        peak_rss=peak,
+        rss_delta=peak - baseline,
+    )
+
+
+# ---------------------------------------------------------------- parent side
+
+
+def _spawn_case(case: Case, payload: Path, repeat: int) -> dict[str, Any]:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        result_path = Path(tmp.name)
+    try:
+        spec = json.dumps(asdict(case))
+        argv = [sys.executable, __file__, "_case", spec, str(payload)]
+        argv += [str(result_path), str(repeat)]
+        proc = subprocess.Popen(argv, stdout=subprocess.PIPE)  # noqa: S603
+        # Drain stdout as a real pipe consumer would, without holding it in memory
+        assert proc.stdout is not None
+        while proc.stdout.read(BLOCK):
+            pass
+        if proc.wait() != 0:
+            return {"case_id": case.case_id, "error": f"exit code {proc.returncode}"}
+        return json.loads(result_path.read_text())
+    finally:
+        result_path.unlink(missing_ok=True)
+
+
+def _format_result(case: Case, result: dict[str, Any]) -> str:
+    speed = f"{result['mb_per_s']:>10.1f} MB/s"
+    latency = f"{result['latency_s'] * 1e3:>10.3f} ms"
+    rss = f"{result['rss_delta'] / _UNITS['MB']:>8.1f} MB RSS"
+    return f"{case.case_id:<48} {speed} {latency} {rss}"
+
+
+def _load_results(path: str) -> dict[str, dict[str, Any]]:
+    results = json.loads(Path(path).read_text())["results"]
+    return {r["case_id"]: r for r in results if "error" not in r}
+
+
+def _growth(before: float, after: float) -> float:
+    return (after / before - 1) * 100 if before > 0 else 0.0
+
+
+@click.group()
+def cli() -> None:
+    """Benchmark clio input/output paths."""
+
+
+@cli.command()
+@click.option(
+    "--sizes",
+    default="1KB,1MB,64MB",
+    show_default=True,
+    help="Comma-separated payload sizes.",
+)
+@click.option(
+    "--repeat",
+    default=3,
+    show_default=True,
+    help="Calls per case; latency is the median.",
+)
+@click.option(
+    "--filter",
+    "pattern",
+    default="",
+    help="Only run cases whose id contains this text.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="JSON results file.",
+)
+def run(sizes: str, repeat: int, pattern: str, output: str | None) -> None:
+    """Run the benchmark matrix and save results as JSON."""
+    size_list = [_parse_size(s) for s in sizes.split(",")]
+    cases = [c for c in build_matrix(size_list) if pattern in c.case_id]
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="clio-payload-") as tmp:
+        for size in size_list:
+            payload = Path(tmp) / f"payload-{size}.txt"
+            write_payload(payload, size)
+            for case in (c for c in cases if c.size == size):
+                result = _spawn_case(case, payload, repeat)
+                results.append(result)
+                if "error" in result:
+                    error = result["error"]
+                    click.echo(f"{case.case_id:<48} FAILED ({error})", err=True)
+                else:
+                    click.echo(_format_result(case, result), err=True)
+            payload.unlink()
+
+    report = {
+        "clio_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": repeat,
+        "results": results,
+    }
+    path = Path(output or f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    _ = path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    click.echo(f"Wrote {len(results)} results to {path}", err=True)
+
+
+@cli.command()
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("current", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threshold",
+    default=10.0,
+    show_default=True,
+    help="Percent slowdown or RSS growth to flag.",
+)
+def compare(baseline: str, current: str, threshold: float) -> None:
+    """Compare two result files and exit non-zero on regressions."""
+    old = _load_results(baseline)
+    new = _load_results(current)
+    regressions = 0
+    for case_id in sorted(old.keys() & new.keys()):
+        before, after = old[case_id], new[case_id]
+        speed = _growth(before["latency_s"], after["latency_s"])
+        rss = _growth(before["rss_delta"], after["rss_delta"])
+        flagged = speed > threshold or rss > threshold
+        regressions += flagged
+        mark = "!!" if flagged else "  "
+        changes = f"latency {speed:+7.1f}%  rss {rss:+7.1f}%"
+        click.echo(f"{mark} {case_id:<48} {changes}")
+    if regressions:
+        msg = f"{regressions} case(s) regressed by more than {threshold}%"
+        raise click.ClickException(msg)
+
+
+@cli.command("_case", hidden=True)
+@click.argument("spec")
+@click.argument("payload", type=click.Path(exists=True, dir_okay=False))
+@click.argument("result_path", type=click.Path(dir_okay=False))
+@click.argument("repeat", type=int)
+def run_case(spec: str, payload: str, result_path: str, repeat: int) -> None:
+    result = _run_case(Case(**json.loads(spec)), Path(payload), repeat)
+    _ = Path(result_path).write_text(json.dumps(asdict(result)), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    cli()
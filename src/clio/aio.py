@@ -0,0 +1,292 @@
+import asyncio
+import contextlib
+import os
+import stat
+import sys
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import AbstractContextManager
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Protocol, Unpack, cast
+
+from .compression import Compression, infer_compression
+from .input import InputData, Source, TypeName, get_input
+from .output import (
+    OutputData,
+    OutputDest,
+    WriteOptions,
+    resolve_output_path,
+    write_output,
+)
+from .utils import CHUNK_SIZE, no_phase
+
+if TYPE_CHECKING:
+    from .metrics import Metrics
+
+__all__ = (
+    "AsyncWriter",
+    "get_input_async",
+    "open_stdin_reader",
+    "open_stdout_writer",
+    "run_async",
+    "write_output_async",
+)
+
+type AsyncData = OutputData | AsyncIterable[str] | AsyncIterable[bytes]
+
+
+# Strong references to feeder tasks; the event loop only keeps weak ones
+_feeders: set[asyncio.Task[None]] = set()
+
+
+class AsyncWriter(Protocol):
+    """The subset of `asyncio.StreamWriter` that clio writes output through."""
+
+    def write(self, data: bytes) -> None: ...
+    async def drain(self) -> None: ...
+    def close(self) -> None: ...
+    async def wait_closed(self) -> None: ...
+
+
+def _pollable(fd: int) -> bool:
+    # Event loops can watch pipes, sockets and ttys, but not regular files
+    mode = os.fstat(fd).st_mode
+    return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode) or stat.S_ISCHR(mode)
+
+
+def _fileno(stream: object) -> int | None:
+    fileno = cast("Callable[[], int] | None", getattr(stream, "fileno", None))
+    if fileno is None:
+        return None
+    try:
+        return fileno()
+    except (OSError, ValueError):
+        return None
+
+
+def _restore_blocking(*streams: object) -> None:
+    # Transports switch the shared file description to O_NONBLOCK; undo that for
+    # whatever inherits the descriptor after us (usually the shell)
+    for stream in streams:
+        fd = _fileno(stream)
+        if fd is not None:
+            with contextlib.suppress(OSError):
+                os.set_blocking(fd, True)
+
+
+def _feed(reader: asyncio.StreamReader, stream: BinaryIO, *, close: bool) -> None:
+    """Pump a blocking binary stream into *reader* from a worker thread."""
+    read = getattr(stream, "read1", stream.read)
+
+    async def pump() -> None:
+        try:
+            while chunk := await asyncio.to_thread(read, CHUNK_SIZE):
+                reader.feed_data(chunk)
+            reader.feed_eof()
+        except Exception as err:  # noqa: BLE001 # surfaced to whoever awaits the reader
+            reader.set_exception(err)
+        finally:
+            if close:
+                stream.close()
+
+    task = asyncio.get_running_loop().create_task(pump())
+    _feeders.add(task)
+    task.add_done_callback(_feeders.discard)
+
+
+async def open_stdin_reader() -> asyncio.StreamReader:
+    """Expose stdin as an `asyncio.StreamReader`."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    fd = _fileno(sys.stdin)
+    if fd is not None and _pollable(fd):
+        # A dup keeps fd 0 open when the transport closes its end
+        pipe = os.fdopen(os.dup(fd), "rb", buffering=0)
+        protocol = asyncio.StreamReaderProtocol(reader)
+        _ = await loop.connect_read_pipe(lambda: protocol, pipe)
+        return reader
+    buffer = cast("BinaryIO", getattr(sys.stdin, "buffer", None) or sys.stdin)
+    _feed(reader, buffer, close=False)
+    return reader
+
+
+async def _open_reader(source: Source, name: str | None) -> asyncio.StreamReader:
+    if source == Source.PIPE:
+        return await open_stdin_reader()
+    reader = asyncio.StreamReader()
+    if source == Source.FILE and name is not None:
+        # The feeder closes the file once it is drained
+        _feed(reader, Path(name).open("rb"), close=True)  # noqa: SIM115
+    elif source in {Source.ENV, Source.ARG}:
+        path = get_input(source, name=name, as_type=TypeName.STR)
+        _feed(reader, Path(str(path)).open("rb"), close=True)  # noqa: SIM115
+    elif source in {Source.CLIPBOARD, Source.SIGNAL}:
+        # Both arrive as a single in-memory value
+        value = get_input(source, name=name, as_type=TypeName.BYTES)
+        reader.feed_data(cast("bytes", value))
+        reader.feed_eof()
+    else:
+        msg = f"Unsupported source for stream: {source}"
+        raise ValueError(msg)
+    return reader
+
+
+async def get_input_async(
+    source: Source,
+    *,
+    name: str | None = None,
+    as_type: TypeName = TypeName.STR,
+    compression: Compression = Compression.NONE,
+) -> InputData | asyncio.StreamReader:
+    """Like `get_input`, but `TypeName.STREAM` yields an `asyncio.StreamReader`."""
+    if as_type == TypeName.STREAM:
+        if compression != Compression.NONE:
+            msg = "Compressed input is not supported for the stream input type"
+            raise ValueError(msg)
+        return await _open_reader(source, name)
+    return get_input(source, name=name, as_type=as_type, compression=compression)
+
+
+class _BlockingWriter:
+    """Fallback for stdout that an event loop cannot watch (files, test doubles)."""
+
+    def __init__(self) -> None:
+        self._buffer: BinaryIO | None = getattr(sys.stdout, "buffer", None)
+
+    def write(self, data: bytes) -> None:
+        if self._buffer is not None:
+            _ = self._buffer.write(data)
+            return
+        _ = sys.stdout.write(data.decode("utf-8"))
+
+    async def drain(self) -> None:
+        if self._buffer is not None:
+            self._buffer.flush()
+
+    def close(self) -> None:
+        _ = sys.stdout.flush()
+
+    async def wait_closed(self) -> None:
+        return None
+
+
+async def open_stdout_writer() -> AsyncWriter:
+    """Expose stdout as an `asyncio.StreamWriter` (or a blocking stand-in)."""
+    _ = sys.stdout.flush()
+    fd = _fileno(sys.stdout)
+    if fd is None or not _pollable(fd):
+        return _BlockingWriter()
+    loop = asyncio.get_running_loop()
+    pipe = os.fdopen(os.dup(fd), "wb", buffering=0)
+    # StreamReaderProtocol supplies the flow control and close waiter that
+    # StreamWriter relies on
+    protocol = asyncio.StreamReaderProtocol(asyncio.StreamReader())
+    transport, _ = await loop.connect_write_pipe(lambda: protocol, pipe)
+    return asyncio.StreamWriter(transport, protocol, None, loop)
+
+
+async def _drain_to_writer(
+    data: AsyncIterable[str | bytes],
+    writer: AsyncWriter,
+    encoding: str,
+) -> None:
+    try:
+        async for piece in data:
+            writer.write(piece.encode(encoding) if isinstance(piece, str) else piece)
+            await writer.drain()
+    finally:
+        writer.close()
+        with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+            await writer.wait_closed()
+
+
+async def _next_piece(iterator: AsyncIterator[str | bytes]) -> str | bytes:
+    return await anext(iterator)
+
+
+def _pull(
+    pieces: AsyncIterable[str | bytes],
+    loop: asyncio.AbstractEventLoop,
+    encoding: str,
+) -> Iterator[bytes]:
+    """Iterate *pieces*, encoded, from a worker thread while the loop produces them."""
+    iterator = aiter(pieces)
+    while True:
+        future = asyncio.run_coroutine_threadsafe(_next_piece(iterator), loop)
+        try:
+            piece = future.result()
+        except StopAsyncIteration:
+            return
+        yield piece.encode(encoding) if isinstance(piece, str) else piece
+
+
+async def write_output_async(
+    data: AsyncData,
+    *,
+    dest: OutputDest,
+    name: str | None = None,
+    **options: Unpack[WriteOptions],
+) -> None:
+    """Like `write_output`, but also drains async iterables without blocking."""
+    if not isinstance(data, AsyncIterable):
+        write_output(data, dest=dest, name=name, **options)
+        return
+    pieces: AsyncIterable[str | bytes] = data
+    encoding = options.get("encoding", "utf-8")
+    compression = options.get("compression", Compression.NONE)
+    if compression == Compression.AUTO:
+        compression = infer_compression(name if dest == OutputDest.FILE else None)
+    to_stdout = dest == OutputDest.PIPE or (dest == OutputDest.FILE and name == "-")
+    if compression == Compression.NONE and to_stdout:
+        await _drain_to_writer(pieces, await open_stdout_writer(), encoding)
+        return
+    # Compressors and atomic file writes block, so the synchronous writer runs in a
+    # worker thread and pulls one piece at a time from the loop
+    blocks = _pull(pieces, asyncio.get_running_loop(), encoding)
+    await asyncio.to_thread(write_output, blocks, dest=dest, name=name, **options)
+
+
+async def run_async(  # noqa: PLR0913
+    func: Callable[..., Awaitable[AsyncData]] | Callable[..., AsyncData],
+    *,
+    source: Source,
+    name: str | None,
+    as_type: TypeName,
+    dest: OutputDest,
+    output_name: str | None,
+    force: bool = False,
+    input_compression: Compression = Compression.NONE,
+    metrics: "Metrics | None" = None,
+    phase: Callable[[str], AbstractContextManager[None]] | None = None,
+    **options: Unpack[WriteOptions],
+) -> None:
+    """
+    Read input, await *func* and write its result, all on the running event loop.
+
+    The read, call and write steps run inside ``phase(name)`` when given, or are
+    timed into *metrics*; *metrics* also counts the bytes in and out.
+    """
+    if phase is None:
+        phase = no_phase if metrics is None else metrics.phase
+    if dest == OutputDest.FILE and output_name not in {None, "-"}:
+        # Checked before the input is consumed, as in the synchronous path
+        output_name = str(resolve_output_path(output_name, force=force))
+    try:
+        with phase("read"):
+            data = await get_input_async(
+                source,
+                name=name,
+                as_type=as_type,
+                compression=input_compression,
+            )
+        if metrics is not None:
+            data = metrics.count_in(data)
+        with phase("call"):
+            result = func(data)
+            if isinstance(result, Awaitable):
+                result = await result
+        if metrics is not None:
+            result = metrics.count_out(result)
+        with phase("write"):
+            await write_output_async(result, dest=dest, name=output_name, **options)
+    finally:
+        _restore_blocking(sys.stdin, sys.stdout)
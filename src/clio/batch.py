@@ -0,0 +1,178 @@
+import glob
+import sys
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Unpack
+
+from .compression import Compression
+from .input import Oversize, Source, TypeName, get_input
+from .output import (
+    OutputData,
+    OutputDest,
+    WriteOptions,
+    extract_bytes,
+    resolve_output_path,
+    write_output,
+)
+from .pool import FunctionRef, PoolKind, imap, make_executor
+from .spill import spill_scope
+
+__all__ = ("BatchItem", "expand_names", "format_output_name", "run_batch")
+
+_GLOB_CHARS = frozenset("*?[")
+
+# Tasks queued per worker; bounds memory when the manifest is huge
+_WINDOW_PER_JOB = 4
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    index: int
+    name: str
+
+
+@dataclass(frozen=True)
+class _Job:
+    func: Callable[..., object] | FunctionRef
+    source: Source
+    as_type: TypeName
+    dest: OutputDest
+    output_name: str
+    force: bool
+    input_compression: Compression
+    max_input_bytes: int | None
+    on_oversize: Oversize
+    write_options: WriteOptions
+
+
+def _read_manifest() -> Iterator[str]:
+    for line in sys.stdin:
+        if name := line.strip():
+            yield name
+
+
+def expand_names(names: Sequence[str], *, source: Source) -> Iterator[str]:
+    """Expand '-' into a manifest read from stdin, and file globs into paths."""
+    for name in names:
+        if name == "-":
+            yield from _read_manifest()
+        elif source == Source.FILE and _GLOB_CHARS & set(name):
+            # Unmatched patterns are kept so the item fails with a "not found" error
+            yield from sorted(glob.glob(name, recursive=True)) or [name]  # noqa: PTH207
+        else:
+            yield name
+
+
+def format_output_name(template: str, item: BatchItem) -> str:
+    path = Path(item.name)
+    try:
+        return template.format(
+            name=path.name,
+            stem=path.stem,
+            suffix=path.suffix,
+            parent=path.parent,
+            index=item.index,
+        )
+    except KeyError as err:
+        msg = f"Unknown placeholder {{{err.args[0]}}} in output name template"
+        raise ValueError(msg) from err
+
+
+def _run_item(job: _Job, item: BatchItem) -> bytes | None:
+    func = job.func.resolve() if isinstance(job.func, FunctionRef) else job.func
+    # Spilled copies of this item's input are released as soon as it is written
+    with spill_scope():
+        data = get_input(
+            job.source,
+            name=item.name,
+            as_type=job.as_type,
+            compression=job.input_compression,
+            max_bytes=job.max_input_bytes,
+            on_oversize=job.on_oversize,
+        )
+        result: OutputData = func(data)  # pyright:ignore[reportAssignmentType]
+        if job.dest == OutputDest.FILE and job.output_name != "-":
+            name = format_output_name(job.output_name, item)
+            path = resolve_output_path(name, force=job.force)
+            options = job.write_options
+            write_output(result, dest=OutputDest.FILE, name=str(path), **options)
+            return None
+        # Pipe output is collected and written by the parent so items never interleave
+        return extract_bytes(result, job.write_options.get("encoding", "utf-8"))
+
+
+def run_batch(  # noqa: PLR0913
+    func: Callable[..., OutputData],
+    names: Sequence[str],
+    *,
+    source: Source,
+    as_type: TypeName,
+    dest: OutputDest,
+    output_name: str,
+    force: bool = False,
+    jobs: int = 1,
+    pool: PoolKind = PoolKind.PROCESS,
+    ordered: bool = True,
+    on_error: Callable[[str, Exception], None] | None = None,
+    input_compression: Compression = Compression.NONE,
+    max_input_bytes: int | None = None,
+    on_oversize: Oversize = Oversize.FAIL,
+    **write_options: Unpack[WriteOptions],
+) -> tuple[int, int]:
+    """
+    Apply *func* to every input named by *names* and return ``(processed, failed)``.
+
+    Names are file paths (globs allowed, '-' reads a manifest from stdin), or
+    env var names / argv indices for those sources. File output names are
+    templates such as ``{stem}.out``; pipe output is written in input order
+    unless *ordered* is false. A failing item is reported through *on_error*
+    and does not stop the batch. *max_input_bytes* bounds each item as in
+    `clio.input.get_input`.
+    """
+    if dest not in {OutputDest.FILE, OutputDest.PIPE}:
+        msg = f"Batch mode supports file and pipe output, not {dest}"
+        raise ValueError(msg)
+    is_template = format_output_name(output_name, BatchItem(0, "x")) != output_name
+    if dest == OutputDest.FILE and output_name != "-" and not is_template:
+        msg = "In batch mode --output-name must be a template such as '{stem}.out'"
+        raise ValueError(msg)
+
+    # stdin carries the manifest, so pipe-source items are read as files
+    item_source = Source.FILE if source == Source.PIPE else source
+    # A single job runs in-process; a one-worker process pool would only add overhead
+    kind = pool if jobs > 1 else PoolKind.THREAD
+    job = _Job(
+        func=FunctionRef.of(func) if kind is PoolKind.PROCESS else func,
+        source=item_source,
+        as_type=as_type,
+        dest=dest,
+        output_name=output_name,
+        force=force,
+        input_compression=input_compression,
+        max_input_bytes=max_input_bytes,
+        on_oversize=on_oversize,
+        write_options=write_options,
+    )
+    expanded = expand_names(names, source=item_source)
+    items = (BatchItem(i, name) for i, name in enumerate(expanded))
+
+    processed = failed = 0
+    with make_executor(jobs, kind) as executor:
+        run = partial(_run_item, job)
+        window = jobs * _WINDOW_PER_JOB
+        results = imap(executor, run, items, window=window, ordered=ordered)
+        for item, future in results:
+            processed += 1
+            try:
+                output = future.result()
+            # One bad input must not abort the batch
+            except Exception as err:  # noqa: BLE001
+                failed += 1
+                if on_error is not None:
+                    on_error(item.name, err)
+                continue
+            if output is not None:
+                write_output(output, dest=OutputDest.PIPE, **write_options)
+    return processed, failed
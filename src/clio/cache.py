@@ -0,0 +1,255 @@
+import contextlib
+import fcntl
+import hashlib
+import io
+import json
+import marshal
+import os
+from collections.abc import Callable, Generator
+from dataclasses import asdict, dataclass
+from functools import partial
+from pathlib import Path
+from types import CodeType
+from typing import BinaryIO, cast, override
+
+from .compression import Compression
+from .input import InputData, Source, TypeName, get_input
+from .output import OutputData, OutputDest, write_output
+from .spill import current_store
+from .utils import CHUNK_SIZE
+
+__all__ = ("CacheStats", "ResultCache", "function_key")
+
+# Only imported when --cache-dir or command_with_io(cache_dir=...) is in use.
+
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Bump when the key derivation or entry layout changes
+_FORMAT = b"clio-cache-1"
+
+
+def function_key(func: Callable[..., object], version: str | None = None) -> str:
+    """
+    Identify *func* for cache keys: its qualified name plus *version* if given,
+    otherwise a digest of its compiled code, so editing the body invalidates
+    earlier results. Behaviour that depends on globals or closures needs a
+    *version*.
+    """
+    ident = f"{func.__module__}.{func.__qualname__}"
+    if version is not None:
+        return f"{ident}:{version}"
+    code: CodeType | None = getattr(func, "__code__", None)
+    if code is None:
+        return ident
+    return f"{ident}:{hashlib.blake2b(marshal.dumps(code), digest_size=16).hexdigest()}"
+
+
+class _HashingReader(io.RawIOBase):
+    """Binary reader that feeds every byte it returns into *digest*."""
+
+    def __init__(self, stream: BinaryIO, digest: hashlib.blake2b) -> None:
+        super().__init__()
+        self._stream: BinaryIO = stream
+        self._digest: hashlib.blake2b = digest
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    @override
+    def readinto(  # pyright:ignore[reportIncompatibleMethodOverride]
+        self,
+        buffer: "memoryview | bytearray",
+    ) -> int:
+        read = getattr(self._stream, "read1", self._stream.read)
+        chunk = cast("bytes", read(len(buffer)))
+        self._digest.update(chunk)
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+
+class ResultCache:
+    """
+    Content-addressed store of command output in *directory*.
+
+    Entries are keyed by the function's identity, the input type and a digest of
+    the input bytes, and are written atomically so concurrent processes can
+    share one directory. When the entries exceed *max_bytes* the least recently
+    used ones are evicted. Hit, miss and eviction counts are kept in
+    ``stats.json`` and updated under an exclusive ``flock``.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory: Path = Path(directory)
+        self.max_bytes: int = max_bytes
+        self._objects: Path = self.directory / "objects"
+        self._objects.mkdir(parents=True, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Generator[None]:
+        with (self.directory / "lock").open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _entry(self, key: str) -> Path:
+        return self._objects / key[:2] / key
+
+    def read_input(
+        self,
+        func_key: str,
+        source: Source,
+        *,
+        name: str | None,
+        as_type: TypeName,
+        compression: Compression = Compression.NONE,
+        encoding: str = "utf-8",
+    ) -> tuple[str, InputData]:
+        """
+        Read the input once, hashing it on the way, and return ``(key, data)``.
+
+        Input that can be re-opened (a named file, or a path given by an
+        environment variable or argument) is hashed in place and read again.
+        Anything else (pipes, clipboard, signals, decompressed streams) is
+        hashed while being copied to the spill store, and *data* is read from
+        that copy.
+        """
+        if source == Source.CLIPBOARD_WATCH or as_type == TypeName.STREAM:
+            msg = f"Results for {source} input as {as_type} cannot be cached"
+            raise ValueError(msg)
+        header = (_FORMAT, func_key.encode(), as_type.encode(), encoding.encode())
+        digest = hashlib.blake2b(b"\0".join(header))
+        read = partial(get_input, source, name=name, compression=compression)
+        if as_type in {TypeName.STR, TypeName.BYTES}:
+            data = read(as_type=as_type)
+            raw = data.encode("utf-8") if isinstance(data, str) else data
+            digest.update(cast("bytes", raw))
+            return digest.hexdigest(), data
+
+        stream = cast("BinaryIO", read(as_type=TypeName.BUFFEREDIO))
+        # Only named files are read twice; a second read of a signal or the
+        # clipboard could differ
+        reopenable = source in {Source.FILE, Source.ENV, Source.ARG}
+        if reopenable and compression == Compression.NONE and stream.seekable():
+            with stream:
+                reader = cast("io.BufferedReader", stream)
+                _ = hashlib.file_digest(reader, lambda: digest)
+            return digest.hexdigest(), get_input(source, name=name, as_type=as_type)
+        hashing = cast("BinaryIO", io.BufferedReader(_HashingReader(stream, digest)))
+        spilled = current_store().path(hashing)
+        data = get_input(Source.FILE, name=str(spilled), as_type=as_type)
+        return digest.hexdigest(), data
+
+    def open(self, key: str) -> BinaryIO | None:
+        """Return the stored output for *key* open for reading, or None on a miss."""
+        entry = self._entry(key)
+        try:
+            f = entry.open("rb")
+        except FileNotFoundError:
+            self._count(misses=1)
+            return None
+        # mtime is the recency marker for LRU eviction; atime is often disabled
+        with contextlib.suppress(OSError):
+            os.utime(entry)
+        self._count(hits=1)
+        return f
+
+    def store(
+        self,
+        key: str,
+        result: OutputData,
+        *,
+        encoding: str = "utf-8",
+        buffer_size: int = CHUNK_SIZE,
+    ) -> BinaryIO:
+        """Write *result* as the entry for *key* and return it open for reading."""
+        entry = self._entry(key)
+        entry.parent.mkdir(exist_ok=True)
+        write_output(
+            result,
+            dest=OutputDest.FILE,
+            name=str(entry),
+            encoding=encoding,
+            buffer_size=buffer_size,
+        )
+        # Opened before eviction runs, so even an entry evicted at once can be read
+        f = entry.open("rb")
+        self._evict()
+        return f
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries: list[tuple[float, int, Path]] = []
+        for shard in self._objects.iterdir():
+            for path in shard.iterdir():
+                if path.name.startswith("."):
+                    continue  # another process's in-flight temp file
+                with contextlib.suppress(FileNotFoundError):
+                    st = path.stat()
+                    entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        with self._locked():
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                evicted += 1
+            if evicted:
+                self._update(evictions=evicted)
+
+    def _read_counts(self) -> dict[str, int]:
+        try:
+            text = (self.directory / "stats.json").read_text(encoding="utf-8")
+            return cast("dict[str, int]", json.loads(text))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _update(self, **deltas: int) -> None:
+        # Caller holds the lock
+        counts = self._read_counts()
+        for field, delta in deltas.items():
+            counts[field] = counts.get(field, 0) + delta
+        tmp = self.directory / f".stats.{os.getpid()}"
+        _ = tmp.write_text(json.dumps(counts), encoding="utf-8")
+        _ = tmp.replace(self.directory / "stats.json")
+
+    def _count(self, **deltas: int) -> None:
+        with self._locked():
+            self._update(**deltas)
+
+    def stats(self) -> CacheStats:
+        """Counters from every process using this directory, plus its current size."""
+        with self._locked():
+            counts = self._read_counts()
+            entries = self._entries()
+        return CacheStats(
+            hits=counts.get("hits", 0),
+            misses=counts.get("misses", 0),
+            evictions=counts.get("evictions", 0),
+            entries=len(entries),
+            size_bytes=sum(size for _, size, _ in entries),
+        )
+
+    def stats_json(self) -> str:
+        return json.dumps(asdict(self.stats()), separators=(",", ":"))
@@ -1,34 +1,623 @@
-import signal
-from collections.abc import Callable
-from functools import wraps
+import contextlib
+import inspect
+import os
+import sys
+from collections.abc import (
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+)
+from contextlib import AbstractContextManager
+from functools import partial, wraps
 from pathlib import Path
-from typing import BinaryIO, TextIO
+from typing import TYPE_CHECKING, BinaryIO, TextIO, cast, overload
 
 import click
 from click import ClickException
 
 from .__version__ import __version__
-from .input import Source, TypeName, get_input
-from .output import OutputDest, resolve_output_path, write_output
+from .compression import Compression
+from .fanin import FanIn, get_inputs
+from .input import Oversize, Source, TypeName, get_input
+from .output import (
+    OutputDest,
+    WriteOptions,
+    resolve_output_path,
+    write_output,
+)
+from .pool import PoolKind
+from .spill import spill_scope
+from .utils import CHUNK_SIZE, no_phase
 
-# Respect SIGPIPE so that `clio | head` quits silently instead of a Python traceback
-_ = signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+if TYPE_CHECKING:
+    from .cache import ResultCache
+    from .metrics import Metrics, MetricsHook
+    from .profiling import MemoryProfile
 
 __all__ = ("command_with_io",)
 
-type DataType = str | bytes | Path | TextIO | BinaryIO
+type BytesLike = bytes | bytearray | memoryview
+type Chunks = Iterable[str] | Iterable[bytes]
+type DataType = str | BytesLike | Path | TextIO | BinaryIO | Chunks
+type AsyncDataType = DataType | AsyncIterable[str] | AsyncIterable[bytes]
+type AsyncFunc = Callable[..., Awaitable[AsyncDataType]] | Callable[..., AsyncDataType]
+type CommandFunc = Callable[..., DataType] | AsyncFunc
+type PhaseFunc = Callable[[str], AbstractContextManager[None]]
 
 
-def command_with_io(func: Callable[..., DataType]) -> click.Command:
+def _restore_sigpipe() -> None:
+    # Respect SIGPIPE so that `clio | head` quits silently instead of a Python
+    # traceback. Deferred: installed when a command runs, not on import
+    import signal  # noqa: PLC0415
+
+    _ = signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+
+
+def _combine_phases(*phases: PhaseFunc | None) -> PhaseFunc:
+    # Outer trackers see the inner ones' overhead, so the cheapest goes last
+    active = [p for p in phases if p is not None]
+    if len(active) <= 1:
+        return active[0] if active else no_phase
+
+    @contextlib.contextmanager
+    def combined(name: str) -> Generator[None]:
+        with contextlib.ExitStack() as stack:
+            for phase in active:
+                _ = stack.enter_context(phase(name))
+            yield
+
+    return combined
+
+
+@contextlib.contextmanager
+def _profiling(
+    profile_out: str | None,
+    memprofile_out: str | None,
+) -> Generator["MemoryProfile | None"]:
+    if profile_out is None and memprofile_out is None:
+        yield None
+        return
+    # Deferred: cProfile and tracemalloc load only on request
+    from .profiling import MemoryProfile, cpu_profile  # noqa: PLC0415
+
+    with contextlib.ExitStack() as stack:
+        memprofile = None
+        if memprofile_out is not None:
+            memprofile = MemoryProfile()
+            memprofile.start()
+            # Callbacks run last-in first-out: tracing stops before the report
+            # is written
+            _ = stack.callback(memprofile.write, memprofile_out)
+            _ = stack.callback(memprofile.stop)
+        if profile_out is not None:
+            _ = stack.enter_context(cpu_profile(profile_out))
+        yield memprofile
+
+
+def _check_result(result: object) -> None:
+    is_data = isinstance(result, str | bytes | Path | Iterable)
+    if not is_data and not hasattr(result, "read"):
+        msg = f"Unsupported return type: {type(result)}"
+        raise TypeError(msg)
+
+
+def _note_input_path(data: object, recorder: "Metrics | None") -> None:
+    # Under --max-input-bytes, str/bytes input that arrives as a file object was
+    # spilled
+    spilled = not isinstance(data, str | bytes)
+    if recorder is not None:
+        recorder.labels["input"] = "spilled" if spilled else "memory"
+    if spilled:
+        msg = "Input exceeds --max-input-bytes; passing it to the function as a file"
+        click.echo(msg, err=True)
+
+
+type Target = tuple[OutputDest, str]
+type WriteFunc = Callable[[DataType, list[Target], WriteOptions], None]
+
+_NAMED_DESTS = frozenset({OutputDest.FILE, OutputDest.ENV})
+
+
+def _pair_outputs(dests: tuple[str, ...], names: tuple[str, ...]) -> list[Target]:
+    # Equal counts pair up by position; otherwise names go, in order, to the file
+    # and env destinations
+    parsed = [OutputDest(d) for d in dests]
+    if len(names) == len(parsed):
+        return list(zip(parsed, names, strict=True))
+    named = [] if names == ("-",) else list(names)
+    if len(named) != sum(d in _NAMED_DESTS for d in parsed):
+        msg = "Give one --output-name per --output-dest, or per file and env output"
+        raise ValueError(msg)
+    pending = iter(named)
+    return [(d, next(pending) if d in _NAMED_DESTS else "-") for d in parsed]
+
+
+def _resolve_target(target: Target, *, force: bool) -> Target:
+    dest, name = target
+    if dest != OutputDest.FILE or name == "-":
+        return target
+    return dest, str(resolve_output_path(name, force=force))
+
+
+def _write_all(
+    result: DataType,
+    targets: list[Target],
+    write_options: WriteOptions,
+) -> None:
+    if len(targets) == 1:
+        [(dest, name)] = targets
+        write_output(result, dest=dest, name=name, **write_options)
+        return
+    # Deferred: only several destinations need threads
+    from .tee import write_outputs  # noqa: PLC0415
+
+    write_outputs(result, targets, **write_options)
+
+
+_APPENDABLE = frozenset({OutputDest.FILE, OutputDest.PIPE})
+_UNWATCHABLE = frozenset({TypeName.PATH, TypeName.MMAP, TypeName.STREAM})
+
+
+def _check_modes(  # noqa: C901, PLR0912, PLR0913
+    src: Source,
+    typ: TypeName,
+    targets: list[Target],
+    *,
+    inputs: int,
+    compression: Compression,
+    is_async: bool,
+    batch: bool,
+    daemon: bool,
+    cached: bool,
+    bounded: bool,
+    records: bool,
+    boundaries: bool,
+    ranges: bool,
+    watch: bool,
+    jobs: int,
+) -> None:
+    # Reject option combinations the run modes cannot honour, before any input
+    # is read
+    if cached and (batch or is_async or daemon):
+        msg = "--cache-dir needs a synchronous function and a single run"
+        raise ValueError(msg)
+    if bounded and (is_async or cached):
+        msg = "--max-input-bytes needs a synchronous function, without --cache-dir"
+        raise ValueError(msg)
+    if batch and is_async:
+        msg = "--batch requires a synchronous function"
+        raise ValueError(msg)
+    if len(targets) > 1 and is_async:
+        msg = "Several --output-dest values need a synchronous function"
+        raise ValueError(msg)
+    if len(targets) > 1 and batch:
+        msg = "Several --output-dest values cannot be combined with --batch"
+        raise ValueError(msg)
+    if daemon and (batch or is_async):
+        msg = "--on-signal needs a synchronous function, without --batch"
+        raise ValueError(msg)
+    if records and (batch or is_async):
+        msg = "--records needs a synchronous function, without --batch"
+        raise ValueError(msg)
+    if records and boundaries:
+        msg = "--records cannot be combined with --input-boundaries"
+        raise ValueError(msg)
+    if records and daemon and src == Source.SIGNAL:
+        msg = "--records cannot frame signal input, which is just the signal name"
+        raise ValueError(msg)
+    if ranges and (is_async or batch or daemon):
+        msg = "--ranges needs a synchronous function, without --batch or --on-signal"
+        raise ValueError(msg)
+    if ranges and (cached or len(targets) > 1):
+        msg = "--ranges cannot be combined with --cache-dir or several outputs"
+        raise ValueError(msg)
+    if watch and (is_async or batch or daemon):
+        msg = "--watch needs a synchronous function, without --batch or --on-signal"
+        raise ValueError(msg)
+    if watch and (cached or ranges):
+        msg = "--watch cannot be combined with --cache-dir or --ranges"
+        raise ValueError(msg)
+    single_file = src == Source.FILE and inputs == 1 and not boundaries
+    if (ranges or watch) and not (single_file and compression == Compression.NONE):
+        option = "--ranges" if ranges else "--watch"
+        msg = f"{option} needs a single uncompressed --input-source file"
+        raise ValueError(msg)
+    if watch and not records and typ in _UNWATCHABLE:
+        msg = f"--watch cannot pass appended data as --input-type {typ}"
+        raise ValueError(msg)
+    if watch and (len(targets) > 1 or targets[0][0] not in _APPENDABLE):
+        msg = "--watch appends to a single file or pipe output"
+        raise ValueError(msg)
+    if (inputs > 1 or boundaries) and is_async:
+        msg = "Several --input-name values need a synchronous function"
+        raise ValueError(msg)
+    if (inputs > 1 or boundaries) and (daemon or cached):
+        msg = "--on-signal and --cache-dir take a single --input-name"
+        raise ValueError(msg)
+    if jobs > 1 and not (batch or records or ranges):
+        msg = "--jobs needs --batch, --records or --ranges"
+        raise click.UsageError(msg)
+
+
+def _map_and_close(
+    mapper: Callable[[BinaryIO], Iterator[bytes]],
+    data: DataType,
+) -> Iterator[bytes]:
+    # Record input is closed once mapped, except stdin, which the process owns
+    stream = cast("BinaryIO", data)
+    if stream is getattr(sys.stdin, "buffer", None):
+        yield from mapper(stream)
+        return
+    with stream:
+        yield from mapper(stream)
+
+
+@overload
+def command_with_io(
+    func: CommandFunc,
+    /,
+    *,
+    metrics_hook: "MetricsHook | None" = None,
+    cache_dir: str | Path | None = None,
+    cache_version: str | None = None,
+) -> click.Command: ...
+@overload
+def command_with_io(
+    *,
+    metrics_hook: "MetricsHook | None" = None,
+    cache_dir: str | Path | None = None,
+    cache_version: str | None = None,
+) -> Callable[[CommandFunc], click.Command]: ...
+def command_with_io(  # noqa: C901, PLR0915
+    func: CommandFunc | None = None,
+    /,
+    *,
+    metrics_hook: "MetricsHook | None" = None,
+    cache_dir: str | Path | None = None,
+    cache_version: str | None = None,
+) -> click.Command | Callable[[CommandFunc], click.Command]:
     """
     Decorate a function into a Click command with automatic I/O handling.
 
     Adds:
       - a `--version` flag (pulled from __version__.py)
       - a `--force` option to overwrite existing files
+      - atomic file output (temp file + rename), tunable with `--buffer-size`
+        and made durable with `--fsync`
+      - transparent gzip/bz2/xz via `--input-compression` and
+        `--output-compression` (chunked, so memory stays flat)
+      - streaming via `--input-type lines|chunks`: the function receives a lazy
+        iterator and may return a generator that is written out incrementally
+      - native `async def` support: the function runs under `asyncio.run`,
+        `--input-type stream` hands it an `asyncio.StreamReader`, and async
+        generators are drained through an `asyncio.StreamWriter` on stdout
+      - a daemon mode, `--on-signal SIGUSR1` (repeatable), that stays resident
+        and re-runs the function each time one of the signals arrives
+      - fan-in: repeated `--input-name` values (``-`` for stdin) are read as one
+        stream, concatenated or with `--fan-in interleave` round-robin by line;
+        `--input-boundaries` tags lines/chunks with the input they came from
+      - record mode, `--records lines|ndjson|csv|nul`: the input is parsed as a
+        stream of records, the function is called with lists of up to
+        `--batch-size` of them, and the records it returns are written back in
+        the same framing (orjson is used for NDJSON when installed); `--jobs N`
+        maps batches in a worker pool, in input order unless `--unordered`
+      - a watch mode, `--watch`, that follows an input file like ``tail -F``
+        (inotify, or polling) and runs on each block of appended lines,
+        appending the results; `--watch-checkpoint` makes restarts resume
+      - `--ranges N`: one large input file is split into N record-aligned byte
+        ranges that `--jobs` workers read and process on their own; outputs are
+        concatenated in order or written as one shard per range
+      - a memory ceiling, `--max-input-bytes N`: larger str/bytes input fails,
+        or with `--on-oversize spill` reaches the function as a file object
+      - fan-out: repeated `--output-dest` values receive the same result in one
+        pass, each through its own bounded buffer, like ``tee``
+      - a `--batch` mode that applies the function to many inputs (names, globs
+        or a stdin manifest) on a `--jobs N` worker pool
+      - `--metrics` / `--metrics-file PATH`: one JSON line per run with wall and
+        CPU time for the resolve, read, call and write phases, bytes in and out,
+        and MB/s; `@command_with_io(metrics_hook=fn)` also hands each run's
+        `clio.metrics.Metrics` to *fn*
+      - `--profile-out PATH` (cProfile pstats for the whole run) and
+        `--memprofile-out PATH` (tracemalloc peak and top allocation sites per
+        phase)
+      - an opt-in result cache, `--cache-dir DIR` (default *cache_dir*): output
+        is keyed by the function's code (or *cache_version*), the input type and
+        a digest of the input, and replayed without calling the function on a hit
       - broad exception handling so any unexpected exception
         becomes a clean ClickException
     """
+    if func is None:
+
+        def decorate(f: CommandFunc) -> click.Command:
+            return command_with_io(
+                f,
+                metrics_hook=metrics_hook,
+                cache_dir=cache_dir,
+                cache_version=cache_version,
+            )
+
+        return decorate
+
+    is_async = inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+    sync_func = cast("Callable[..., DataType]", func)
+
+    def _report(name: str, err: Exception) -> None:
+        click.echo(f"Error: {name}: {err}", err=True)
+
+    def _new_metrics(*, enabled: bool, **labels: str) -> "Metrics | None":
+        if not enabled and metrics_hook is None:
+            return None
+        # Deferred: disabled metrics cost nothing
+        from .metrics import Metrics  # noqa: PLC0415
+
+        return Metrics(labels={"command": func.__name__, **labels})
+
+    def _finish(
+        recorder: "Metrics | None",
+        *,
+        emit: bool,
+        metrics_file: str | None,
+    ) -> None:
+        if recorder is None:
+            return
+        if metrics_hook is not None:
+            metrics_hook(recorder)
+        if emit:
+            recorder.emit(metrics_file)
+
+    def _run_once(
+        call: Callable[[DataType], DataType],
+        read: Callable[[], DataType],
+        targets: list[Target],
+        write_options: WriteOptions,
+        recorder: "Metrics | None",
+        memprofile: "MemoryProfile | None",
+        *,
+        bounded: bool = False,
+        write: WriteFunc = _write_all,
+    ) -> None:
+        phase = _combine_phases(
+            memprofile and memprofile.phase,
+            recorder and recorder.phase,
+        )
+        with phase("read"):
+            data = read()
+        if bounded:
+            _note_input_path(data, recorder)
+        if recorder is not None:
+            data = recorder.count_in(data)
+        with phase("call"):
+            result = call(data)
+
+        _check_result(result)
+
+        if recorder is not None:
+            result = recorder.count_out(result)
+        with phase("write"):
+            write(result, targets, write_options)
+
+    def _run_cached(  # noqa: PLR0913
+        call: Callable[[DataType], DataType],
+        func_key: str,
+        cache: "ResultCache",
+        src: Source,
+        name: str,
+        typ: TypeName,
+        targets: list[Target],
+        *,
+        input_compression: Compression,
+        write_options: WriteOptions,
+        recorder: "Metrics | None",
+        memprofile: "MemoryProfile | None",
+    ) -> None:
+        phase = _combine_phases(
+            memprofile and memprofile.phase,
+            recorder and recorder.phase,
+        )
+        encoding = write_options.get("encoding", "utf-8")
+        with phase("read"):
+            key, data = cache.read_input(
+                func_key,
+                src,
+                name=name,
+                as_type=typ,
+                compression=input_compression,
+                encoding=encoding,
+            )
+            stored = cache.open(key)
+        if recorder is not None:
+            recorder.labels["cache"] = "miss" if stored is None else "hit"
+            data = recorder.count_in(data)
+        if stored is None:
+            with phase("call"):
+                result = call(data)
+                _check_result(result)
+                buffer_size = write_options.get("buffer_size", CHUNK_SIZE)
+                stored = cache.store(
+                    key,
+                    result,
+                    encoding=encoding,
+                    buffer_size=buffer_size,
+                )
+        with stored:
+            if recorder is not None:
+                _ = recorder.count_out(stored)
+            with phase("write"):
+                _write_all(stored, targets, write_options)
+
+    def _run_batch(  # noqa: PLR0913
+        src: Source,
+        names: tuple[str, ...],
+        typ: TypeName,
+        dest: OutputDest,
+        output_name: str,
+        *,
+        force: bool,
+        jobs: int,
+        pool: str,
+        unordered: bool,
+        input_compression: Compression,
+        max_input_bytes: int | None,
+        on_oversize: Oversize,
+        write_options: WriteOptions,
+    ) -> None:
+        # Deferred: pulls in the worker pool machinery
+        from .batch import run_batch  # noqa: PLC0415
+
+        processed, failed = run_batch(
+            sync_func,
+            names,
+            source=src,
+            as_type=typ,
+            dest=dest,
+            output_name=output_name,
+            force=force,
+            jobs=jobs,
+            pool=PoolKind(pool),
+            ordered=not unordered,
+            on_error=_report,
+            input_compression=input_compression,
+            max_input_bytes=max_input_bytes,
+            on_oversize=on_oversize,
+            **write_options,
+        )
+        if failed:
+            msg = f"{failed} of {processed} inputs failed"
+            raise ClickException(msg)
+
+    def _run_daemon(  # noqa: PLR0913
+        call: Callable[[DataType], DataType],
+        src: Source,
+        name: str,
+        typ: TypeName,
+        targets: list[Target],
+        triggers: tuple[str, ...],
+        *,
+        input_compression: Compression,
+        max_input_bytes: int | None,
+        on_oversize: Oversize,
+        write_options: WriteOptions,
+        new_metrics: Callable[[str], "Metrics | None"],
+        finish: Callable[["Metrics | None"], None],
+        memprofile: "MemoryProfile | None",
+    ) -> None:
+        # Deferred: only signal modes need it
+        from .signal import iter_signals, parse_signal  # noqa: PLC0415
+
+        signums = [parse_signal(t) for t in triggers]
+        if src == Source.SIGNAL and typ not in {TypeName.STR, TypeName.BYTES}:
+            msg = "Daemon mode with signal input needs --input-type str or bytes"
+            raise ValueError(msg)
+
+        def announce() -> None:
+            names = ", ".join(s.name for s in signums)
+            click.echo(f"Waiting for {names} (pid {os.getpid()})", err=True)
+
+        def read_trigger(signame: str) -> DataType:
+            if src == Source.SIGNAL:
+                # The trigger itself is the input; do not wait for a second signal
+                return signame if typ == TypeName.STR else signame.encode()
+            return get_input(
+                src,
+                name=name,
+                as_type=typ,
+                compression=input_compression,
+                max_bytes=max_input_bytes,
+                on_oversize=on_oversize,
+            )
+
+        in_memory = typ in {TypeName.STR, TypeName.BYTES} and src != Source.SIGNAL
+        bounded = max_input_bytes is not None and in_memory
+        for signame in iter_signals(signums, on_ready=announce):
+            recorder = new_metrics(signame)
+            try:
+                read = partial(read_trigger, signame)
+                # Each run's spilled input is released before the next signal
+                with spill_scope():
+                    _run_once(
+                        call,
+                        read,
+                        targets,
+                        write_options,
+                        recorder,
+                        memprofile,
+                        bounded=bounded,
+                    )
+                _ = sys.stdout.flush()
+            # One failed run must not stop the daemon
+            except Exception as err:  # noqa: BLE001
+                _report(signame, err)
+            finally:
+                finish(recorder)
+
+    def _run_watch(  # noqa: PLR0913
+        call: Callable[[DataType], DataType],
+        name: str,
+        typ: TypeName,
+        targets: list[Target],
+        *,
+        checkpoint: str | None,
+        interval: float,
+        write_options: WriteOptions,
+        new_metrics: Callable[[], "Metrics | None"],
+        finish: Callable[["Metrics | None"], None],
+        memprofile: "MemoryProfile | None",
+    ) -> None:
+        # Deferred: only watch mode installs a handler or follows a file
+        import signal  # noqa: PLC0415
+
+        from .watch import FileTail, append_output, as_input  # noqa: PLC0415
+
+        tail = FileTail(name, checkpoint=checkpoint, interval=interval)
+        busy = stopping = False
+
+        def _stop(_signum: int, _frame: object) -> None:
+            # A block in progress is finished and committed first, so its output
+            # is not repeated on restart; a second signal interrupts it
+            nonlocal stopping
+            if not busy or stopping:
+                raise KeyboardInterrupt
+            stopping = True
+
+        stop_signals = (signal.SIGINT, signal.SIGTERM)
+        previous = {signum: signal.signal(signum, _stop) for signum in stop_signals}
+        click.echo(f"Watching {name} (pid {os.getpid()})", err=True)
+        blocks = tail.blocks()
+        try:
+            for block in blocks:
+                busy = True
+                recorder = new_metrics()
+                try:
+                    read = partial(as_input, block, typ)
+                    # Each block's spilled input is released before the next one
+                    with spill_scope():
+                        _run_once(
+                            call,
+                            read,
+                            targets,
+                            write_options,
+                            recorder,
+                            memprofile,
+                            write=append_output,
+                        )
+                    _ = sys.stdout.flush()
+                finally:
+                    finish(recorder)
+                # Only output that was written moves the checkpoint; a failed block
+                # is retried on restart
+                tail.commit()
+                busy = False
+                if stopping:
+                    return
+        except KeyboardInterrupt:
+            return
+        finally:
+            blocks.close()
+            for signum, handler in previous.items():
+                _ = signal.signal(signum, handler)
 
     @click.command()
     @click.version_option(version=__version__)
@@ -44,9 +633,24 @@ def command_with_io(func: Callable[..., DataType]) -> click.Command:
         "--input-name",
         "input_name",
         type=click.Path(exists=False, allow_dash=True),
-        default="-",
+        multiple=True,
+        default=["-"],
         show_default=True,
-        help="Name for input (env var, file path, or '-' for stdin).",
+        help="Input name (env var, file path, or '-' for stdin); repeat for several.",
+    )
+    @click.option(
+        "--fan-in",
+        "fan_in",
+        type=click.Choice([m.value for m in FanIn], case_sensitive=False),
+        default=FanIn.CONCAT.value,
+        show_default=True,
+        help="Combine repeated --input-name values in turn, or round-robin by line.",
+    )
+    @click.option(
+        "--input-boundaries",
+        is_flag=True,
+        default=False,
+        help="Pass (input name, item) pairs so the function sees where inputs start.",
     )
     @click.option(
         "--input-type",
@@ -56,21 +660,54 @@ def command_with_io(func: Callable[..., DataType]) -> click.Command:
         show_default=True,
         help="Which Python type to produce from the input.",
     )
+    @click.option(
+        "--max-input-bytes",
+        type=click.IntRange(min=0),
+        default=None,
+        help="Largest file or pipe input read into memory as str or bytes.",
+    )
+    @click.option(
+        "--on-oversize",
+        type=click.Choice([o.value for o in Oversize], case_sensitive=False),
+        default=Oversize.FAIL.value,
+        show_default=True,
+        help="Over --max-input-bytes, fail, or pass the function a spilled temp file.",
+    )
+    @click.option(
+        "--records",
+        # Spelled out so clio.records is only imported when the option is used
+        type=click.Choice(["lines", "ndjson", "csv", "nul"], case_sensitive=False),
+        default=None,
+        help="Pass the function lists of parsed records; output uses the same framing.",
+    )
+    @click.option(
+        "--batch-size",
+        type=click.IntRange(min=1),
+        default=1000,
+        show_default=True,
+        help="Records per function call with --records.",
+    )
     @click.option(
         "--output-dest",
         "output_dest",
         type=click.Choice([d.value for d in OutputDest], case_sensitive=False),
-        default=OutputDest.PIPE.value,
+        multiple=True,
+        default=[OutputDest.PIPE.value],
         show_default=True,
-        help="Where to write the command's result.",
+        help="Where to write the result; repeat to write several places in one pass.",
     )
     @click.option(
         "--output-name",
         "output_name",
         type=click.Path(exists=False, allow_dash=True),
-        default="-",
+        multiple=True,
+        default=["-"],
         show_default=True,
-        help="Name for output (env var name or file path, or '-' for stdout).",
+        help=(
+            "Name for output (env var, file path, or '-' for stdout); a template "
+            "like '{stem}.out' with --batch. With several --output-dest, one per "
+            "destination or one per file and env destination."
+        ),
     )
     @click.option(
         "--force",
@@ -78,41 +715,437 @@ def command_with_io(func: Callable[..., DataType]) -> click.Command:
         default=False,
         help="Overwrite existing output files when using file output.",
     )
+    @click.option(
+        "--fsync",
+        is_flag=True,
+        default=False,
+        help="fsync file output and its directory before exiting.",
+    )
+    @click.option(
+        "--buffer-size",
+        "buffer_size",
+        type=click.IntRange(min=1),
+        default=CHUNK_SIZE,
+        show_default=True,
+        help="Write buffer and chunk size in bytes for file output.",
+    )
+    @click.option(
+        "--input-compression",
+        "input_compression",
+        type=click.Choice([c.value for c in Compression], case_sensitive=False),
+        default=Compression.NONE.value,
+        show_default=True,
+        help="Decompress input; 'auto' detects gzip/bz2/xz by magic bytes.",
+    )
+    @click.option(
+        "--output-compression",
+        "output_compression",
+        type=click.Choice([c.value for c in Compression], case_sensitive=False),
+        default=Compression.NONE.value,
+        show_default=True,
+        help="Compress output on the fly; 'auto' follows the output file suffix.",
+    )
+    @click.option(
+        "--compression-level",
+        "compression_level",
+        type=click.IntRange(min=0, max=9),
+        default=None,
+        help="Level for --output-compression (format default if omitted).",
+    )
+    @click.option(
+        "--metrics",
+        is_flag=True,
+        default=False,
+        help="Emit per-phase timing and throughput as one JSON line on stderr.",
+    )
+    @click.option(
+        "--metrics-file",
+        "metrics_file",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Append the metrics JSON line to this file instead (implies --metrics).",
+    )
+    @click.option(
+        "--profile-out",
+        "profile_out",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Write cProfile stats (pstats format) for the whole run to this file.",
+    )
+    @click.option(
+        "--memprofile-out",
+        "memprofile_out",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Write tracemalloc peak and top allocation sites per phase to this file.",
+    )
+    @click.option(
+        "--cache-dir",
+        "cache_dir_opt",
+        type=click.Path(file_okay=False),
+        default=str(cache_dir) if cache_dir is not None else None,
+        show_default=True,
+        help="Reuse output for identical input from this content-addressed cache.",
+    )
+    @click.option(
+        "--cache-max-bytes",
+        type=click.IntRange(min=0),
+        default=1 << 30,
+        show_default=True,
+        help="Evict least recently used cache entries beyond this total size.",
+    )
+    @click.option(
+        "--cache-stats",
+        is_flag=True,
+        default=False,
+        help="Print cache hit/miss/eviction counts as JSON on stderr after the run.",
+    )
+    @click.option(
+        "--on-signal",
+        "on_signal",
+        multiple=True,
+        help="Stay resident and re-run on each of these signals (name or number).",
+    )
+    @click.option(
+        "--watch",
+        is_flag=True,
+        default=False,
+        help="Follow the input file like 'tail -F' and run on each appended block.",
+    )
+    @click.option(
+        "--watch-checkpoint",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Save the position reached to this file and resume from it on restart.",
+    )
+    @click.option(
+        "--watch-interval",
+        type=click.FloatRange(min=0, min_open=True),
+        default=1.0,
+        show_default=True,
+        help="Seconds between checks when file change notifications are unavailable.",
+    )
+    @click.option(
+        "--batch",
+        is_flag=True,
+        default=False,
+        help="Run once per --input-name, glob match, or stdin manifest line.",
+    )
+    @click.option(
+        "--jobs",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="Number of parallel workers for --batch, --records and --ranges.",
+    )
+    @click.option(
+        "--pool",
+        type=click.Choice([k.value for k in PoolKind], case_sensitive=False),
+        default=PoolKind.PROCESS.value,
+        show_default=True,
+        help="Worker pool type for --jobs > 1.",
+    )
+    @click.option(
+        "--unordered",
+        is_flag=True,
+        default=False,
+        help="Emit batch results as they complete instead of in input order.",
+    )
+    @click.option(
+        "--ranges",
+        type=click.IntRange(min=1),
+        default=None,
+        help=(
+            "Split one input file into this many newline-aligned byte ranges and "
+            "run on each with --jobs workers; output is concatenated in order, or "
+            "one shard per range with a template like '{stem}.{index}.out'."
+        ),
+    )
     @wraps(func)
-    def wrapper(
+    def wrapper(  # noqa: PLR0913
         input_source: str,
-        input_name: str,
+        input_name: tuple[str, ...],
+        fan_in: str,
+        input_boundaries: bool,
         input_type: str,
-        output_dest: str,
-        output_name: str,
+        max_input_bytes: int | None,
+        on_oversize: str,
+        records: str | None,
+        batch_size: int,
+        output_dest: tuple[str, ...],
+        output_name: tuple[str, ...],
         *,
         force: bool,
+        fsync: bool,
+        buffer_size: int,
+        input_compression: str,
+        output_compression: str,
+        compression_level: int | None,
+        metrics: bool,
+        metrics_file: str | None,
+        profile_out: str | None,
+        memprofile_out: str | None,
+        cache_dir_opt: str | None,
+        cache_max_bytes: int,
+        cache_stats: bool,
+        on_signal: tuple[str, ...],
+        watch: bool,
+        watch_checkpoint: str | None,
+        watch_interval: float,
+        batch: bool,
+        jobs: int,
+        pool: str,
+        unordered: bool,
+        ranges: int | None,
     ) -> None:
         def _wrap_error(err: Exception) -> None:
             raise ClickException(str(err)) from err
 
+        _restore_sigpipe()
+        emit = metrics or metrics_file is not None
+        labels = {
+            "source": input_source,
+            "type": records or input_type,
+            "dest": ",".join(output_dest),
+        }
+        recorder = _new_metrics(enabled=emit, **labels)
         try:
-            # Parse enum values
-            src = Source(input_source)
-            typ = TypeName(input_type)
-            dest = OutputDest(output_dest)
+            with _profiling(profile_out, memprofile_out) as memprofile:
+                phase = _combine_phases(
+                    memprofile and memprofile.phase,
+                    recorder and recorder.phase,
+                )
+                with phase("resolve"):
+                    # Parse enum values
+                    src = Source(input_source)
+                    typ = TypeName(input_type)
+                    targets = _pair_outputs(output_dest, output_name)
+                    comp_in = Compression(input_compression)
+                    oversize = Oversize(on_oversize)
+                    write_options: WriteOptions = {
+                        "fsync": fsync,
+                        "buffer_size": buffer_size,
+                        "compression": Compression(output_compression),
+                        "level": compression_level,
+                    }
+
+                dest, first_output = targets[0]
+                _check_modes(
+                    src,
+                    typ,
+                    targets,
+                    inputs=len(input_name),
+                    compression=comp_in,
+                    is_async=is_async,
+                    batch=batch,
+                    daemon=bool(on_signal),
+                    cached=cache_dir_opt is not None,
+                    bounded=max_input_bytes is not None,
+                    records=records is not None,
+                    boundaries=input_boundaries,
+                    ranges=ranges is not None,
+                    watch=watch,
+                    jobs=jobs,
+                )
+                call = sync_func
+                if records is not None:
+                    # Deferred: only record mode needs it
+                    from .records import (  # noqa: PLC0415
+                        RecordFormat,
+                        RecordFunc,
+                        map_records,
+                    )
+
+                    # Records are framed from raw bytes, whatever --input-type says
+                    typ = TypeName.BUFFEREDIO
+                    mapper = partial(
+                        map_records,
+                        cast("RecordFunc", sync_func),
+                        record_format=RecordFormat(records),
+                        batch_size=batch_size,
+                        jobs=jobs,
+                        pool=PoolKind(pool),
+                        ordered=not unordered,
+                    )
+                    call = partial(_map_and_close, mapper)
+                if batch:
+                    with phase("batch"):
+                        _run_batch(
+                            src,
+                            input_name,
+                            typ,
+                            dest,
+                            first_output,
+                            force=force,
+                            jobs=jobs,
+                            pool=pool,
+                            unordered=unordered,
+                            input_compression=comp_in,
+                            max_input_bytes=max_input_bytes,
+                            on_oversize=oversize,
+                            write_options=write_options,
+                        )
+                    return
+                first_name = input_name[0]
+                fan_in_used = len(input_name) > 1 or input_boundaries
+
+                if is_async:
+                    # Deferred: only async functions pay for the event loop
+                    import asyncio  # noqa: PLC0415
+
+                    from .aio import run_async  # noqa: PLC0415
+
+                    asyncio.run(
+                        run_async(
+                            func,
+                            source=src,
+                            name=first_name,
+                            as_type=typ,
+                            dest=dest,
+                            output_name=first_output,
+                            force=force,
+                            input_compression=comp_in,
+                            metrics=recorder,
+                            phase=phase,
+                            **write_options,
+                        )
+                    )
+                    return
+
+                if watch:
+                    # Each block's record is emitted on its own; the start-up record
+                    # is dropped
+                    recorder = None
+                    _run_watch(
+                        call,
+                        first_name,
+                        typ,
+                        targets,
+                        checkpoint=watch_checkpoint,
+                        interval=watch_interval,
+                        write_options=write_options,
+                        new_metrics=partial(
+                            _new_metrics,
+                            enabled=emit,
+                            **labels,
+                            watch=first_name,
+                        ),
+                        finish=partial(_finish, emit=emit, metrics_file=metrics_file),
+                        memprofile=memprofile,
+                    )
+                    return
+
+                if ranges is not None:
+                    # Deferred: only --ranges needs them
+                    from .ranges import run_ranges  # noqa: PLC0415
+                    from .records import RecordFormat  # noqa: PLC0415
+
+                    with phase("ranges"):
+                        run_ranges(
+                            sync_func,
+                            first_name,
+                            parts=ranges,
+                            jobs=jobs,
+                            pool=PoolKind(pool),
+                            as_type=TypeName(input_type),
+                            records=None if records is None else RecordFormat(records),
+                            batch_size=batch_size,
+                            dest=dest,
+                            output_name=first_output,
+                            force=force,
+                            **write_options,
+                        )
+                    return
+
+                # Handle --force when writing to a file; checked before any input is
+                # read
+                with phase("resolve"):
+                    targets = [_resolve_target(t, force=force) for t in targets]
 
-            # Read in the data
-            data = get_input(src, name=input_name, as_type=typ)
-            # Run the user's function
-            result = func(data)
+                if on_signal:
+                    # Each trigger gets its own record; the start-up record is dropped
+                    recorder = None
+                    _run_daemon(
+                        call,
+                        src,
+                        first_name,
+                        typ,
+                        targets,
+                        on_signal,
+                        input_compression=comp_in,
+                        max_input_bytes=max_input_bytes,
+                        on_oversize=oversize,
+                        write_options=write_options,
+                        new_metrics=lambda signame: _new_metrics(
+                            enabled=emit,
+                            **labels,
+                            signal=signame,
+                        ),
+                        finish=partial(_finish, emit=emit, metrics_file=metrics_file),
+                        memprofile=memprofile,
+                    )
+                    return
 
-            # Validate return type
-            if not isinstance(result, str | bytes | Path) and not hasattr(result, "read"):
-                _wrap_error(TypeError(f"Unsupported return type: {type(result)}"))
+                if cache_dir_opt is not None:
+                    # Deferred: only cached runs need it
+                    from .cache import ResultCache, function_key  # noqa: PLC0415
 
-            # Handle --force when writing to a file
-            if dest is OutputDest.FILE and output_name not in {None, "-"}:
-                path = resolve_output_path(output_name, force=force)
-                output_name = str(path)
+                    func_key = function_key(func, cache_version)
+                    if records is not None:
+                        # Unordered output can differ from ordered output for the same
+                        # input
+                        order = "unordered" if unordered else "ordered"
+                        func_key += f"|records={records},{batch_size},{order}"
+                    cache = ResultCache(cache_dir_opt, max_bytes=cache_max_bytes)
+                    _run_cached(
+                        call,
+                        func_key,
+                        cache,
+                        src,
+                        first_name,
+                        typ,
+                        targets,
+                        input_compression=comp_in,
+                        write_options=write_options,
+                        recorder=recorder,
+                        memprofile=memprofile,
+                    )
+                    if cache_stats:
+                        click.echo(cache.stats_json(), err=True)
+                    return
 
-            # Write the output
-            write_output(result, dest=dest, name=output_name)
+                if fan_in_used:
+                    read = partial(
+                        get_inputs,
+                        src,
+                        input_name,
+                        as_type=typ,
+                        compression=comp_in,
+                        mode=FanIn(fan_in),
+                        boundaries=input_boundaries,
+                        max_bytes=max_input_bytes,
+                        on_oversize=oversize,
+                    )
+                else:
+                    read = partial(
+                        get_input,
+                        src,
+                        name=first_name,
+                        as_type=typ,
+                        compression=comp_in,
+                        max_bytes=max_input_bytes,
+                        on_oversize=oversize,
+                    )
+                in_memory = typ in {TypeName.STR, TypeName.BYTES}
+                _run_once(
+                    call,
+                    read,
+                    targets,
+                    write_options,
+                    recorder,
+                    memprofile,
+                    bounded=max_input_bytes is not None and in_memory,
+                )
 
         except ClickException:
             # Propagate expected CLI errors
@@ -120,5 +1153,7 @@ def command_with_io(func: Callable[..., DataType]) -> click.Command:
         except Exception as err:  # noqa: BLE001
             # Wrap all other exceptions for a clean CLI error
             _wrap_error(err)
+        finally:
+            _finish(recorder, emit=emit, metrics_file=metrics_file)
 
     return wrapper
@@ -0,0 +1,113 @@
+"""
+Minimal client for `clio.server`.
+
+    python -m clio.client SOCKET COMMAND [ARGS...]
+
+Runs COMMAND on a warm server as if it had been run directly: argv, the
+environment and the working directory are forwarded, stdin/stdout/stderr are
+handed over as file descriptors (so no data passes through this process),
+signals are relayed to the server's worker, and its exit status becomes ours.
+Only contextlib, os, signal, socket and sys are imported, never click or the command's
+own dependencies, which is what keeps the round trip in the low milliseconds.
+"""
+
+import contextlib
+import os
+import signal
+import socket
+import sys
+
+__all__ = ("run",)
+
+_HEADER = 4
+_ESCAPES = {i: f"\\u{i:04x}" for i in (*range(0x20), *range(0xD800, 0xE000))} | {
+    ord('"'): '\\"',
+    ord("\\"): "\\\\",
+}
+_FORWARDED = (
+    "SIGINT",
+    "SIGTERM",
+    "SIGHUP",
+    "SIGQUIT",
+    "SIGUSR1",
+    "SIGUSR2",
+    "SIGWINCH",
+)
+
+
+def _recv_int(conn: socket.socket, *, signed: bool = False) -> int | None:
+    data = b""
+    while len(data) < _HEADER:
+        chunk = conn.recv(_HEADER - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return int.from_bytes(data, signed=signed)
+
+
+def _quote(value: str) -> str:
+    # Lone surrogates (undecodable argv/env bytes) survive as \udcXX escapes that
+    # json.loads restores
+    return '"' + value.translate(_ESCAPES) + '"'
+
+
+def _encode_request(command: str, argv: list[str]) -> bytes:
+    # Encoded by hand: importing json (and re) would dominate the client's startup
+    env = ",".join(f"{_quote(k)}:{_quote(v)}" for k, v in os.environ.items())
+    args = ",".join(_quote(a) for a in argv)
+    fields = (
+        f'"command":{_quote(command)}',
+        f'"argv":[{args}]',
+        f'"env":{{{env}}}',
+        f'"cwd":{_quote(os.getcwd())}',
+    )
+    data = ("{" + ",".join(fields) + "}").encode("utf-8")
+    return len(data).to_bytes(_HEADER) + data
+
+
+def run(socket_path: str, command: str, argv: list[str]) -> int:
+    """Run *command* with *argv* on the server at *socket_path*, return its status."""
+    worker: list[int] = []
+    pending: list[int] = []
+
+    def relay(signum: int, _frame: object) -> None:
+        if not worker:
+            pending.append(signum)  # delivered once the worker's pid is known
+            return
+        with contextlib.suppress(ProcessLookupError):
+            os.kill(worker[0], signum)
+
+    for name in _FORWARDED:
+        if (signum := signal.Signals.__members__.get(name)) is not None:
+            _ = signal.signal(signum, relay)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        _ = socket.send_fds(conn, [_encode_request(command, argv)], [0, 1, 2])
+        pid = _recv_int(conn)
+        if pid is None:
+            return 1
+        worker.append(pid)
+        for signum in pending:
+            relay(signum, None)
+        code = _recv_int(conn, signed=True)
+    # The server reports 128 + N for a worker killed by signal N; a lost connection
+    # is a failure
+    return 1 if code is None else code
+
+
+def main() -> None:
+    if len(sys.argv) < 3:  # noqa: PLR2004
+        _ = sys.stderr.write("usage: python -m clio.client SOCKET COMMAND [ARGS...]\n")
+        sys.exit(2)
+    try:
+        code = run(sys.argv[1], sys.argv[2], sys.argv[3:])
+    except OSError as err:
+        msg = f"Error: cannot reach clio server at {sys.argv[1]}: {err}\n"
+        _ = sys.stderr.write(msg)
+        code = 1
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
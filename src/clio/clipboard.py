@@ -1,18 +1,203 @@
-try:
-    import pyperclip
-except ImportError:  # pragma: no cover
-    pyperclip = None
+import importlib
+import os
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from functools import cache
+from types import ModuleType
+from typing import IO, Protocol, cast
 
+__all__ = (
+    "ClipboardBackend",
+    "detect_backend",
+    "read_clipboard",
+    "watch_clipboard",
+    "write_clipboard",
+)
 
-def read_clipboard() -> str:
+# Environment overrides: explicit helper commands win over a named backend, which
+# wins over detection
+COPY_ENV = "CLIO_CLIPBOARD_COPY"
+PASTE_ENV = "CLIO_CLIPBOARD_PASTE"
+BACKEND_ENV = "CLIO_CLIPBOARD_BACKEND"
+
+
+class _Pyperclip(Protocol):
+    def paste(self) -> str: ...
+    def copy(self, text: str) -> None: ...
+
+
+def __getattr__(name: str) -> ModuleType | None:
+    # pyperclip is only imported once a clipboard is actually touched
+    if name != "pyperclip":
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    try:
+        module: ModuleType | None = importlib.import_module("pyperclip")
+    except ImportError:  # pragma: no cover
+        module = None
+    globals()[name] = module
+    return module
+
+
+def _pyperclip() -> _Pyperclip:
+    # Look up through the module so both the lazy import and monkeypatching apply
+    module, name = sys.modules[__name__], "pyperclip"
+    pyperclip: object = getattr(module, name)  # pyright:ignore[reportAny]
     if pyperclip is None:
         msg = "pyperclip is not installed"
         raise RuntimeError(msg)
-    return pyperclip.paste()
+    return cast("_Pyperclip", pyperclip)
 
 
-def write_clipboard(data: str) -> None:
-    if pyperclip is None:
-        msg = "pyperclip is not installed"
+@dataclass(frozen=True)
+class ClipboardBackend:
+    """Helper commands: one prints the clipboard to stdout, one sets it from stdin."""
+
+    name: str
+    copy: tuple[str, ...]
+    paste: tuple[str, ...]
+    # Display server variable the helper needs; None if it works without one
+    session_env: str | None = None
+
+
+_CANDIDATES = (
+    ClipboardBackend("pbcopy", ("pbcopy",), ("pbpaste",)),
+    ClipboardBackend(
+        "wl-clipboard",
+        ("wl-copy",),
+        ("wl-paste", "--no-newline"),
+        "WAYLAND_DISPLAY",
+    ),
+    ClipboardBackend(
+        "xclip",
+        ("xclip", "-selection", "clipboard"),
+        ("xclip", "-selection", "clipboard", "-o"),
+        "DISPLAY",
+    ),
+    ClipboardBackend(
+        "xsel",
+        ("xsel", "--clipboard", "--input"),
+        ("xsel", "--clipboard", "--output"),
+        "DISPLAY",
+    ),
+)
+
+
+@cache
+def detect_backend() -> ClipboardBackend | None:
+    """
+    Pick the clipboard helper once per process; None means fall back to pyperclip.
+
+    ``CLIO_CLIPBOARD_COPY``/``CLIO_CLIPBOARD_PASTE`` name custom commands, and
+    ``CLIO_CLIPBOARD_BACKEND`` forces a known backend (or ``pyperclip``).
+    """
+    import shlex  # noqa: PLC0415 # deferred: only clipboard use needs it
+    import shutil  # noqa: PLC0415
+
+    copy, paste = os.environ.get(COPY_ENV), os.environ.get(PASTE_ENV)
+    if copy and paste:
+        return ClipboardBackend(
+            "custom",
+            tuple(shlex.split(copy)),
+            tuple(shlex.split(paste)),
+        )
+    forced = os.environ.get(BACKEND_ENV)
+    if forced == "pyperclip":
+        return None
+    for backend in _CANDIDATES:
+        if forced is not None:
+            if backend.name == forced:
+                return backend
+            continue
+        if backend.session_env is not None and backend.session_env not in os.environ:
+            continue
+        if shutil.which(backend.copy[0]) and shutil.which(backend.paste[0]):
+            return backend
+    if forced is not None:
+        msg = f"Unknown clipboard backend: {forced}"
+        raise ValueError(msg)
+    return None
+
+
+def _paste_bytes(backend: ClipboardBackend) -> bytes:
+    import subprocess  # noqa: PLC0415 # deferred: only clipboard use needs it
+
+    proc = subprocess.run(backend.paste, capture_output=True, check=False)
+    if proc.returncode != 0:
+        code, stderr = proc.returncode, proc.stderr.decode(errors="replace")
+        msg = f"Clipboard command {backend.paste[0]} failed ({code}): {stderr}"
+        raise RuntimeError(msg)
+    return proc.stdout
+
+
+def read_clipboard() -> str:
+    backend = detect_backend()
+    if backend is None:
+        return _pyperclip().paste()
+    return _paste_bytes(backend).decode("utf-8")
+
+
+def write_clipboard(data: str | Iterable[bytes], encoding: str = "utf-8") -> None:
+    """Set the clipboard; byte chunks stream to the helper as they are produced."""
+    backend = detect_backend()
+    if backend is None:
+        text = data if isinstance(data, str) else b"".join(data).decode(encoding)
+        _pyperclip().copy(text)
+        return
+    import subprocess  # noqa: PLC0415 # deferred: only clipboard use needs it
+
+    # The helper's output is not captured: xclip/xsel fork to keep serving the
+    # selection, and a captured pipe would stay open for as long as they live.
+    proc = subprocess.Popen(
+        backend.copy,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+    )
+    stdin = cast("IO[bytes]", proc.stdin)
+    try:
+        for chunk in [data.encode(encoding)] if isinstance(data, str) else data:
+            _ = stdin.write(chunk)
+    finally:
+        stdin.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        msg = f"Clipboard command {backend.copy[0]} failed ({returncode})"
         raise RuntimeError(msg)
-    pyperclip.copy(data)
+
+
+def _snapshot() -> bytes:
+    backend = detect_backend()
+    if backend is None:
+        return _pyperclip().paste().encode("utf-8")
+    return _paste_bytes(backend)
+
+
+def watch_clipboard(
+    *,
+    min_interval: float = 0.1,
+    max_interval: float = 1.0,
+    backoff: float = 1.5,
+) -> Iterator[bytes]:
+    """
+    Yield each new clipboard value, deduplicated by content hash.
+
+    Polling starts every *min_interval* seconds and slows by *backoff* per idle
+    poll up to *max_interval*, snapping back to the fast rate after a change.
+    The value present when watching starts is not yielded.
+    """
+    import hashlib  # noqa: PLC0415 # deferred: only watching needs it
+
+    last = hashlib.blake2b(_snapshot(), digest_size=16).digest()
+    interval = min_interval
+    while True:
+        time.sleep(interval)
+        value = _snapshot()
+        digest = hashlib.blake2b(value, digest_size=16).digest()
+        if digest == last:
+            interval = min(interval * backoff, max_interval)
+            continue
+        last = digest
+        interval = min_interval
+        yield value
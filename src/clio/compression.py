@@ -0,0 +1,204 @@
+import io
+from enum import StrEnum
+from pathlib import PurePath
+from typing import BinaryIO, cast, override
+
+__all__ = (
+    "Compression",
+    "compress_stream",
+    "decompress_stream",
+    "detect_compression",
+    "infer_compression",
+)
+
+# gzip, bz2 and lzma are imported on use: most runs never touch them.
+
+
+class Compression(StrEnum):
+    NONE = "none"
+    AUTO = "auto"
+    GZIP = "gzip"
+    BZ2 = "bz2"
+    XZ = "xz"
+
+
+_MAGIC = {
+    Compression.GZIP: b"\x1f\x8b",
+    Compression.BZ2: b"BZh",
+    Compression.XZ: b"\xfd7zXZ\x00",
+}
+_SNIFF_SIZE = max(len(m) for m in _MAGIC.values())
+
+_SUFFIXES = {
+    ".gz": Compression.GZIP,
+    ".gzip": Compression.GZIP,
+    ".bz2": Compression.BZ2,
+    ".xz": Compression.XZ,
+}
+
+
+def detect_compression(head: bytes) -> Compression:
+    """Identify the format from the first bytes of a stream; NONE if nothing matches."""
+    for compression, magic in _MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return Compression.NONE
+
+
+def infer_compression(name: str | None) -> Compression:
+    """Pick a format from an output file suffix such as ``.gz``; NONE otherwise."""
+    if not name or name == "-":
+        return Compression.NONE
+    return _SUFFIXES.get(PurePath(name).suffix.lower(), Compression.NONE)
+
+
+class _Prefixed(io.RawIOBase):
+    """Raw reader that replays the sniffed bytes, then continues from *stream*."""
+
+    def __init__(self, head: bytes, stream: BinaryIO) -> None:
+        super().__init__()
+        self._head: memoryview = memoryview(head)
+        self._stream: BinaryIO = stream
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    @override
+    def readinto(  # pyright:ignore[reportIncompatibleMethodOverride]
+        self,
+        buffer: "memoryview | bytearray",
+    ) -> int:
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        read = getattr(self._stream, "read1", self._stream.read)
+        chunk = cast("bytes", read(len(buffer)))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+    @override
+    def close(self) -> None:
+        self._stream.close()
+        super().close()
+
+
+class _Owning(io.RawIOBase):
+    """Raw reader over a decompressor that also closes its compressed *source*."""
+
+    def __init__(self, reader: io.BufferedIOBase, source: BinaryIO) -> None:
+        super().__init__()
+        self._reader: io.BufferedIOBase = reader
+        self._source: BinaryIO = source
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    @override
+    def readinto(  # pyright:ignore[reportIncompatibleMethodOverride]
+        self,
+        buffer: "memoryview | bytearray",
+    ) -> int:
+        return self._reader.readinto(buffer)
+
+    @override
+    def close(self) -> None:
+        # GzipFile, BZ2File and LZMAFile leave a stream passed to them open
+        try:
+            self._reader.close()
+        finally:
+            self._source.close()
+            super().close()
+
+
+def _sniff(stream: BinaryIO) -> tuple[Compression, BinaryIO]:
+    peek = getattr(stream, "peek", None)
+    if peek is not None:
+        head = cast("bytes", peek(_SNIFF_SIZE))
+        if len(head) >= _SNIFF_SIZE:
+            return detect_compression(head), stream
+    # Not peekable (or a short pipe read): consume the head and replay it
+    head = stream.read(_SNIFF_SIZE)
+    replay = io.BufferedReader(_Prefixed(head, stream))
+    return detect_compression(head), cast("BinaryIO", replay)
+
+
+def decompress_stream(stream: BinaryIO, compression: Compression) -> BinaryIO:
+    """
+    Return a binary stream yielding the decompressed content of *stream*.
+
+    ``AUTO`` sniffs the magic bytes and passes uncompressed data through
+    unchanged. Decompression happens chunk by chunk as the result is read.
+    Closing the result closes *stream* too.
+    """
+    if compression == Compression.AUTO:
+        compression, stream = _sniff(stream)
+    match compression:
+        case Compression.NONE:
+            return stream
+        case Compression.GZIP:
+            import gzip  # noqa: PLC0415
+
+            reader: io.BufferedIOBase = gzip.GzipFile(fileobj=stream, mode="rb")
+        case Compression.BZ2:
+            import bz2  # noqa: PLC0415
+
+            reader = bz2.BZ2File(stream, mode="rb")
+        case Compression.XZ:
+            import lzma  # noqa: PLC0415
+
+            # Closed by _Owning
+            reader = lzma.LZMAFile(stream, mode="rb")  # noqa: SIM115
+        case _:
+            msg = f"Unsupported compression: {compression}"
+            raise ValueError(msg)
+    return cast("BinaryIO", io.BufferedReader(_Owning(reader, stream)))
+
+
+def compress_stream(
+    sink: BinaryIO,
+    compression: Compression,
+    level: int | None = None,
+) -> BinaryIO:
+    """
+    Wrap *sink* so that bytes written to the result reach it compressed.
+
+    Closing the result finishes the compressed stream but leaves *sink* open.
+    *level* is the format's compression level (0-9, where bz2 treats 0 as 1);
+    None uses its default.
+    """
+    match compression:
+        case Compression.GZIP:
+            import gzip  # noqa: PLC0415
+
+            # mtime=0 keeps output reproducible for identical input
+            return gzip.GzipFile(  # pyright:ignore[reportReturnType]
+                fileobj=sink,
+                mode="wb",
+                compresslevel=9 if level is None else level,
+                mtime=0,
+            )
+        case Compression.BZ2:
+            import bz2  # noqa: PLC0415
+
+            # bz2 has no level 0; the fastest setting stands in for it
+            level = 9 if level is None else max(level, 1)
+            return bz2.BZ2File(  # pyright:ignore[reportReturnType]
+                sink,
+                mode="wb",
+                compresslevel=level,
+            )
+        case Compression.XZ:
+            import lzma  # noqa: PLC0415
+
+            return lzma.LZMAFile(  # pyright:ignore[reportReturnType]
+                sink,
+                mode="wb",
+                preset=level,
+            )
+        case _:
+            msg = f"Cannot compress output as {compression}"
+            raise ValueError(msg)
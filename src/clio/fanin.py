@@ -0,0 +1,248 @@
+import io
+import sys
+from collections.abc import Callable, Generator, Iterator, Sequence
+from enum import StrEnum
+from functools import partial
+from typing import BinaryIO, cast, override
+
+from .compression import Compression
+from .input import InputData, Oversize, Source, TypeName, get_input, read_bounded
+from .spill import current_store
+
+__all__ = ("FanIn", "get_inputs")
+
+# Reads go straight into the caller's buffer, so one large buffer replaces cat's
+# pipe hop
+FANIN_BUFFER_SIZE = 1 << 20
+
+type Opener = Callable[[], BinaryIO]
+type NamedOpener = tuple[str, Opener]
+
+
+class FanIn(StrEnum):
+    CONCAT = "concat"
+    INTERLEAVE = "interleave"
+
+
+class _ChainReader(io.RawIOBase):
+    """Raw reader over several streams in turn, opening each when the last one ends."""
+
+    def __init__(self, openers: Sequence[NamedOpener]) -> None:
+        super().__init__()
+        self._pending: Iterator[NamedOpener] = iter(openers)
+        self._current: BinaryIO | None = None
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    def _advance(self) -> bool:
+        self._close_current()
+        try:
+            _, opener = next(self._pending)
+        except StopIteration:
+            return False
+        self._current = opener()
+        return True
+
+    def _close_current(self) -> None:
+        # stdin belongs to the process and stays open for whoever reads it next
+        if self._current is not None and self._current is not sys.stdin.buffer:
+            self._current.close()
+        self._current = None
+
+    @override
+    def readinto(  # pyright:ignore[reportIncompatibleMethodOverride]
+        self,
+        buffer: "memoryview | bytearray",
+    ) -> int:
+        while self._current is not None or self._advance():
+            current = cast("BinaryIO", self._current)
+            readinto = getattr(current, "readinto1", None)
+            readinto = readinto or getattr(current, "readinto", None)
+            if readinto is not None:
+                n = cast("int | None", readinto(buffer)) or 0
+            else:
+                chunk = current.read(len(buffer))
+                n = len(chunk)
+                buffer[:n] = chunk
+            if n:
+                return n
+            self._close_current()
+        return 0
+
+    @override
+    def close(self) -> None:
+        self._close_current()
+        super().close()
+
+
+def _openers(
+    source: Source,
+    names: Sequence[str],
+    compression: Compression,
+) -> list[NamedOpener]:
+    # Like batch mode, pipe-source names are files, and '-' stands for stdin among
+    # them
+    item_source = Source.FILE if source == Source.PIPE else source
+
+    def opener(name: str) -> Opener:
+        read = partial(get_input, as_type=TypeName.BUFFEREDIO, compression=compression)
+        if name == "-":
+            return lambda: cast("BinaryIO", read(Source.PIPE))
+        return lambda: cast("BinaryIO", read(item_source, name=name))
+
+    return [(name, opener(name)) for name in names]
+
+
+def _open_one(name: str, opener: Opener) -> BinaryIO:
+    raw = _ChainReader([(name, opener)])
+    return cast("BinaryIO", io.BufferedReader(raw, FANIN_BUFFER_SIZE))
+
+
+def _iter_tagged_lines(openers: Sequence[NamedOpener]) -> Iterator[tuple[str, str]]:
+    for name, opener in openers:
+        with _open_one(name, opener) as stream:
+            for line in stream:
+                yield name, line.decode("utf-8")
+
+
+def _interleave(openers: Sequence[NamedOpener]) -> Iterator[tuple[str, bytes]]:
+    # Every input stays open; each round takes one line from each input that has
+    # one left. An unterminated last line gets a newline so it cannot run into the
+    # next input's line.
+    streams = [(name, _open_one(name, opener)) for name, opener in openers]
+    try:
+        active = [(name, iter(stream)) for name, stream in streams]
+        while active:
+            remaining: list[tuple[str, Iterator[bytes]]] = []
+            for name, lines in active:
+                if (line := next(lines, None)) is not None:
+                    yield name, line if line.endswith(b"\n") else line + b"\n"
+                    remaining.append((name, lines))
+            active = remaining
+    finally:
+        for _, stream in streams:
+            stream.close()
+
+
+def _iter_mixed_lines(openers: Sequence[NamedOpener]) -> Iterator[tuple[str, str]]:
+    for name, line in _interleave(openers):
+        yield name, line.decode("utf-8")
+
+
+class _LineReader(io.RawIOBase):
+    """Raw reader over an iterator of byte lines."""
+
+    def __init__(self, lines: Generator[bytes]) -> None:
+        super().__init__()
+        self._lines: Generator[bytes] = lines
+        self._rest: bytes = b""
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    @override
+    def readinto(  # pyright:ignore[reportIncompatibleMethodOverride]
+        self,
+        buffer: "memoryview | bytearray",
+    ) -> int:
+        if not self._rest:
+            self._rest = next(self._lines, b"")
+        n = min(len(buffer), len(self._rest))
+        buffer[:n] = self._rest[:n]
+        self._rest = self._rest[n:]
+        return n
+
+    @override
+    def close(self) -> None:
+        self._lines.close()
+        super().close()
+
+
+def _drain(stream: BinaryIO) -> Iterator[bytes]:
+    with stream:
+        while chunk := stream.read(FANIN_BUFFER_SIZE):
+            yield chunk
+
+
+def _iter_tagged_chunks(openers: Sequence[NamedOpener]) -> Iterator[tuple[str, bytes]]:
+    for name, opener in openers:
+        for chunk in _drain(_open_one(name, opener)):
+            yield name, chunk
+
+
+def get_inputs(  # noqa: C901, PLR0911
+    source: Source,
+    names: Sequence[str],
+    *,
+    as_type: TypeName = TypeName.STR,
+    compression: Compression = Compression.NONE,
+    mode: FanIn = FanIn.CONCAT,
+    boundaries: bool = False,
+    max_bytes: int | None = None,
+    on_oversize: Oversize = Oversize.FAIL,
+) -> InputData:
+    """
+    Read several inputs as one, like ``cat``, and return them as *as_type*.
+
+    *names* are read in order (pipe-source names are files, and ``-`` is
+    stdin), each decompressed on its own with *compression*. ``interleave``
+    takes one line from each input in turn instead, newline-terminating each.
+    With *boundaries*, ``lines`` and ``chunks`` yield ``(name, item)`` pairs so
+    the function can tell where each input begins. *max_bytes* and
+    *on_oversize* bound ``str`` and ``bytes`` input as in
+    `clio.input.read_bounded`.
+    """
+    openers = _openers(source, names, compression)
+    if as_type == TypeName.STREAM:
+        msg = "Input type 'stream' takes a single --input-name"
+        raise ValueError(msg)
+    if boundaries:
+        match as_type, mode:
+            case TypeName.LINES, FanIn.CONCAT:
+                return _iter_tagged_lines(openers)  # pyright:ignore[reportReturnType]
+            case TypeName.LINES, FanIn.INTERLEAVE:
+                return _iter_mixed_lines(openers)  # pyright:ignore[reportReturnType]
+            case TypeName.CHUNKS, FanIn.CONCAT:
+                return _iter_tagged_chunks(openers)  # pyright:ignore[reportReturnType]
+            case _:
+                msg = "Input boundaries need lines, or chunks when concatenating"
+                raise ValueError(msg)
+
+    if mode == FanIn.INTERLEAVE:
+        raw: io.RawIOBase = _LineReader(line for _, line in _interleave(openers))
+    else:
+        raw = _ChainReader(openers)
+    stream = cast("BinaryIO", io.BufferedReader(raw, FANIN_BUFFER_SIZE))
+    if max_bytes is not None and as_type in {TypeName.STR, TypeName.BYTES}:
+        return read_bounded(
+            stream,
+            as_type=as_type,
+            max_bytes=max_bytes,
+            on_oversize=on_oversize,
+        )
+    match as_type:
+        case TypeName.BYTES:
+            with stream:
+                return stream.read()
+        case TypeName.STR:
+            with stream:
+                return io.TextIOWrapper(stream, encoding="utf-8").read()
+        case TypeName.BUFFEREDIO:
+            return stream
+        case TypeName.TEXTIO:
+            return io.TextIOWrapper(stream, encoding="utf-8")
+        case TypeName.LINES:
+            return iter(io.TextIOWrapper(stream, encoding="utf-8"))
+        case TypeName.CHUNKS:
+            return _drain(stream)
+        case TypeName.PATH:
+            with stream:
+                return current_store().path(stream)
+        case TypeName.MMAP:
+            with stream:
+                spilled = current_store().path(stream)
+            mapped = get_input(Source.FILE, name=str(spilled), as_type=TypeName.MMAP)
+            return cast("memoryview", mapped)
@@ -0,0 +1,104 @@
+import errno
+import os
+import stat
+from collections.abc import Callable
+
+from .utils import CHUNK_SIZE
+
+__all__ = ("copy_fd",)
+
+# Largest request handed to a single kernel copy call
+_BLOCK = 1 << 30
+
+# Errors meaning "this kernel path does not apply to these descriptors"
+_UNSUPPORTED = frozenset({
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTSOCK,
+    errno.EOPNOTSUPP,
+    errno.ESPIPE,
+    errno.EXDEV,
+})
+
+type _Step = Callable[[int], int]
+
+
+def _is_kind(fd: int, check: Callable[[int], bool]) -> bool:
+    try:
+        return check(os.fstat(fd).st_mode)
+    except OSError:
+        return False
+
+
+def _drive(step: _Step) -> int | None:
+    """Call *step* until EOF; return None if the very first call is unsupported."""
+    copied = 0
+    while True:
+        try:
+            n = step(copied)
+        except OSError as err:
+            if copied == 0 and err.errno in _UNSUPPORTED:
+                return None
+            raise
+        if n == 0:
+            return copied
+        copied += n
+
+
+def _read_chunk(fd: int, offset: int | None) -> bytes:
+    if offset is None:
+        return os.read(fd, CHUNK_SIZE)
+    return os.pread(fd, CHUNK_SIZE, offset)
+
+
+def _copy_chunked(src_fd: int, dst_fd: int, offset: int | None) -> int:
+    copied = 0
+    while True:
+        chunk = _read_chunk(src_fd, None if offset is None else offset + copied)
+        if not chunk:
+            return copied
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view) :]
+        copied += len(chunk)
+
+
+def copy_fd(src_fd: int, dst_fd: int, *, offset: int | None = None) -> int:
+    """
+    Copy everything from *src_fd* to *dst_fd* without passing through Python buffers.
+
+    Tries ``copy_file_range`` (file to file), ``sendfile`` (file to anything) and
+    ``splice`` (pipe to anything) in that order, and falls back to a chunked
+    ``read``/``write`` loop when none of them applies.
+
+    With *offset* ``None`` the copy starts at, and advances, the current position
+    of *src_fd*; otherwise it reads from *offset* and leaves the position alone.
+    Returns the number of bytes copied.
+    """
+    src_is_file = _is_kind(src_fd, stat.S_ISREG)
+    start = offset
+    if start is None and src_is_file:
+        start = os.lseek(src_fd, 0, os.SEEK_CUR)
+
+    copied: int | None = None
+    copy_file_range: Callable[..., int] | None = getattr(os, "copy_file_range", None)
+    to_file = _is_kind(dst_fd, stat.S_ISREG)
+    if src_is_file and start is not None and copy_file_range and to_file:
+        base = start
+        copied = _drive(
+            lambda done: copy_file_range(src_fd, dst_fd, _BLOCK, base + done),
+        )
+    if copied is None and src_is_file and start is not None and hasattr(os, "sendfile"):
+        base = start
+        copied = _drive(lambda done: os.sendfile(dst_fd, src_fd, base + done, _BLOCK))
+    splice: Callable[..., int] | None = getattr(os, "splice", None)
+    if copied is None and offset is None and splice and _is_kind(src_fd, stat.S_ISFIFO):
+        copied = _drive(lambda _done: splice(src_fd, dst_fd, _BLOCK))
+    if copied is None:
+        copied = _copy_chunked(src_fd, dst_fd, start)
+
+    if offset is None and start is not None:
+        # Positional kernel copies leave the offset alone; emulate a normal read
+        _ = os.lseek(src_fd, start + copied, os.SEEK_SET)
+    return copied
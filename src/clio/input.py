@@ -1,13 +1,18 @@
+import contextlib
+import io
+import mmap
 import os
+import stat
 import sys
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 from enum import StrEnum
 from pathlib import Path
-from typing import BinaryIO, TextIO
+from typing import BinaryIO, TextIO, cast
 
-from .clipboard import read_clipboard
-from .signal import wait_for_signal
-from .utils import persist_to_tempfile
+from .clipboard import read_clipboard, watch_clipboard
+from .compression import Compression, decompress_stream
+from .spill import current_store
+from .utils import CHUNK_SIZE, persist_to_tempfile
 
 
 class Source(StrEnum):
@@ -16,6 +21,7 @@ class Source(StrEnum):
     FILE = "file"
     PIPE = "pipe"
     CLIPBOARD = "clipboard"
+    CLIPBOARD_WATCH = "clipboard-watch"
     SIGNAL = "signal"
 
 
@@ -25,9 +31,40 @@ class TypeName(StrEnum):
     TEXTIO = "textio"
     BUFFEREDIO = "bufferedio"
     PATH = "path"
+    LINES = "lines"
+    CHUNKS = "chunks"
+    MMAP = "mmap"
+    STREAM = "stream"
 
 
-Reader = Callable[[Source, str | None], str | bytes | TextIO | BinaryIO | Path]
+class Oversize(StrEnum):
+    FAIL = "fail"
+    SPILL = "spill"
+
+
+def wait_for_signal(signum: int) -> str:
+    # Deferred: only signal input needs it
+    from .signal import wait_for_signal as _wait_for_signal  # noqa: PLC0415
+
+    return _wait_for_signal(signum)
+
+
+type _Pieces = Iterator[str] | Iterator[bytes]
+type InputData = str | bytes | memoryview | TextIO | BinaryIO | Path | _Pieces
+
+Reader = Callable[[Source, str | None], InputData]
+
+
+def _stdin_fd() -> int | None:
+    try:
+        return sys.stdin.fileno()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def _read_stdin_bytes() -> bytes:
+    buffer: BinaryIO | None = getattr(sys.stdin, "buffer", None)
+    return buffer.read() if buffer is not None else sys.stdin.read().encode("utf-8")
 
 
 def _read_str(source: Source, name: str | None) -> str:  # noqa: C901
@@ -76,15 +113,45 @@ def _read_str(source: Source, name: str | None) -> str:  # noqa: C901
 
 
 def _read_bytes(source: Source, name: str | None) -> bytes:
+    """Read raw bytes in one pass, without decoding or treating them as a path."""
     if source in {Source.ARG, Source.ENV, Source.FILE, Source.SIGNAL} and name is None:
         msg = f"Missing name for source '{source}'"
         raise ValueError(msg)
+    key = name or ""  # only the name-less sources fall back to ""
+
+    def _f_arg() -> bytes:
+        # argv is decoded with surrogateescape, so fsencode recovers the original bytes
+        return os.fsencode(sys.argv[int(key)])
+
+    def _f_env() -> bytes:
+        if os.supports_bytes_environ:
+            return os.environb[os.fsencode(key)]
+        return os.environ[key].encode("utf-8")  # pragma: no cover
+
+    def _f_file() -> bytes:
+        return Path(key).read_bytes()
 
-    text = _read_str(source, name)
-    path = Path(text)
-    if path.is_file():
-        return path.read_bytes()
-    return text.encode("utf-8")
+    def _f_clipboard() -> bytes:
+        return read_clipboard().encode("utf-8")
+
+    def _f_signal() -> bytes:
+        return wait_for_signal(int(key)).encode("utf-8")
+
+    dispatch: dict[Source, Callable[[], bytes]] = {
+        Source.ARG: _f_arg,
+        Source.ENV: _f_env,
+        Source.FILE: _f_file,
+        Source.PIPE: _read_stdin_bytes,
+        Source.CLIPBOARD: _f_clipboard,
+        Source.SIGNAL: _f_signal,
+    }
+
+    try:
+        reader = dispatch[source]
+    except KeyError as e:
+        msg = f"Unsupported source: {source}"
+        raise ValueError(msg) from e
+    return reader()
 
 
 def _open_textio(source: Source, name: str | None) -> TextIO:
@@ -115,15 +182,13 @@ def _open_bufferedio(source: Source, name: str | None) -> BinaryIO:
         return Path(raw).open("rb")
     if source == Source.CLIPBOARD:
         raw = read_clipboard()
-        tmp = persist_to_tempfile(raw.encode("utf-8"), mode="wb")
-        return tmp.open("rb")
+        return current_store().stream(raw.encode("utf-8"))
     if source == Source.SIGNAL:
         if name is None:
             msg = "Missing name for bufferedio signal source"
             raise ValueError(msg)
         raw = wait_for_signal(int(name))
-        tmp = persist_to_tempfile(raw.encode("utf-8"), mode="wb")
-        return tmp.open("rb")
+        return current_store().stream(raw.encode("utf-8"))
     msg = f"Unsupported source for bufferedio: {source}"
     raise ValueError(msg)
 
@@ -134,8 +199,11 @@ def _read_path(source: Source, name: str | None) -> Path:
         raise ValueError(msg)
 
     if source == Source.PIPE:
-        content = sys.stdin.read()
-        return persist_to_tempfile(content, mode="w")
+        buffer: BinaryIO | None = getattr(sys.stdin, "buffer", None)
+        if buffer is not None:
+            # Copied in chunks, so a large pipe never has to fit in memory
+            return current_store().path(buffer, suffix=".txt")
+        return persist_to_tempfile(sys.stdin.read(), mode="w")
     if source == Source.FILE:
         if name is None:
             msg = "Missing name for signal source"
@@ -154,21 +222,239 @@ def _read_path(source: Source, name: str | None) -> Path:
     raise ValueError(msg)
 
 
+def _map_fd(fd: int) -> memoryview:
+    # mmap rejects empty files, and an empty view behaves the same for callers
+    if os.fstat(fd).st_size == 0:
+        return memoryview(b"")
+    return memoryview(mmap.mmap(fd, 0, access=mmap.ACCESS_READ))
+
+
+def _map_file(path: Path) -> memoryview:
+    with path.open("rb") as f:
+        return _map_fd(f.fileno())
+
+
+def _map_spilled(data: bytes | BinaryIO) -> memoryview:
+    # The mapping keeps the pages alive after the spill file is closed
+    with current_store().file(data) as f:
+        return _map_fd(f.fileno())
+
+
+def _read_mmap(source: Source, name: str | None) -> memoryview:
+    """Map file-backed input read-only so it can be searched without a heap copy."""
+    if source in {Source.ARG, Source.ENV, Source.FILE, Source.SIGNAL} and name is None:
+        msg = f"Missing name for source '{source}'"
+        raise ValueError(msg)
+
+    if source == Source.FILE and name is not None:
+        return _map_file(Path(name))
+    if source in {Source.ENV, Source.ARG}:
+        return _map_file(Path(_read_str(source, name)))
+    if source == Source.PIPE:
+        fd = _stdin_fd()
+        if fd is not None and stat.S_ISREG(os.fstat(fd).st_mode):
+            # stdin redirected from a regular file: map it directly from the current
+            # position
+            return _map_fd(fd)[os.lseek(fd, 0, os.SEEK_CUR) :]
+        buffer: BinaryIO | None = getattr(sys.stdin, "buffer", None)
+        return _map_spilled(buffer if buffer is not None else _read_stdin_bytes())
+    if source == Source.CLIPBOARD:
+        return _map_spilled(read_clipboard().encode("utf-8"))
+    msg = f"Unsupported source for mmap: {source}"
+    raise ValueError(msg)
+
+
+def _drain_lines(stream: TextIO, *, close: bool) -> Iterator[str]:
+    try:
+        yield from stream
+    finally:
+        if close:
+            stream.close()
+
+
+def _drain_chunks(stream: BinaryIO, *, close: bool) -> Iterator[bytes]:
+    # read1 returns whatever is already buffered, so pipes yield data as it arrives
+    read = getattr(stream, "read1", stream.read)
+    try:
+        while chunk := read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        if close:
+            stream.close()
+
+
+def _iter_lines(source: Source, name: str | None) -> Iterator[str]:
+    if source == Source.CLIPBOARD_WATCH:
+        # One item per distinct clipboard value rather than per line
+        return (value.decode("utf-8") for value in watch_clipboard())
+    if source in {Source.PIPE, Source.FILE, Source.ENV, Source.ARG}:
+        stream = _open_textio(source, name)
+        return _drain_lines(stream, close=source is not Source.PIPE)
+    return iter(_read_str(source, name).splitlines(keepends=True))
+
+
+def _iter_chunks(source: Source, name: str | None) -> Iterator[bytes]:
+    if source == Source.CLIPBOARD_WATCH:
+        return watch_clipboard()
+    stream = _open_bufferedio(source, name)
+    return _drain_chunks(stream, close=source is not Source.PIPE)
+
+
+def _require_async(_source: Source, _name: str | None) -> InputData:
+    msg = "Input type 'stream' needs an async function to read its StreamReader"
+    raise ValueError(msg)
+
+
 _READERS: dict[TypeName, Reader] = {
     TypeName.STR: _read_str,
     TypeName.BYTES: _read_bytes,
     TypeName.TEXTIO: _open_textio,
     TypeName.BUFFEREDIO: _open_bufferedio,
     TypeName.PATH: _read_path,
+    TypeName.LINES: _iter_lines,
+    TypeName.CHUNKS: _iter_chunks,
+    TypeName.MMAP: _read_mmap,
+    TypeName.STREAM: _require_async,
 }
 
 
+def _read_decompressed(
+    source: Source,
+    name: str | None,
+    as_type: TypeName,
+    compression: Compression,
+) -> InputData:
+    # As without compression, str and bytes take an env/arg value itself, while
+    # the file-handle types treat it as a path
+    if as_type in {TypeName.STR, TypeName.BYTES} and source in {Source.ENV, Source.ARG}:
+        raw = cast("BinaryIO", io.BytesIO(_read_bytes(source, name)))
+    else:
+        raw = _open_bufferedio(source, name)
+    stream = decompress_stream(raw, compression)
+    close = source != Source.PIPE
+    owner = contextlib.closing(stream) if close else contextlib.nullcontext(stream)
+    match as_type:
+        case TypeName.BYTES:
+            with owner:
+                return stream.read()
+        case TypeName.STR:
+            with owner:
+                return io.TextIOWrapper(stream, encoding="utf-8").read()
+        case TypeName.BUFFEREDIO:
+            return stream
+        case TypeName.TEXTIO:
+            return io.TextIOWrapper(stream, encoding="utf-8")
+        case TypeName.LINES:
+            return _drain_lines(io.TextIOWrapper(stream, encoding="utf-8"), close=close)
+        case TypeName.CHUNKS:
+            return _drain_chunks(stream, close=close)
+        case TypeName.PATH:
+            with owner:
+                return current_store().path(stream)
+        case TypeName.MMAP:
+            with owner, current_store().file(stream) as f:
+                return _map_fd(f.fileno())
+        case _:
+            msg = f"Unsupported type for compressed input: {as_type}"
+            raise ValueError(msg)
+
+
+def _seekable_start(stream: BinaryIO) -> int | None:
+    # The current offset of a regular file, whose remaining size is known without
+    # reading; decompressors also report the file's descriptor, but not its
+    # decompressed size
+    if not isinstance(stream, io.BufferedReader | io.FileIO):
+        return None
+    try:
+        if stat.S_ISREG(os.fstat(stream.fileno()).st_mode):
+            return stream.tell()
+    except (OSError, ValueError, io.UnsupportedOperation):
+        pass
+    return None
+
+
+def read_bounded(
+    stream: BinaryIO,
+    *,
+    as_type: TypeName,
+    max_bytes: int,
+    on_oversize: Oversize = Oversize.FAIL,
+    close: bool = True,
+) -> str | bytes | TextIO | BinaryIO:
+    """
+    Read *stream* as ``str`` or ``bytes`` if it holds at most *max_bytes*.
+
+    Larger input raises ``ValueError`` with ``fail``. With ``spill`` it comes
+    back as a file object instead: a ``TextIO`` for ``str``, a ``BinaryIO``
+    for ``bytes``. A regular file is rewound and handed over as is, and other
+    streams are copied to a temporary file on disk. At most *max_bytes* + 1
+    bytes are ever held in memory. A regular file's size is checked before
+    anything is read.
+    """
+    start = _seekable_start(stream)
+    if start is None:
+        head = stream.read(max_bytes + 1)
+        oversized = len(head) > max_bytes
+    else:
+        head = b""
+        oversized = os.fstat(stream.fileno()).st_size - start > max_bytes
+    if not oversized:
+        with contextlib.closing(stream) if close else contextlib.nullcontext(stream):
+            data = head if start is None else stream.read()
+        return data if as_type == TypeName.BYTES else data.decode("utf-8")
+    if on_oversize == Oversize.FAIL:
+        if close:
+            stream.close()
+        msg = f"Input is larger than the {max_bytes}-byte limit"
+        raise ValueError(msg)
+    if start is not None:
+        _ = stream.seek(start)
+        spilled = stream
+    else:
+        spilled = current_store().overflow(head, stream)
+        if close:
+            stream.close()
+    if as_type == TypeName.BYTES:
+        return spilled
+    return io.TextIOWrapper(spilled, encoding="utf-8")
+
+
 def get_input(
     source: Source,
     *,
     name: str | None = None,
     as_type: TypeName = TypeName.STR,
-) -> str | bytes | TextIO | BinaryIO | Path:
+    compression: Compression = Compression.NONE,
+    max_bytes: int | None = None,
+    on_oversize: Oversize = Oversize.FAIL,
+) -> InputData:
+    """
+    Read input from *source* as *as_type*.
+
+    With *compression* other than ``none`` the raw bytes are decompressed as a
+    stream first (``auto`` detects gzip/bz2/xz by magic bytes), so the result
+    has the same type it would have for uncompressed input.
+
+    *max_bytes* caps how much file or pipe input is read into memory as
+    ``str`` or ``bytes``; see `read_bounded` for *on_oversize*.
+    """
+    in_memory = as_type in {TypeName.STR, TypeName.BYTES}
+    if max_bytes is not None and in_memory and source in {Source.FILE, Source.PIPE}:
+        stream = get_input(
+            source,
+            name=name,
+            as_type=TypeName.BUFFEREDIO,
+            compression=compression,
+        )
+        return read_bounded(
+            cast("BinaryIO", stream),
+            as_type=as_type,
+            max_bytes=max_bytes,
+            on_oversize=on_oversize,
+            close=source != Source.PIPE,
+        )
+    if compression != Compression.NONE:
+        return _read_decompressed(source, name, as_type, compression)
     try:
         reader = _READERS[as_type]
     except KeyError as err:
@@ -0,0 +1,151 @@
+import io
+import os
+import sys
+import time
+from collections.abc import Callable, Generator, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import cast
+
+__all__ = ("Metrics", "MetricsHook", "PhaseTiming", "measure")
+
+# Only imported when --metrics or a metrics hook is in use.
+
+type MetricsHook = Callable[["Metrics"], None]
+
+_MB = 1_000_000
+
+
+def measure(data: object) -> int | None:
+    """Size of *data* in bytes, without consuming it; None if not known up front."""
+    if isinstance(data, str):
+        # ASCII is one byte per character, which skips an encode of the whole payload
+        return len(data) if data.isascii() else len(data.encode("utf-8"))
+    if isinstance(data, bytes | bytearray):
+        return len(data)
+    if isinstance(data, memoryview):
+        return data.nbytes
+    if isinstance(data, Path):
+        return data.stat().st_size if data.is_file() else None
+    fileno = getattr(data, "fileno", None)
+    if fileno is None:
+        return None
+    try:
+        size = os.fstat(cast("Callable[[], int]", fileno)()).st_size
+    except (OSError, ValueError):
+        return None
+    if isinstance(data, io.TextIOBase):
+        # A text tell() is an opaque cookie, not a byte offset
+        return size
+    tell = cast("Callable[[], int]", getattr(data, "tell", lambda: 0))
+    try:
+        return max(size - tell(), 0)
+    except OSError:
+        return size
+
+
+def _measure_all(data: object) -> int | None:
+    # Lists and tuples of pieces are sized up front; other iterables are counted lazily
+    if isinstance(data, list | tuple):
+        items = cast("list[object] | tuple[object, ...]", data)
+        return sum(measure(item) or 0 for item in items)
+    return measure(data)
+
+
+@dataclass
+class PhaseTiming:
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+
+
+@dataclass
+class Metrics:
+    """
+    Wall and CPU time per phase plus payload bytes in and out for one command run.
+
+    Lazy inputs (``lines``, ``chunks``) and generator results are counted as the
+    function consumes or produces them, so their I/O time shows up under
+    ``call`` and ``write`` rather than ``read``.
+    """
+
+    labels: dict[str, str] = field(default_factory=dict)
+    phases: dict[str, PhaseTiming] = field(default_factory=dict)
+    bytes_in: int | None = None
+    bytes_out: int | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timing = self.phases.setdefault(name, PhaseTiming())
+            timing.wall_s += time.perf_counter() - wall
+            timing.cpu_s += time.process_time() - cpu
+
+    def _counted[T](self, items: Iterator[T], *, output: bool) -> Iterator[T]:
+        total = 0
+        for item in items:
+            total += measure(item) or 0
+            if output:
+                self.bytes_out = total
+            else:
+                self.bytes_in = total
+            yield item
+
+    def count_in[T](self, data: T) -> T:
+        """
+        Record the size of *data*.
+
+        Iterators (not file objects) are wrapped and counted as they are consumed.
+        """
+        if isinstance(data, Iterator) and not hasattr(data, "read"):
+            self.bytes_in = 0
+            return self._counted(data, output=False)
+        self.bytes_in = measure(data)
+        return data
+
+    def count_out[T](self, data: T) -> T:
+        """Like `count_in`, for the function's result."""
+        if isinstance(data, Iterator) and not hasattr(data, "read"):
+            self.bytes_out = 0
+            return self._counted(data, output=True)
+        self.bytes_out = _measure_all(data)
+        return data
+
+    def as_dict(self) -> dict[str, object]:
+        def rate(size: int | None, seconds: float) -> float | None:
+            if size is None or seconds <= 0:
+                return None
+            return round(size / seconds / _MB, 3)
+
+        def timing(t: PhaseTiming) -> dict[str, float]:
+            return {"wall_s": round(t.wall_s, 6), "cpu_s": round(t.cpu_s, 6)}
+
+        total = sum(t.wall_s for t in self.phases.values())
+        read = self.phases.get("read", PhaseTiming()).wall_s
+        write = self.phases.get("write", PhaseTiming()).wall_s
+        return {
+            **self.labels,
+            "phases": {name: timing(t) for name, t in self.phases.items()},
+            "wall_s": round(total, 6),
+            "cpu_s": round(sum(t.cpu_s for t in self.phases.values()), 6),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "read_mb_s": rate(self.bytes_in, read),
+            "write_mb_s": rate(self.bytes_out, write),
+            "mb_s": rate(self.bytes_in, total),
+        }
+
+    def emit(self, path: str | None = None) -> None:
+        """Write the metrics as one JSON line, appended to *path* or to stderr."""
+        import json  # noqa: PLC0415 # deferred: only emitting needs it
+
+        line = json.dumps(self.as_dict(), separators=(",", ":")) + "\n"
+        if path is None:
+            _ = sys.stderr.write(line)
+            _ = sys.stderr.flush()
+            return
+        with Path(path).open("a", encoding="utf-8") as f:
+            _ = f.write(line)
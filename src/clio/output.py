@@ -1,10 +1,33 @@
+import codecs
+import contextlib
+import io
 import os
+import stat
 import sys
+from collections.abc import Callable, Generator, Iterable, Iterator
 from enum import StrEnum
 from pathlib import Path
-from typing import BinaryIO, TextIO
+from typing import BinaryIO, TextIO, TypedDict, cast
 
 from .clipboard import write_clipboard
+from .compression import Compression, compress_stream, infer_compression
+from .fastcopy import copy_fd
+from .utils import CHUNK_SIZE
+
+type Buffer = bytes | bytearray | memoryview
+type Piece = str | Buffer
+type Stream = TextIO | BinaryIO
+type OutputData = str | Buffer | Path | Stream | Iterable[str] | Iterable[bytes]
+
+
+class WriteOptions(TypedDict, total=False):
+    """Keyword arguments of `write_output` beyond the destination, as one value."""
+
+    encoding: str
+    fsync: bool
+    buffer_size: int
+    compression: Compression
+    level: int | None
 
 
 class OutputDest(StrEnum):
@@ -14,18 +37,250 @@ class OutputDest(StrEnum):
     CLIPBOARD = "clipboard"
 
 
-def extract_data(data: str | bytes | Path | TextIO | BinaryIO, encoding: str = "utf-8") -> str:
-    if isinstance(data, str):
-        return data
-    if isinstance(data, bytes):
-        return data.decode(encoding)
+def _read_pieces(stream: TextIO | BinaryIO) -> Iterator[Piece]:
+    while piece := stream.read(CHUNK_SIZE):
+        yield piece
+
+
+def _read_file(path: Path) -> Iterator[bytes]:
+    with path.open("rb") as f:
+        while piece := f.read(CHUNK_SIZE):
+            yield piece
+
+
+def _check_pieces(pieces: Iterable[object]) -> Iterator[Piece]:
+    for piece in pieces:
+        if not isinstance(piece, str | bytes | bytearray | memoryview):
+            msg = f"Unsupported data type for output: {type(piece)}"
+            raise TypeError(msg)
+        yield piece
+
+
+def iter_pieces(data: OutputData) -> Iterator[Piece]:
+    """Return *data* as str or bytes pieces, without decoding or materializing it."""
+    if isinstance(data, str | bytes | bytearray | memoryview):
+        return iter((data,))  # pyright:ignore[reportReturnType]
     if isinstance(data, Path):
-        return data.read_text(encoding=encoding)
+        return _read_file(data)
     if hasattr(data, "read"):
-        raw = data.read()
-        return raw.decode(encoding) if isinstance(raw, bytes) else str(raw)
-    msg = f"Unsupported data type for output: {type(data)}"
-    raise TypeError(msg)
+        return _read_pieces(data)  # pyright:ignore[reportArgumentType]
+    if not isinstance(data, Iterable):  # pyright:ignore[reportUnnecessaryIsInstance]
+        kind = type(data)  # pyright:ignore[reportUnreachable]
+        msg = f"Unsupported data type for output: {kind}"
+        raise TypeError(msg)
+    return _check_pieces(data)
+
+
+def _decode_pieces(pieces: Iterable[Piece], encoding: str) -> Iterator[str]:
+    # Incremental decoding keeps multibyte characters intact across chunk boundaries
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for piece in pieces:
+        yield piece if isinstance(piece, str) else decoder.decode(piece)
+    if tail := decoder.decode(b"", final=True):
+        yield tail
+
+
+def iter_text(data: OutputData, encoding: str = "utf-8") -> Iterator[str]:
+    """Return *data* as an iterator of text pieces without materializing streams."""
+    return _decode_pieces(iter_pieces(data), encoding)
+
+
+def extract_data(data: OutputData, encoding: str = "utf-8") -> str:
+    return "".join(iter_text(data, encoding))
+
+
+def _to_bytes(piece: Piece, encoding: str) -> bytes:
+    return piece.encode(encoding) if isinstance(piece, str) else bytes(piece)
+
+
+def extract_bytes(data: OutputData, encoding: str = "utf-8") -> bytes:
+    return b"".join(_to_bytes(p, encoding) for p in iter_pieces(data))
+
+
+def _is_plain_file(data: object) -> bool:
+    # Compressed readers (GzipFile, BZ2File, LZMAFile) report the fd of the
+    # compressed file underneath
+    if isinstance(data, io.BufferedReader):
+        return isinstance(cast("io.BufferedReader[io.RawIOBase]", data).raw, io.FileIO)
+    return isinstance(data, io.FileIO)
+
+
+def _copy_fast(data: OutputData, sink: BinaryIO) -> bool:
+    """Copy a file-backed result into *sink* in the kernel; False if it cannot."""
+    if not isinstance(data, Path) and not _is_plain_file(data):
+        return False
+    try:
+        dst_fd = sink.fileno()
+    except (OSError, ValueError):
+        return False
+
+    if isinstance(data, Path):
+        sink.flush()
+        with data.open("rb", buffering=0) as src:
+            _ = copy_fd(src.fileno(), dst_fd)
+        return True
+
+    stream: BinaryIO = data  # pyright:ignore[reportAssignmentType]
+    try:
+        src_fd = stream.fileno()
+        is_pipe = stat.S_ISFIFO(os.fstat(src_fd).st_mode)
+        # tell() accounts for read-ahead buffered in Python, but fails on pipes
+        start = None if is_pipe else stream.tell()
+    except (OSError, ValueError):
+        return False
+    if start is None:
+        # Read-ahead cannot be seeked past on a pipe; it is written out first
+        # and splice takes the rest
+        peek: Callable[[int], bytes] | None = getattr(stream, "peek", None)
+        if peek is not None:
+            _ = sink.write(stream.read(len(peek(1))))
+        sink.flush()
+        _ = copy_fd(src_fd, dst_fd)
+        return True
+    sink.flush()
+    copied = copy_fd(src_fd, dst_fd, offset=start)
+    _ = stream.seek(start + copied)
+    return True
+
+
+def append_file(path: Path, sink: BinaryIO) -> None:
+    """Append the file at *path* to *sink*, in the kernel when *sink* has an fd."""
+    if not _copy_fast(path, sink):
+        for piece in _read_file(path):
+            _ = sink.write(piece)
+
+
+def _encode_pieces(
+    pieces: Iterable[Piece],
+    encoding: str,
+    chunk_size: int,
+) -> Iterator[Buffer]:
+    # Large strings are encoded a slice at the time so no full-size bytes copy is
+    # ever built; the incremental encoder keeps stateful codecs (BOMs, UTF-16)
+    # correct across slices
+    encoder = codecs.getincrementalencoder(encoding)()
+    for piece in pieces:
+        if not isinstance(piece, str):
+            yield piece
+            continue
+        for start in range(0, len(piece), chunk_size):
+            yield encoder.encode(piece[start : start + chunk_size])
+    if tail := encoder.encode("", final=True):
+        yield tail
+
+
+def iter_encoded(
+    data: OutputData,
+    encoding: str = "utf-8",
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Buffer]:
+    """Return *data* as encoded pieces; text is encoded *chunk_size* chars at a time."""
+    return _encode_pieces(iter_pieces(data), encoding, chunk_size)
+
+
+def _write_binary(
+    stream: BinaryIO,
+    pieces: Iterable[Piece],
+    encoding: str,
+    *,
+    flush: bool,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    for piece in _encode_pieces(pieces, encoding, chunk_size):
+        _ = stream.write(piece)
+        if flush:
+            stream.flush()
+
+
+def _fsync_dir(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def atomic_output(
+    path: str | Path,
+    *,
+    fsync: bool = False,
+    buffer_size: int = CHUNK_SIZE,
+) -> Generator[BinaryIO]:
+    """
+    Open *path* for binary writing; readers see the old file or all of the new one.
+
+    Data goes to a hidden sibling temp file that replaces *path* when the block
+    exits cleanly and is removed if it raises. An existing file keeps its
+    permission bits. With *fsync* the file and its directory are flushed to
+    stable storage before returning. Targets that are not regular files (FIFOs,
+    ``/dev/null``) cannot be replaced and are written in place.
+    """
+    target = Path(os.path.realpath(path))
+    try:
+        existing: os.stat_result | None = target.stat()
+    except FileNotFoundError:
+        existing = None
+    if existing is not None and not stat.S_ISREG(existing.st_mode):
+        with target.open("wb", buffering=buffer_size) as f:
+            yield f
+        return
+
+    tmp = target.with_name(f".{target.name}.{os.urandom(4).hex()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        if existing is not None:
+            os.fchmod(fd, stat.S_IMODE(existing.st_mode))
+        with os.fdopen(fd, "wb", buffering=buffer_size) as f:
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if fsync:
+        _fsync_dir(target.parent)
+
+
+def _write_stdout(
+    data: OutputData,
+    pieces: Iterable[Piece],
+    encoding: str,
+    *,
+    flush: bool,
+) -> None:
+    stdout: TextIO = sys.stdout
+    buffer: BinaryIO | None = getattr(stdout, "buffer", None)
+    if buffer is not None:
+        stdout.flush()
+        if _copy_fast(data, buffer):
+            return
+    if buffer is None:
+        # Text-only replacement stream (e.g. StringIO); decoding is unavoidable
+        for piece in _decode_pieces(pieces, encoding):
+            _ = stdout.write(piece)
+            if flush:
+                stdout.flush()
+        return
+
+    for piece in pieces:
+        if isinstance(piece, str):
+            _ = stdout.write(piece)
+        else:
+            # Drain pending text first so text and bytes keep their relative order
+            stdout.flush()
+            _ = buffer.write(piece)
+        if flush:
+            stdout.flush()
+            buffer.flush()
+
+
+def _is_streamed(data: OutputData) -> bool:
+    if isinstance(data, str | bytes | bytearray | memoryview | Path):
+        return False
+    return not hasattr(data, "read")
 
 
 def _require_name(name: str | None, dest: str) -> str:
@@ -35,28 +290,106 @@ def _require_name(name: str | None, dest: str) -> str:
     return name
 
 
-def write_output(
-    data: str | bytes | Path | TextIO | BinaryIO,
+def _write_compressed(  # noqa: PLR0913
+    pieces: Iterable[Piece],
+    *,
+    dest: OutputDest,
+    name: str | None,
+    encoding: str,
+    compression: Compression,
+    level: int | None,
+    fsync: bool,
+    buffer_size: int,
+    flush: bool,
+) -> None:
+    path = _require_name(name, "file") if dest == OutputDest.FILE else "-"
+    if path != "-":
+        with (
+            atomic_output(path, fsync=fsync, buffer_size=buffer_size) as f,
+            compress_stream(f, compression, level) as z,
+        ):
+            _write_binary(z, pieces, encoding, flush=False, chunk_size=buffer_size)
+        return
+    if dest not in {OutputDest.FILE, OutputDest.PIPE}:
+        msg = f"Compressed output is not supported for {dest}"
+        raise ValueError(msg)
+    buffer: BinaryIO | None = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        msg = "Compressed output needs a binary stdout"
+        raise ValueError(msg)
+    _ = sys.stdout.flush()
+    with compress_stream(buffer, compression, level) as z:
+        # A flush on the compressor emits a sync point, so streamed output reaches
+        # readers early
+        _write_binary(z, pieces, encoding, flush=flush, chunk_size=buffer_size)
+    buffer.flush()
+
+
+def write_output(  # noqa: PLR0913
+    data: OutputData,
     *,
     dest: OutputDest,
     name: str | None = None,
     encoding: str = "utf-8",
+    fsync: bool = False,
+    buffer_size: int = CHUNK_SIZE,
+    compression: Compression = Compression.NONE,
+    level: int | None = None,
 ) -> None:
-    data_str = extract_data(data, encoding)
+    """
+    Write *data* to *dest*.
+
+    File output is atomic (see `atomic_output`) and written in *buffer_size*
+    chunks; *fsync* makes it durable before returning. *compression* gzip/bz2/xz
+    compresses file or pipe output on the fly at *level*; ``auto`` picks the
+    format from the output file suffix.
+    """
+    # Iterators are drained piece by piece and flushed so consumers see output
+    # early
+    flush = _is_streamed(data)
+    pieces = iter_pieces(data)
+
+    if compression == Compression.AUTO:
+        compression = infer_compression(name if dest == OutputDest.FILE else None)
+    if compression != Compression.NONE:
+        _write_compressed(
+            pieces,
+            dest=dest,
+            name=name,
+            encoding=encoding,
+            compression=compression,
+            level=level,
+            fsync=fsync,
+            buffer_size=buffer_size,
+            flush=flush,
+        )
+        return
 
     match dest:
         case OutputDest.ENV:
-            os.environ[_require_name(name, "env var")] = data_str
+            text = "".join(_decode_pieces(pieces, encoding))
+            os.environ[_require_name(name, "env var")] = text
         case OutputDest.FILE:
             path = _require_name(name, "file")
             if path == "-":
-                _ = sys.stdout.write(data_str)
+                _write_stdout(data, pieces, encoding, flush=flush)
             else:
-                _ = Path(path).write_text(data_str, encoding=encoding)
+                with atomic_output(path, fsync=fsync, buffer_size=buffer_size) as f:
+                    if not _copy_fast(data, f):
+                        # Nothing is visible before the rename, so per-piece flushes
+                        # would be wasted
+                        _write_binary(
+                            f,
+                            pieces,
+                            encoding,
+                            flush=False,
+                            chunk_size=buffer_size,
+                        )
         case OutputDest.PIPE:
-            _ = sys.stdout.write(data_str)
+            _write_stdout(data, pieces, encoding, flush=flush)
         case OutputDest.CLIPBOARD:
-            write_clipboard(data_str)
+            # Chunks go straight to the helper's stdin instead of being joined first
+            write_clipboard((_to_bytes(p, encoding) for p in pieces), encoding)
         case _:  # pyright:ignore[reportUnnecessaryComparison]
             msg = f"Unsupported output destination: {dest}"  # pyright:ignore[reportUnreachable]
             raise ValueError(msg)
@@ -0,0 +1,115 @@
+import importlib
+import sys
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import cache
+from typing import TYPE_CHECKING, cast
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+# concurrent.futures and multiprocessing are imported on use: they cost more
+# than the rest of clio put together, and only parallel modes need them.
+
+__all__ = ("FunctionRef", "PoolKind", "imap", "make_executor")
+
+
+class PoolKind(StrEnum):
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+@dataclass(frozen=True)
+class FunctionRef:
+    """
+    Picklable handle to a module-level function.
+
+    `command_with_io` replaces the decorated function with a `click.Command`
+    under the same name, so the function itself cannot be pickled by
+    reference. Workers re-import the module and unwrap the command instead.
+    """
+
+    module: str
+    qualname: str
+
+    @classmethod
+    def of(cls, func: Callable[..., object]) -> "FunctionRef":
+        if "<" in func.__qualname__:
+            name = func.__qualname__
+            msg = f"{name} must be defined at module level to run in a process pool"
+            raise ValueError(msg)
+        return cls(func.__module__, func.__qualname__)
+
+    def resolve(self) -> Callable[..., object]:
+        return _resolve(self.module, self.qualname)
+
+
+@cache
+def _resolve(module: str, qualname: str) -> Callable[..., object]:
+    obj: object = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = cast("object", getattr(obj, part))
+    obj = cast("object", getattr(obj, "callback", None)) or obj
+    while (inner := cast("object", getattr(obj, "__wrapped__", None))) is not None:
+        obj = inner
+    if not callable(obj):
+        msg = f"{module}.{qualname} is not callable"
+        raise TypeError(msg)
+    return obj
+
+
+def make_executor(jobs: int, kind: PoolKind) -> "Executor":
+    from concurrent.futures import (  # noqa: PLC0415
+        ProcessPoolExecutor,
+        ThreadPoolExecutor,
+    )
+
+    if kind is PoolKind.THREAD:
+        return ThreadPoolExecutor(max_workers=jobs)
+    import multiprocessing  # noqa: PLC0415
+
+    # fork keeps the parent's imports warm; other platforms use their safe default
+    context = multiprocessing.get_context("fork") if sys.platform == "linux" else None
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=context)
+
+
+def imap[T, R](
+    executor: "Executor",
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    window: int,
+    ordered: bool = True,
+) -> Iterator[tuple[T, "Future[R]"]]:
+    """
+    Yield ``(item, future)`` pairs as tasks finish, with at most *window* in flight.
+
+    Items are pulled lazily, so input can still be arriving while early results
+    are consumed. Futures are yielded done; callers handle per-item exceptions.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait  # noqa: PLC0415
+
+    pending: deque[tuple[T, Future[R]]] = deque()
+    source = iter(items)
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < window:
+            try:
+                item = next(source)
+            except StopIteration:
+                exhausted = True
+                break
+            pending.append((item, executor.submit(fn, item)))
+        if not pending:
+            return
+        if ordered:
+            item, future = pending.popleft()
+            _ = wait([future])
+            yield item, future
+            continue
+        done, _ = wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+        for entry in [e for e in pending if e[1] in done]:
+            pending.remove(entry)
+            yield entry
@@ -0,0 +1,104 @@
+import cProfile
+import linecache
+import tracemalloc
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+__all__ = ("MemoryProfile", "PhaseAllocations", "cpu_profile")
+
+# Only imported when --profile-out or --memprofile-out is given.
+
+TOP_N = 10
+# Frames kept per allocation; one is enough to name the allocating line
+_FRAMES = 1
+
+_IGNORED = (
+    tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+    tracemalloc.Filter(inclusive=False, filename_pattern=linecache.__file__),
+    tracemalloc.Filter(
+        inclusive=False,
+        filename_pattern="<frozen importlib._bootstrap*>",
+    ),
+    tracemalloc.Filter(inclusive=False, filename_pattern="<unknown>"),
+)
+
+
+@contextmanager
+def cpu_profile(path: str | Path) -> Generator[cProfile.Profile]:
+    """Profile the block with cProfile and dump pstats to *path*, even if it raises."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+@dataclass
+class PhaseAllocations:
+    name: str
+    peak_bytes: int
+    top: list[tracemalloc.StatisticDiff]
+
+
+@dataclass
+class MemoryProfile:
+    """
+    Per-phase tracemalloc capture: the peak traced memory during each phase and
+    the *top_n* source lines whose retained allocations grew the most.
+
+    Memory allocated before `start` is not traced, so the report only covers
+    what the command itself allocates.
+    """
+
+    top_n: int = TOP_N
+    phases: list[PhaseAllocations] = field(default_factory=list)
+    _owns_tracing: bool = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(_FRAMES)
+            self._owns_tracing = True
+
+    def stop(self) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None]:
+        if not tracemalloc.is_tracing():
+            yield
+            return
+        before = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            grown = [d for d in after.compare_to(before, "lineno") if d.size_diff > 0]
+            top = grown[: self.top_n]
+            self.phases.append(PhaseAllocations(name, peak, top))
+
+    def report(self) -> str:
+        lines: list[str] = []
+        for phase in self.phases:
+            lines.append(f"== {phase.name}: peak {_format_size(phase.peak_bytes)}")
+            lines.extend(f"  {rank}. {stat}" for rank, stat in enumerate(phase.top, 1))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str | Path) -> None:
+        _ = Path(path).write_text(self.report(), encoding="utf-8")
+
+
+def _format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:  # noqa: PLR2004
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
@@ -0,0 +1,303 @@
+import io
+import mmap
+import os
+import tempfile
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import partial
+from itertools import pairwise
+from pathlib import Path
+from typing import BinaryIO, Unpack, cast, override
+
+from .batch import BatchItem, format_output_name
+from .compression import Compression, infer_compression
+from .input import InputData, TypeName
+from .output import (
+    OutputData,
+    OutputDest,
+    WriteOptions,
+    append_file,
+    atomic_output,
+    resolve_output_path,
+    write_output,
+)
+from .pool import FunctionRef, PoolKind, imap, make_executor
+from .records import DEFAULT_BATCH_SIZE, RecordFormat, RecordFunc, map_records
+from .utils import CHUNK_SIZE
+
+__all__ = ("open_range", "run_ranges", "split_ranges")
+
+# Only imported when --ranges is in use.
+
+# Ranges queued per worker; finished ranges wait on disk until their turn
+_WINDOW_PER_JOB = 2
+
+_SCAN_SIZE = 1 << 16
+
+
+def _next_boundary(f: BinaryIO, offset: int, delimiter: bytes, size: int) -> int:
+    # The first position at or after offset where a record starts
+    if offset == 0:
+        return 0
+    _ = f.seek(offset - 1)
+    while chunk := f.read(_SCAN_SIZE):
+        if (found := chunk.find(delimiter)) >= 0:
+            return f.tell() - len(chunk) + found + 1
+    return size
+
+
+def split_ranges(
+    path: str | Path,
+    parts: int,
+    *,
+    delimiter: bytes = b"\n",
+) -> list[tuple[int, int]]:
+    """
+    Split the file at *path* into at most *parts* ``(start, end)`` byte ranges.
+
+    Every range starts right after a *delimiter* (or at 0), so no record is cut
+    in two. Only the bytes around each cut are read; empty ranges are dropped.
+    """
+    size = Path(path).stat().st_size
+    cuts = [0]
+    with Path(path).open("rb") as f:
+        for i in range(1, parts):
+            offset = max(size * i // parts, cuts[-1])
+            cuts.append(_next_boundary(f, offset, delimiter, size))
+    cuts.append(size)
+    return [(start, end) for start, end in pairwise(cuts) if end > start]
+
+
+class _RangeReader(io.RawIOBase):
+    """Raw reader over bytes ``[start, end)`` of a file, using positional reads."""
+
+    def __init__(self, path: str | Path, start: int, end: int) -> None:
+        super().__init__()
+        self._fd: int = os.open(path, os.O_RDONLY)
+        self._pos: int = start
+        self._end: int = end
+
+    @override
+    def readable(self) -> bool:
+        return True
+
+    @override
+    def readinto(  # pyright:ignore[reportIncompatibleMethodOverride]
+        self,
+        buffer: "memoryview | bytearray",
+    ) -> int:
+        want = min(len(buffer), self._end - self._pos)
+        if want <= 0:
+            return 0
+        n = os.preadv(self._fd, [memoryview(buffer)[:want]], self._pos)
+        self._pos += n
+        return n
+
+    @override
+    def close(self) -> None:
+        if not self.closed:
+            os.close(self._fd)
+        super().close()
+
+
+def open_range(path: str | Path, start: int, end: int) -> BinaryIO:
+    """Open bytes ``[start, end)`` of *path* as a buffered binary stream."""
+    raw = _RangeReader(path, start, end)
+    return cast("BinaryIO", io.BufferedReader(raw, CHUNK_SIZE))
+
+
+def _drain_chunks(stream: BinaryIO) -> Iterator[bytes]:
+    with stream:
+        while chunk := stream.read(CHUNK_SIZE):
+            yield chunk
+
+
+def _drain_lines(stream: BinaryIO) -> Iterator[str]:
+    with io.TextIOWrapper(stream, encoding="utf-8") as text:
+        yield from text
+
+
+def _read_range(path: str, start: int, end: int, as_type: TypeName) -> InputData:
+    if as_type == TypeName.MMAP:
+        # One shared read-only mapping; the view is just this worker's slice of it
+        with Path(path).open("rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mapped)[start:end]
+    stream = open_range(path, start, end)
+    match as_type:
+        case TypeName.BUFFEREDIO:
+            return stream
+        case TypeName.TEXTIO:
+            return io.TextIOWrapper(stream, encoding="utf-8")
+        case TypeName.LINES:
+            return _drain_lines(stream)
+        case TypeName.CHUNKS:
+            return _drain_chunks(stream)
+        case TypeName.BYTES:
+            with stream:
+                return stream.read()
+        case _:
+            with stream:
+                return stream.read().decode("utf-8")
+
+
+@dataclass(frozen=True)
+class _RangeJob:
+    func: Callable[..., object] | FunctionRef
+    path: str
+    as_type: TypeName
+    records: RecordFormat | None
+    batch_size: int
+    shard_name: str | None
+    spill_dir: str | None
+    force: bool
+    write_options: WriteOptions
+
+
+def _map_range(
+    func: RecordFunc,
+    stream: BinaryIO,
+    records: RecordFormat,
+    *,
+    batch_size: int,
+) -> Iterator[bytes]:
+    # map_records leaves the stream open; this one belongs to the range
+    with stream:
+        yield from map_records(func, stream, records, batch_size=batch_size)
+
+
+def _run_range(job: _RangeJob, span: tuple[int, tuple[int, int]]) -> str | None:
+    index, (start, end) = span
+    func = job.func.resolve() if isinstance(job.func, FunctionRef) else job.func
+    if job.records is not None:
+        stream = open_range(job.path, start, end)
+        result: OutputData = _map_range(
+            cast("RecordFunc", func),
+            stream,
+            job.records,
+            batch_size=job.batch_size,
+        )
+    else:
+        data = _read_range(job.path, start, end, job.as_type)
+        result = func(data)  # pyright:ignore[reportAssignmentType]
+    if job.shard_name is not None:
+        name = format_output_name(job.shard_name, BatchItem(index, job.path))
+        path = resolve_output_path(name, force=job.force)
+        write_output(result, dest=OutputDest.FILE, name=str(path), **job.write_options)
+        return None
+    # Concatenated output goes to a temp file that the parent copies, in range
+    # order, so no range's output is ever held in memory or pickled
+    spilled = str(Path(cast("str", job.spill_dir)) / f"{index}.out")
+    write_output(result, dest=OutputDest.FILE, name=spilled, **job.write_options)
+    return spilled
+
+
+def _concat_files(
+    paths: Iterator[str],
+    *,
+    dest: OutputDest,
+    output_name: str,
+    options: WriteOptions,
+) -> None:
+    # Each file is copied in the kernel where possible and deleted once copied
+    if dest == OutputDest.PIPE or output_name == "-":
+        encoding = options.get("encoding", "utf-8")
+        for path in paths:
+            write_output(Path(path), dest=OutputDest.PIPE, encoding=encoding)
+            Path(path).unlink()
+        return
+    fsync = options.get("fsync", False)
+    buffer_size = options.get("buffer_size", CHUNK_SIZE)
+    with atomic_output(output_name, fsync=fsync, buffer_size=buffer_size) as f:
+        for path in paths:
+            append_file(Path(path), f)
+            Path(path).unlink()
+
+
+def run_ranges(  # noqa: PLR0913
+    func: Callable[..., OutputData],
+    path: str,
+    *,
+    parts: int,
+    jobs: int = 1,
+    pool: PoolKind = PoolKind.PROCESS,
+    as_type: TypeName = TypeName.STR,
+    records: RecordFormat | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dest: OutputDest = OutputDest.PIPE,
+    output_name: str = "-",
+    force: bool = False,
+    **write_options: Unpack[WriteOptions],
+) -> None:
+    """
+    Run *func* on *parts* record-aligned byte ranges of the file at *path*.
+
+    Each worker reads only its own range (positional reads, or a slice of a
+    shared mapping for ``mmap``). Outputs are concatenated in range order to
+    *dest*, or, when *output_name* is a file template such as
+    ``{stem}.{index}.out``, each range writes its own shard. With *records*,
+    each range is parsed and mapped in batches like `clio.records.map_records`.
+    Any failing range stops the run.
+    """
+    if dest not in {OutputDest.FILE, OutputDest.PIPE}:
+        msg = f"Byte ranges support file and pipe output, not {dest}"
+        raise ValueError(msg)
+    if records == RecordFormat.CSV:
+        msg = "CSV records can contain newlines, so they cannot be split into ranges"
+        raise ValueError(msg)
+    if records is None and as_type in {TypeName.PATH, TypeName.STREAM}:
+        msg = f"Input type '{as_type}' cannot be split into byte ranges"
+        raise ValueError(msg)
+
+    is_template = format_output_name(output_name, BatchItem(0, path)) != output_name
+    if dest == OutputDest.FILE and output_name != "-" and not is_template:
+        # Checked before any range is processed
+        output_name = str(resolve_output_path(output_name, force=force))
+    kind = pool if jobs > 1 else PoolKind.THREAD
+    shard_name = output_name if dest == OutputDest.FILE and is_template else None
+    range_options: WriteOptions = write_options
+    if shard_name is None:
+        # Each range is compressed on its own; gzip, bz2 and xz readers accept the
+        # concatenated members. The final name decides what auto means.
+        compression = write_options.get("compression", Compression.NONE)
+        if compression == Compression.AUTO:
+            named = output_name if dest == OutputDest.FILE else None
+            compression = infer_compression(named)
+        range_options = {**write_options, "compression": compression, "fsync": False}
+    delimiter = b"\0" if records == RecordFormat.NUL else b"\n"
+    spans = enumerate(split_ranges(path, parts, delimiter=delimiter))
+
+    with (
+        tempfile.TemporaryDirectory(prefix="clio-ranges-") as spill_dir,
+        make_executor(jobs, kind) as executor,
+    ):
+        job = _RangeJob(
+            func=FunctionRef.of(func) if kind is PoolKind.PROCESS else func,
+            path=path,
+            as_type=as_type,
+            records=records,
+            batch_size=batch_size,
+            shard_name=shard_name,
+            spill_dir=spill_dir if shard_name is None else None,
+            force=force,
+            write_options=range_options,
+        )
+        run = partial(_run_range, job)
+        try:
+            results = imap(executor, run, spans, window=jobs * _WINDOW_PER_JOB)
+            # result() re-raises a failed range; shards return nothing to copy
+            outputs = (future.result() for _, future in results)
+            spilled = (output for output in outputs if output is not None)
+            if shard_name is None:
+                _concat_files(
+                    spilled,
+                    dest=dest,
+                    output_name=output_name,
+                    options=write_options,
+                )
+            else:
+                for _ in spilled:
+                    pass
+        except BaseException:
+            executor.shutdown(cancel_futures=True)
+            raise
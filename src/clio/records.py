@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from collections.abc import Callable, Iterable, Iterator
+from enum import StrEnum
+from functools import cache, partial
+from itertools import batched
+from typing import BinaryIO, cast
+
+from .pool import FunctionRef, PoolKind, imap, make_executor
+
+__all__ = ("RecordFormat", "RecordFunc", "dump_records", "iter_records", "map_records")
+
+# Only imported when --records is in use.
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Batches queued per worker; with --batch-size this bounds the records held in memory
+_WINDOW_PER_JOB = 4
+
+# NUL-separated input is read in blocks of this size and split in place
+_BLOCK_SIZE = 1 << 16
+
+type Record = object
+type RecordFunc = Callable[[list[Record]], Iterable[Record]]
+
+
+class RecordFormat(StrEnum):
+    LINES = "lines"
+    NDJSON = "ndjson"
+    CSV = "csv"
+    NUL = "nul"
+
+
+@cache
+def _json_backend() -> tuple[Callable[[bytes], object], Callable[[object], bytes]]:
+    # orjson parses and serializes several times faster; the stdlib is the fallback
+    try:
+        import orjson  # noqa: PLC0415 # deferred: optional accelerator
+    except ImportError:
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        return json.loads, lambda record: encode(record).encode()
+    loads = cast("Callable[[bytes], object]", orjson.loads)
+    return loads, cast("Callable[[object], bytes]", orjson.dumps)
+
+
+def _iter_lines(stream: BinaryIO) -> Iterator[str]:
+    # Only the newline is framing; a \r before it is part of the record
+    for line in stream:
+        yield line.removesuffix(b"\n").decode("utf-8")
+
+
+def _iter_ndjson(stream: BinaryIO) -> Iterator[object]:
+    loads = _json_backend()[0]
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield loads(line)
+        except ValueError as err:
+            msg = f"Record on line {number} is not valid JSON: {err}"
+            raise ValueError(msg) from err
+
+
+def _iter_csv(stream: BinaryIO) -> Iterator[list[str]]:
+    # newline="" lets the csv module handle quoted newlines itself
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        # Detached, so the caller's stream outlives the wrapper
+        _ = text.detach()
+
+
+def _iter_nul(stream: BinaryIO) -> Iterator[str]:
+    rest = b""
+    while block := stream.read(_BLOCK_SIZE):
+        *records, rest = (rest + block).split(b"\0")
+        for record in records:
+            yield record.decode("utf-8")
+    if rest:
+        yield rest.decode("utf-8")
+
+
+def iter_records(stream: BinaryIO, record_format: RecordFormat) -> Iterator[Record]:
+    """
+    Parse *stream* lazily into records of *record_format*.
+
+    ``lines`` and ``nul`` yield strings without their terminator, ``ndjson``
+    yields parsed JSON values (blank lines are skipped) and ``csv`` yields rows
+    as lists of strings. A ``\r`` before a line's newline is kept. The stream
+    is left open for the caller to close.
+    """
+    match record_format:
+        case RecordFormat.LINES:
+            return _iter_lines(stream)
+        case RecordFormat.NDJSON:
+            return _iter_ndjson(stream)
+        case RecordFormat.CSV:
+            return _iter_csv(stream)
+        case RecordFormat.NUL:
+            return _iter_nul(stream)
+
+
+def _text(record: Record) -> str:
+    if isinstance(record, bytes | bytearray):
+        return record.decode("utf-8")
+    return record if isinstance(record, str) else str(record)
+
+
+def dump_records(records: Iterable[Record], record_format: RecordFormat) -> bytes:
+    """Serialize *records* in *record_format*, each one terminated, as one block."""
+    match record_format:
+        case RecordFormat.LINES:
+            return "".join(f"{_text(r)}\n" for r in records).encode("utf-8")
+        case RecordFormat.NUL:
+            return "".join(f"{_text(r)}\0" for r in records).encode("utf-8")
+        case RecordFormat.NDJSON:
+            dumps = _json_backend()[1]
+            return b"".join(dumps(r) + b"\n" for r in records)
+        case RecordFormat.CSV:
+            buffer = io.StringIO()
+            rows = cast("Iterable[Iterable[object]]", records)
+            csv.writer(buffer, lineterminator="\n").writerows(rows)
+            return buffer.getvalue().encode("utf-8")
+
+
+def _call_batch(
+    func: RecordFunc | FunctionRef,
+    record_format: RecordFormat,
+    batch: list[Record],
+) -> bytes:
+    # Runs in a worker for --jobs > 1, so the records are serialized there too
+    if isinstance(func, FunctionRef):
+        func = cast("RecordFunc", func.resolve())
+    result = cast("object", func(batch))  # a plain function may return anything
+    if isinstance(result, str | bytes) or not isinstance(result, Iterable):
+        kind = type(result).__name__
+        msg = f"A record function must return an iterable of records, not {kind}"
+        raise TypeError(msg)
+    return dump_records(result, record_format)
+
+
+def map_records(  # noqa: PLR0913
+    func: RecordFunc,
+    stream: BinaryIO,
+    record_format: RecordFormat,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    jobs: int = 1,
+    pool: PoolKind = PoolKind.PROCESS,
+    ordered: bool = True,
+) -> Iterator[bytes]:
+    """
+    Call *func* with lists of up to *batch_size* records parsed from *stream*.
+
+    *func* returns the output records for each batch (any number of them, so
+    it can map, filter or expand), which are serialized back in the same
+    framing. One block of output is yielded per batch, so the result streams.
+
+    With *jobs* > 1, batches go to a *pool* of workers, at most a few per
+    worker in flight, and blocks are yielded in input order unless *ordered*
+    is false. Parsing continues while earlier batches are being processed. A
+    process pool needs *func* to be defined at module level.
+    """
+    records = iter_records(stream, record_format)
+    batches = (list(batch) for batch in batched(records, batch_size))
+    if jobs == 1:
+        for batch in batches:
+            if block := _call_batch(func, record_format, batch):
+                yield block
+        return
+
+    target = FunctionRef.of(func) if pool is PoolKind.PROCESS else func
+    executor = make_executor(jobs, pool)
+    try:
+        call = partial(_call_batch, target, record_format)
+        window = jobs * _WINDOW_PER_JOB
+        for _, future in imap(executor, call, batches, window=window, ordered=ordered):
+            if block := future.result():
+                yield block
+    finally:
+        # A failed batch or a closed output stops the run; queued batches are
+        # dropped
+        executor.shutdown(cancel_futures=True)
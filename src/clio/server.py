@@ -0,0 +1,253 @@
+import contextlib
+import importlib
+import json
+import os
+import signal
+import socket
+import sys
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import cast
+
+import click
+
+__all__ = ("serve",)
+
+# Wire format, shared with clio.client:
+#   request: 4-byte big-endian length + JSON {"command", "argv", "env", "cwd"},
+#            with the client's stdin, stdout and stderr attached via SCM_RIGHTS
+#   reply:   4-byte pid of the process running the command, then a 4-byte exit status
+#            (128 + N when signal N killed it)
+_HEADER = 4
+_FDS = 3
+_ACCEPT_TIMEOUT = 1.0
+# A client that connects but never sends its request gives up its process after this
+# long
+_REQUEST_TIMEOUT = 5.0
+
+
+def _recv_exact(conn: socket.socket, size: int, head: bytes = b"") -> bytes:
+    data = bytearray(head)
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            msg = "Client closed the connection mid-request"
+            raise ConnectionError(msg)
+        data += chunk
+    return bytes(data)
+
+
+@dataclass(frozen=True)
+class _Request:
+    command: str
+    argv: list[str]
+    env: dict[str, str]
+    cwd: str
+
+
+def _recv_request(conn: socket.socket) -> tuple[_Request, list[int]]:
+    received = socket.recv_fds(conn, 1 << 16, _FDS)
+    data, fds = received[0], received[1]
+    data = _recv_exact(conn, _HEADER, data) if len(data) < _HEADER else data
+    size = int.from_bytes(data[:_HEADER])
+    body = _recv_exact(conn, _HEADER + size, data)[_HEADER:]
+    if len(fds) != _FDS:
+        for fd in fds:
+            os.close(fd)
+        msg = f"Expected {_FDS} file descriptors, got {len(fds)}"
+        raise ConnectionError(msg)
+    fields = cast("dict[str, object]", json.loads(body))
+    env = cast("dict[object, object]", fields["env"])
+    request = _Request(
+        command=str(fields["command"]),
+        argv=[str(a) for a in cast("list[object]", fields["argv"])],
+        env={str(k): str(v) for k, v in env.items()},
+        cwd=str(fields["cwd"]),
+    )
+    return request, fds
+
+
+def _run_child(command: click.Command, request: _Request) -> int:
+    os.environ.clear()
+    os.environ.update(request.env)
+    os.chdir(request.cwd)
+    # --input-source arg indexes sys.argv, so it must look like a direct invocation
+    sys.argv = [request.command, *request.argv]
+    code = 0
+    try:
+        command.main(args=request.argv, prog_name=request.command, standalone_mode=True)
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+    except BaseException:  # noqa: BLE001 # report like an uncaught exception would
+        import traceback  # noqa: PLC0415
+
+        traceback.print_exc()
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        with contextlib.suppress(OSError, ValueError):
+            _ = stream.flush()
+    return code
+
+
+def _serve_one(
+    conn: socket.socket,
+    listener: socket.socket,
+    commands: Mapping[str, click.Command],
+) -> None:
+    for stream in (sys.stdout, sys.stderr):
+        _ = stream.flush()
+    if os.fork():
+        return
+
+    # Child: a fresh copy of the warm interpreter; the request is read here, so a
+    # slow or silent client never holds up the server's accept loop
+    code = 1
+    reported = False
+    try:
+        listener.close()
+        _ = signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        conn.settimeout(_REQUEST_TIMEOUT)
+        try:
+            request, fds = _recv_request(conn)
+        except (ConnectionError, TimeoutError, ValueError, KeyError) as err:
+            click.echo(f"Error: bad request: {err}", err=True)
+            return
+        conn.settimeout(None)
+        # The client's stdin/stdout/stderr become ours: no bytes are relayed through
+        # the socket
+        for target, fd in enumerate(fds):
+            _ = os.dup2(fd, target)
+            os.close(fd)
+        worker = os.fork()
+        if not worker:
+            conn.close()
+            os._exit(_run_worker(commands, request))
+        # This process only reports: the client forwards its signals to the
+        # worker's pid, and learns its exit status even when a signal killed it
+        conn.sendall(worker.to_bytes(_HEADER))
+        reported = True
+        code = os.waitstatus_to_exitcode(os.waitpid(worker, 0)[1])
+        code = 128 - code if code < 0 else code
+    finally:
+        if reported:
+            with contextlib.suppress(OSError):
+                _ = conn.sendall(code.to_bytes(_HEADER, signed=True))
+        os._exit(code)
+
+
+def _run_worker(commands: Mapping[str, click.Command], request: _Request) -> int:
+    command = commands.get(request.command)
+    if command is None:
+        serving = ", ".join(sorted(commands))
+        msg = f"Error: no command named {request.command!r} (serving: {serving})\n"
+        _ = sys.stderr.write(msg)
+        return 2
+    return _run_child(command, request)
+
+
+def _reap() -> None:
+    with contextlib.suppress(ChildProcessError):
+        while os.waitpid(-1, os.WNOHANG)[0]:
+            pass
+
+
+def _bind(path: Path) -> socket.socket:
+    if path.is_socket():
+        # A live server answers; a stale socket file from a crashed one refuses the
+        # connection
+        with socket.socket(socket.AF_UNIX) as probe:
+            try:
+                probe.connect(str(path))
+            except ConnectionRefusedError:
+                path.unlink()
+            else:
+                msg = f"A server is already listening on {path}"
+                raise RuntimeError(msg)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # The socket file is created owner-only, so no other user can connect even briefly
+    umask = os.umask(0o177)
+    try:
+        listener.bind(str(path))
+    finally:
+        _ = os.umask(umask)
+    listener.listen()
+    return listener
+
+
+def serve(
+    commands: click.Command | Mapping[str, click.Command],
+    socket_path: str | Path,
+    *,
+    on_ready: Callable[[], None] | None = None,
+) -> None:
+    """
+    Serve *commands* (by name) on a Unix socket until SIGINT or SIGTERM.
+
+    Each request is handled in a process forked from this already-warm one,
+    running the command with the client's argv, environment, working directory
+    and file descriptors, so it behaves as if the command had been run directly
+    and its state never leaks between requests. `clio.client` is the matching
+    client.
+    """
+    if isinstance(commands, click.Command):
+        commands = {commands.name or "main": commands}
+    path = Path(socket_path)
+    listener = _bind(path)
+    listener.settimeout(_ACCEPT_TIMEOUT)
+
+    def stop(_signum: int, _frame: object) -> None:
+        raise SystemExit(0)
+
+    previous = signal.signal(signal.SIGTERM, stop)
+    try:
+        if on_ready is not None:
+            on_ready()
+        while True:
+            _reap()
+            try:
+                conn = listener.accept()[0]
+            except TimeoutError:
+                continue
+            with conn:
+                _serve_one(conn, listener, commands)
+    finally:
+        _ = signal.signal(signal.SIGTERM, previous)
+        listener.close()
+        path.unlink(missing_ok=True)
+
+
+def _load(spec: str) -> tuple[str, click.Command]:
+    name, sep, target = spec.partition("=")
+    if not sep:
+        name, target = "", spec
+    module_name, _, attr = target.partition(":")
+    if not attr:
+        msg = f"Expected module:command, got {target!r}"
+        raise click.BadParameter(msg)
+    command = cast("object", getattr(importlib.import_module(module_name), attr))
+    if not isinstance(command, click.Command):
+        msg = f"{target} is not a click command"
+        raise click.BadParameter(msg)
+    return name or command.name or attr, command
+
+
+@click.command()
+@click.argument("socket_path", type=click.Path(dir_okay=False))
+@click.argument("specs", nargs=-1, required=True)
+def main(socket_path: str, specs: tuple[str, ...]) -> None:
+    """
+    Load the commands named by SPECS ([NAME=]module:command) once and serve them
+    on SOCKET_PATH.
+    """
+    commands = dict(_load(spec) for spec in specs)
+    names = ", ".join(sorted(commands))
+    serve(
+        commands,
+        socket_path,
+        on_ready=lambda: click.echo(f"Serving {names} on {socket_path}", err=True),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,81 @@
 import signal
 import threading
+from collections import deque
+from collections.abc import Callable, Generator, Iterable
+from contextlib import closing
 
+__all__ = ("iter_signals", "parse_signal", "wait_for_signal")
 
-def wait_for_signal(signum: int) -> str:
-    received = threading.Event()
-    signal_name: list[str] = []
+# Signals that end `iter_signals` cleanly unless they are triggers themselves
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def parse_signal(name: str) -> signal.Signals:
+    """Accept ``SIGUSR1``, ``usr1`` or ``10``."""
+    text = name.strip().upper()
+    try:
+        if text.isdigit():
+            return signal.Signals(int(text))
+        return signal.Signals[text if text.startswith("SIG") else f"SIG{text}"]
+    except (KeyError, ValueError) as err:
+        msg = f"Unknown signal: {name}"
+        raise ValueError(msg) from err
+
+
+def iter_signals(
+    signums: Iterable[int],
+    *,
+    stop_on: Iterable[int] = STOP_SIGNALS,
+    on_ready: Callable[[], None] | None = None,
+) -> Generator[str]:
+    """
+    Yield the name of each trigger signal as it arrives.
 
-    def handler(signum_: int, _frame: object) -> None:
-        signal_name.append(signal.Signals(signum_).name)
-        received.set()
+    Signals that arrive while the consumer is busy are coalesced: each distinct
+    signal is yielded at most once per wake-up. Any *stop_on* signal that is not
+    also a trigger ends iteration. The original handlers are restored when the
+    iterator finishes or is closed. *on_ready* runs once the handlers are
+    installed, e.g. to announce that the process can be signalled.
+    """
+    triggers = [signal.Signals(s) for s in signums]
+    pending: deque[signal.Signals] = deque()
+    ready = threading.Event()
+    stopped = threading.Event()
 
-    _ = signal.signal(signum, handler)
-    _ = received.wait()
-    return signal_name[0]
+    def on_trigger(signum: int, _frame: object) -> None:
+        pending.append(signal.Signals(signum))
+        ready.set()
+
+    def on_stop(_signum: int, _frame: object) -> None:
+        stopped.set()
+        ready.set()
+
+    previous = {s: signal.signal(s, on_trigger) for s in triggers}
+    for s in stop_on:
+        if s not in previous:
+            previous[signal.Signals(s)] = signal.signal(s, on_stop)
+    try:
+        if on_ready is not None:
+            on_ready()
+        while True:
+            _ = ready.wait()
+            ready.clear()
+            # Handlers only ever append, so draining with popleft cannot lose a signal
+            batch: dict[signal.Signals, None] = {}
+            while pending:
+                batch[pending.popleft()] = None
+            for signum in batch:
+                if stopped.is_set():
+                    return
+                yield signum.name
+            if stopped.is_set():
+                return
+    finally:
+        for s, handler in previous.items():
+            if handler is not None:
+                _ = signal.signal(s, handler)
+
+
+def wait_for_signal(signum: int) -> str:
+    with closing(iter_signals([signum], stop_on=())) as signals:
+        return next(signals)
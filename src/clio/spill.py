@@ -0,0 +1,213 @@
+import contextlib
+import io
+import os
+from collections.abc import Callable, Generator
+from contextvars import ContextVar
+from functools import cache
+from pathlib import Path
+from typing import BinaryIO
+
+__all__ = ("SpillStore", "current_store", "spill_scope")
+
+# Payloads below this stay in a BytesIO when no file descriptor is needed
+SPOOL_LIMIT = 1 << 20
+# Payloads up to this size go to RAM-backed storage (memfd or /dev/shm); larger
+# ones to disk
+RAM_LIMIT = 1 << 28
+
+_COPY_CHUNK = 1 << 16
+
+_SHM = Path("/dev/shm")  # noqa: S108 # tmpfs mount, not a predictable temp path
+
+
+@cache
+def _ram_dir() -> Path | None:
+    return _SHM if _SHM.is_dir() and os.access(_SHM, os.W_OK | os.X_OK) else None
+
+
+def _copy_stream(src: BinaryIO, dst: BinaryIO) -> None:
+    import shutil  # noqa: PLC0415 # deferred: only spilling needs it
+
+    shutil.copyfileobj(src, dst)
+
+
+def _copy_up_to(src: BinaryIO, dst: BinaryIO, limit: int) -> bytes:
+    # Copies at most *limit* bytes and returns what was read beyond them (b"" once
+    # *src* ended)
+    written = 0
+    while chunk := src.read(_COPY_CHUNK):
+        if written + len(chunk) > limit:
+            keep = limit - written
+            _ = dst.write(chunk[:keep])
+            return chunk[keep:]
+        _ = dst.write(chunk)
+        written += len(chunk)
+    return b""
+
+
+def _move_to(src: BinaryIO, dst: BinaryIO, extra: bytes, rest: BinaryIO) -> None:
+    # Copies what *src* holds so far, then *extra* and the remainder of *rest*, into
+    # *dst*
+    _ = src.seek(0)
+    _copy_stream(src, dst)
+    _ = dst.write(extra)
+    _copy_stream(rest, dst)
+
+
+class SpillStore:
+    """
+    Owner of the temporary copies made when input has to become a file.
+
+    Small payloads stay in memory, mid-sized ones live in RAM (``memfd_create``
+    or ``/dev/shm``), and only payloads above *ram_limit* touch the disk.
+    Everything a store hands out is released together by `release`, or on
+    leaving a ``with`` block.
+    """
+
+    def __init__(
+        self,
+        *,
+        spool_limit: int = SPOOL_LIMIT,
+        ram_limit: int = RAM_LIMIT,
+    ) -> None:
+        self.spool_limit: int = spool_limit
+        self.ram_limit: int = ram_limit
+        self._paths: list[Path] = []
+        self._files: list[BinaryIO] = []
+
+    def __enter__(self) -> "SpillStore":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.release()
+
+    @staticmethod
+    def _ram_file() -> BinaryIO | None:
+        import tempfile  # noqa: PLC0415 # deferred: only spilling needs it
+
+        # memfd_create is Linux-only; its default flags already include MFD_CLOEXEC
+        memfd_create: Callable[[str], int] | None = getattr(os, "memfd_create", None)
+        if memfd_create is not None:
+            with contextlib.suppress(OSError):
+                return os.fdopen(memfd_create("clio-spill"), "w+b")
+        if (ram_dir := _ram_dir()) is not None:
+            return tempfile.TemporaryFile(dir=ram_dir)
+        return None
+
+    def _anonymous_file(self, size: int) -> BinaryIO:
+        import tempfile  # noqa: PLC0415 # deferred: only spilling needs it
+
+        if size <= self.ram_limit and (f := self._ram_file()) is not None:
+            return f
+        return tempfile.TemporaryFile()
+
+    def _spool(self, data: BinaryIO) -> BinaryIO:
+        # Stream size is unknown up front: fill RAM up to ram_limit, then move
+        # everything to disk. Files are owned by the store until release.
+        import tempfile  # noqa: PLC0415 # deferred: only spilling needs it
+
+        if (f := self._ram_file()) is None:
+            f = tempfile.TemporaryFile()  # noqa: SIM115
+            _copy_stream(data, f)
+            return f
+        if extra := _copy_up_to(data, f, self.ram_limit):
+            with f:
+                disk = tempfile.TemporaryFile()  # noqa: SIM115
+                _move_to(f, disk, extra, data)
+            return disk
+        return f
+
+    def _track(self, f: BinaryIO) -> None:
+        # Callers often close a file right away (e.g. after mapping it), so closed
+        # handles are dropped instead of piling up in a long-lived store
+        self._files = [kept for kept in self._files if not kept.closed]
+        self._files.append(f)
+
+    def file(self, data: bytes | BinaryIO) -> BinaryIO:
+        """Return a readable binary file with a real file descriptor holding *data*."""
+        if isinstance(data, bytes):
+            f = self._anonymous_file(len(data))
+            _ = f.write(data)
+        else:
+            f = self._spool(data)
+        _ = f.seek(0)
+        self._track(f)
+        return f
+
+    def overflow(self, head: bytes, rest: BinaryIO) -> BinaryIO:
+        """Return a disk-backed file holding *head* followed by the rest of *rest*."""
+        import tempfile  # noqa: PLC0415 # deferred: only spilling needs it
+
+        # Input over a memory ceiling must not land in RAM-backed storage either
+        f = tempfile.TemporaryFile()  # noqa: SIM115 # owned by the store until release
+        _ = f.write(head)
+        _copy_stream(rest, f)
+        _ = f.seek(0)
+        self._track(f)
+        return f
+
+    def stream(self, data: bytes) -> BinaryIO:
+        """Return a readable binary stream of *data*; small ones stay on the heap."""
+        if len(data) < self.spool_limit:
+            return io.BytesIO(data)
+        return self.file(data)
+
+    def path(self, data: str | bytes | BinaryIO, *, suffix: str = "") -> Path:
+        """Write *data* to a named file (str is UTF-8 encoded) and return its path."""
+        import tempfile  # noqa: PLC0415 # deferred: only spilling needs it
+
+        raw = data.encode("utf-8") if isinstance(data, str) else data
+        # A stream starts in RAM too, and moves to disk once it outgrows ram_limit
+        size = len(raw) if isinstance(raw, bytes) else 0
+        directory = _ram_dir() if size <= self.ram_limit else None
+        fd, name = tempfile.mkstemp(suffix=suffix, prefix="clio-", dir=directory)
+        path = Path(name).resolve()
+        self._paths.append(path)
+        with os.fdopen(fd, "w+b") as f:
+            if isinstance(raw, bytes):
+                _ = f.write(raw)
+            elif directory is None:
+                _copy_stream(raw, f)
+            elif extra := _copy_up_to(raw, f, self.ram_limit):
+                fd, name = tempfile.mkstemp(suffix=suffix, prefix="clio-")
+                with os.fdopen(fd, "wb") as disk:
+                    _move_to(f, disk, extra, raw)
+                path.unlink()
+                path = self._paths[-1] = Path(name).resolve()
+        return path
+
+    def release(self) -> None:
+        """Delete every file this store created and close every stream it handed out."""
+        while self._files:
+            self._files.pop().close()
+        while self._paths:
+            self._paths.pop().unlink(missing_ok=True)
+
+
+_current: ContextVar[SpillStore | None] = ContextVar("clio_spill_store", default=None)
+_process_store: SpillStore | None = None
+
+
+def current_store() -> SpillStore:
+    """Return the store of the innermost `spill_scope`, or the process-wide store."""
+    global _process_store  # noqa: PLW0603 # created lazily so `import clio` stays cheap
+    if (store := _current.get()) is not None:
+        return store
+    if _process_store is None:
+        import atexit  # noqa: PLC0415 # deferred: keeps `import clio` cheap
+
+        _process_store = SpillStore()
+        # One hook for the whole process instead of one per spilled file
+        _ = atexit.register(_process_store.release)
+    return _process_store
+
+
+@contextlib.contextmanager
+def spill_scope() -> Generator[SpillStore]:
+    """Route spills inside the block to a fresh store that is released on exit."""
+    with SpillStore() as store:
+        token = _current.set(store)
+        try:
+            yield store
+        finally:
+            _current.reset(token)
@@ -0,0 +1,148 @@
+import threading
+from collections import deque
+from collections.abc import Iterator, Sequence
+from functools import partial
+from typing import Unpack, cast
+
+from .output import (
+    Buffer,
+    OutputData,
+    OutputDest,
+    WriteOptions,
+    iter_encoded,
+    write_output,
+)
+from .utils import CHUNK_SIZE
+
+__all__ = ("TEE_BUFFER_SIZE", "write_outputs")
+
+# Bytes a sink may fall behind before the producer (and so every other sink) waits
+# for it
+TEE_BUFFER_SIZE = 1 << 24
+
+
+class _Aborted(Exception):  # noqa: N818 # internal control flow, never surfaces
+    """Raised in a sink when the producer failed, so partial files are not committed."""
+
+
+class _Sink:
+    """One destination fed through a bounded in-memory buffer by its own thread."""
+
+    def __init__(self, dest: OutputDest, name: str | None, limit: int) -> None:
+        self.dest: OutputDest = dest
+        self.name: str | None = name
+        self.error: BaseException | None = None
+        self._limit: int = limit
+        self._pieces: deque[Buffer] = deque()
+        self._size: int = 0
+        self._done: bool = False
+        self._aborted: bool = False
+        self._cond: threading.Condition = threading.Condition()
+
+    def put(self, piece: Buffer) -> None:
+        with self._cond:
+            while not self._has_room(len(piece)) and self.error is None:
+                _ = self._cond.wait()
+            if self.error is None:
+                self._pieces.append(piece)
+                self._size += len(piece)
+                self._cond.notify_all()
+
+    def _has_room(self, size: int) -> bool:
+        # An empty buffer always takes the next piece, so oversized pieces cannot
+        # deadlock
+        return not self._size or self._size + size <= self._limit
+
+    def finish(self, *, aborted: bool = False) -> None:
+        with self._cond:
+            self._done = True
+            self._aborted = aborted
+            self._cond.notify_all()
+
+    def _drain(self) -> Iterator[Buffer]:
+        while True:
+            with self._cond:
+                while not self._pieces and not self._done:
+                    _ = self._cond.wait()
+                if self._aborted:
+                    raise _Aborted
+                if not self._pieces:
+                    return
+                piece = self._pieces.popleft()
+                self._size -= len(piece)
+                self._cond.notify_all()
+            yield piece
+
+    def run(self, options: WriteOptions) -> None:
+        try:
+            pieces = cast("OutputData", self._drain())
+            write_output(pieces, dest=self.dest, name=self.name, **options)
+        except _Aborted:
+            pass
+        except BaseException as err:  # noqa: BLE001 # handed to the producer thread
+            with self._cond:
+                self.error = err
+                self._pieces.clear()
+                self._size = 0
+                self._cond.notify_all()
+
+
+def _slices(pieces: Iterator[Buffer], size: int) -> Iterator[Buffer]:
+    # Large pieces are handed out as zero-copy views so buffer limits stay meaningful
+    for piece in pieces:
+        if len(piece) <= size:
+            yield piece
+            continue
+        view = memoryview(piece)
+        for start in range(0, len(view), size):
+            yield view[start : start + size]
+
+
+def write_outputs(
+    data: OutputData,
+    targets: Sequence[tuple[OutputDest, str | None]],
+    *,
+    max_buffered: int = TEE_BUFFER_SIZE,
+    **options: Unpack[WriteOptions],
+) -> None:
+    """
+    Write *data* to every ``(dest, name)`` in *targets* in a single pass, like ``tee``.
+
+    The result is read and encoded once; each destination is written by its own
+    thread from a buffer of at most *max_buffered* bytes, so a slow sink only
+    holds the others back once its buffer is full. Streamed results reach each
+    sink as they are produced. If the result raises, no file target is
+    replaced; if a sink fails, the others still finish and its error is raised.
+    """
+    if len(targets) == 1:
+        [(dest, name)] = targets
+        write_output(data, dest=dest, name=name, **options)
+        return
+
+    encoding = options.get("encoding", "utf-8")
+    chunk_size = options.get("buffer_size", CHUNK_SIZE)
+    sinks = [_Sink(dest, name, max_buffered) for dest, name in targets]
+    new_thread = partial(threading.Thread, args=(options,), daemon=True)
+    threads = [new_thread(target=sink.run) for sink in sinks]
+    for thread in threads:
+        thread.start()
+    try:
+        for piece in _slices(iter_encoded(data, encoding, chunk_size), chunk_size):
+            live = [sink for sink in sinks if sink.error is None]
+            if not live:
+                break
+            for sink in live:
+                sink.put(piece)
+    except BaseException:
+        for sink in sinks:
+            sink.finish(aborted=True)
+        for thread in threads:
+            thread.join()
+        raise
+    for sink in sinks:
+        sink.finish()
+    for thread in threads:
+        thread.join()
+    for sink in sinks:
+        if sink.error is not None:
+            raise sink.error
@@ -1,9 +1,18 @@
-import atexit
 import contextlib
-import tempfile
+from contextlib import AbstractContextManager
 from pathlib import Path
 from typing import Literal
 
+# Read/write granularity for streamed I/O
+CHUNK_SIZE = 1 << 16
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+def no_phase(_name: str) -> AbstractContextManager[None]:
+    """Phase tracker that records nothing, for runs without metrics or profiling."""
+    return _NO_PHASE
+
 
 def persist_to_tempfile(
     data: str | bytes,
@@ -11,21 +20,9 @@ def persist_to_tempfile(
     mode: Literal["w", "wb"] = "w",
     suffix: str = "",
 ) -> Path:
-    """Write data to a temp file and return its path."""
-    ext = ".bin" if "b" in mode else ".txt"
-    with tempfile.NamedTemporaryFile(
-        delete=False,
-        mode=mode,
-        suffix=suffix or ext,
-        encoding="utf-8" if mode == "w" else None,
-    ) as f:
-        _ = f.write(data)
-        f.flush()
-        temp_path = Path(f.name).resolve()
-
-    def _cleanup(path: Path) -> None:
-        with contextlib.suppress(FileNotFoundError):
-            path.unlink()
+    """Write data to a temp file owned by the current spill store; return its path."""
+    # Deferred: keeps `import clio` cheap
+    from .spill import current_store  # noqa: PLC0415
 
-    _ = atexit.register(_cleanup, temp_path)
-    return temp_path
+    ext = ".bin" if "b" in mode else ".txt"
+    return current_store().path(data, suffix=suffix or ext)
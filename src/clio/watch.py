@@ -0,0 +1,266 @@
+import contextlib
+import ctypes
+import io
+import json
+import os
+import select
+import sys
+import time
+from collections.abc import Generator, Sequence
+from pathlib import Path
+from typing import BinaryIO, cast
+
+from .compression import Compression, compress_stream, infer_compression
+from .input import InputData, TypeName
+from .output import OutputData, OutputDest, WriteOptions, iter_encoded, write_output
+from .utils import CHUNK_SIZE
+
+__all__ = ("FileTail", "append_output", "as_input")
+
+# Only imported when --watch is in use.
+
+# Largest block handed to the function at once, so a long backlog is processed in
+# steps
+MAX_BLOCK = 1 << 24
+DEFAULT_INTERVAL = 1.0
+
+# inotify(7) event bits: any change to a directory entry or file contents wakes the
+# watcher
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_ENTRY = _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_IN_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_ENTRY
+
+type Ident = tuple[int, int]
+
+
+class _Inotify:
+    """Directory watch through libc's inotify; `open` returns None without it."""
+
+    def __init__(self, fd: int) -> None:
+        self._fd: int = fd
+
+    @classmethod
+    def open(cls, directory: Path) -> "_Inotify | None":
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = cast("int", libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC))
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        # The directory, not the file: rotation replaces the file under the same name
+        path = os.fsencode(directory)
+        watch = cast("int", libc.inotify_add_watch(fd, path, _IN_MASK))
+        if watch < 0:
+            os.close(fd)
+            return None
+        return cls(fd)
+
+    def wait(self, timeout: float) -> None:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if readable:
+            # The events themselves do not matter; the file is re-examined after any
+            # of them
+            with contextlib.suppress(BlockingIOError):
+                while os.read(self._fd, 1 << 16):
+                    pass
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class FileTail:
+    """
+    Follow a growing file like ``tail -F``, yielding only newly appended bytes.
+
+    Blocks end at the last newline they contain, so a half-written last line
+    waits for the rest (only a `MAX_BLOCK`-byte line is cut without one). Truncation
+    restarts from the beginning of the file. After a rotation (the name now
+    points at a new file), whatever remains of the old file is delivered first.
+    Changes are noticed through inotify where available and by polling every
+    *interval* seconds otherwise.
+
+    With a *checkpoint* path, `commit` records the position reached, and a new
+    `FileTail` on the same file resumes from it rather than from the start.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        checkpoint: str | Path | None = None,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        self.path: Path = Path(path)
+        self.checkpoint: Path | None = None if checkpoint is None else Path(checkpoint)
+        self.interval: float = interval
+        self.offset: int = 0
+        self._fd: int | None = None
+        self._ident: Ident | None = None
+        self._resume: tuple[Ident, int] | None = self._load()
+
+    def _load(self) -> tuple[Ident, int] | None:
+        if self.checkpoint is None or not self.checkpoint.exists():
+            return None
+        text = self.checkpoint.read_text(encoding="utf-8")
+        state = cast("dict[str, int]", json.loads(text))
+        return (state["device"], state["inode"]), state["offset"]
+
+    def commit(self) -> None:
+        """Save the position after the last block handed out, atomically via rename."""
+        if self.checkpoint is None or self._ident is None:
+            return
+        state = {
+            "path": str(self.path),
+            "device": self._ident[0],
+            "inode": self._ident[1],
+            "offset": self.offset,
+        }
+        temp = self.checkpoint.with_name(f".{self.checkpoint.name}.tmp")
+        _ = temp.write_text(json.dumps(state), encoding="utf-8")
+        _ = temp.replace(self.checkpoint)
+
+    def _stat(self) -> os.stat_result | None:
+        try:
+            return self.path.stat()
+        except FileNotFoundError:
+            return None
+
+    def _open(self) -> None:
+        try:
+            fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        except FileNotFoundError:
+            return
+        self._close()
+        self._fd = fd
+        st = os.fstat(fd)
+        self._ident = (st.st_dev, st.st_ino)
+        self.offset = 0
+        if self._resume is not None:
+            ident, offset = self._resume
+            self._resume = None
+            if ident == self._ident and offset <= st.st_size:
+                self.offset = offset
+
+    def _close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _read(self, *, final: bool) -> bytes:
+        if self._fd is None:
+            return b""
+        size = os.fstat(self._fd).st_size
+        if size < self.offset:
+            # Truncated in place (copytruncate, or `: > file`): start over
+            self.offset = 0
+        data = os.pread(self._fd, min(size - self.offset, MAX_BLOCK), self.offset)
+        full = len(data) == MAX_BLOCK
+        if end := data.rfind(b"\n") + 1:
+            # The whole rest of a rotated file is delivered, even without a final
+            # newline
+            if full or not final:
+                data = data[:end]
+        elif not full and not final:
+            # Only part of a line so far: wait for the rest
+            data = b""
+        self.offset += len(data)
+        return data
+
+    def read_available(self) -> bytes:
+        """Return the next block of appended bytes, or ``b""`` if there is none yet."""
+        st = self._stat()
+        if self._fd is None:
+            if st is not None:
+                self._open()
+            return self._read(final=False)
+        if st is None or (st.st_dev, st.st_ino) != self._ident:
+            # Rotated or removed: finish the old file before switching
+            if block := self._read(final=True):
+                return block
+            if st is None:
+                return b""
+            self._open()
+        return self._read(final=False)
+
+    def blocks(self) -> Generator[bytes]:
+        """Yield appended blocks forever, waiting for changes in between."""
+        inotify = _Inotify.open(self.path.parent)
+        try:
+            while True:
+                if block := self.read_available():
+                    yield block
+                elif inotify is not None:
+                    # The timeout also covers filesystems that do not report changes
+                    inotify.wait(self.interval)
+                else:
+                    time.sleep(self.interval)
+        finally:
+            if inotify is not None:
+                inotify.close()
+            self._close()
+
+
+def as_input(block: bytes, as_type: TypeName) -> InputData:
+    """Present one appended *block* as *as_type*."""
+    match as_type:
+        case TypeName.BYTES:
+            return block
+        case TypeName.STR:
+            return block.decode("utf-8")
+        case TypeName.LINES:
+            return iter(block.decode("utf-8").splitlines(keepends=True))
+        case TypeName.CHUNKS:
+            return iter((block,))
+        case TypeName.BUFFEREDIO:
+            return io.BytesIO(block)
+        case TypeName.TEXTIO:
+            return io.TextIOWrapper(io.BytesIO(block), encoding="utf-8")
+        case _:
+            msg = f"Input type '{as_type}' is not available in watch mode"
+            raise ValueError(msg)
+
+
+def _append_file(data: OutputData, name: str, options: WriteOptions) -> None:
+    compression = options.get("compression", Compression.NONE)
+    if compression == Compression.AUTO:
+        compression = infer_compression(name)
+    chunk_size = options.get("buffer_size", CHUNK_SIZE)
+    with Path(name).open("ab") as f:
+        sink: BinaryIO = f
+        if compression != Compression.NONE:
+            # Each append is a complete member; gzip, bz2 and xz readers accept
+            # concatenated members
+            sink = compress_stream(f, compression, options.get("level"))
+        encoding = options.get("encoding", "utf-8")
+        with sink if sink is not f else contextlib.nullcontext():
+            for piece in iter_encoded(data, encoding, chunk_size):
+                _ = sink.write(piece)
+        if options.get("fsync", False):
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def append_output(
+    data: OutputData,
+    targets: Sequence[tuple[OutputDest, str]],
+    options: WriteOptions,
+) -> None:
+    """Append *data* to a file target or the pipe; the rest would overwrite."""
+    [(dest, name)] = targets
+    match dest:
+        case OutputDest.FILE:
+            _append_file(data, name, options)
+        case OutputDest.PIPE:
+            write_output(data, dest=OutputDest.PIPE, **options)
+        case _:
+            msg = f"Watch mode appends to file or pipe output, not {dest}"
+            raise ValueError(msg)
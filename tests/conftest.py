@@ -3,6 +3,8 @@ from pathlib import Path
 
 import pytest
 
+from clio.clipboard import BACKEND_ENV, detect_backend
+
 MAX_OUTPUT_LINES = 32
 MAX_TIME_PER_TEST = 2
 
@@ -27,6 +29,15 @@ def pytest_runtest_logreport(report: pytest.TestReport) -> None:
         report.sections = new_sections
 
 
+@pytest.fixture(autouse=True)
+def _pyperclip_backend(monkeypatch):
+    """Route clipboard access through (mockable) pyperclip unless a test picks a helper backend."""
+    monkeypatch.setenv(BACKEND_ENV, "pyperclip")
+    detect_backend.cache_clear()
+    yield
+    detect_backend.cache_clear()
+
+
 @pytest.fixture
 def temp_text_file():
     with tempfile.NamedTemporaryFile("w+", delete=False, encoding="utf-8") as f:
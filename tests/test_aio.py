@@ -0,0 +1,148 @@
+import asyncio
+import gzip
+import os
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from clio.aio import get_input_async, write_output_async
+from clio.click_utils import command_with_io
+from clio.input import Source, TypeName
+
+
+@command_with_io
+async def shout(text):
+    await asyncio.sleep(0)
+    return text.upper()
+
+
+@command_with_io
+async def count_lines(reader):
+    return f"{sum([1 async for _ in reader])}\n"
+
+
+@command_with_io
+async def numbered(reader):
+    n = 0
+    async for line in reader:
+        n += 1
+        yield f"{n}:".encode() + line
+
+
+@command_with_io
+def sync_echo(data):
+    return data
+
+
+SCRIPT = """
+import sys
+from clio.click_utils import command_with_io
+
+@command_with_io
+async def numbered(reader):
+    async for line in reader:
+        yield b"> " + line
+
+numbered(sys.argv[1:])
+"""
+
+
+def test_async_function_pipe_to_pipe():
+    result = CliRunner().invoke(shout, [], input="hello")
+    assert result.exit_code == 0, result.output
+    assert result.output == "HELLO"
+
+
+def test_stream_input_type():
+    result = CliRunner().invoke(count_lines, ["--input-type", "stream"], input="a\nb\nc\n")
+    assert result.exit_code == 0, result.output
+    assert result.output == "3\n"
+
+
+def test_async_generator_to_file(tmp_path):
+    src = tmp_path / "in.txt"
+    out = tmp_path / "out.txt"
+    src.write_text("x\ny\n")
+    result = CliRunner().invoke(
+        numbered,
+        [
+            "--input-source", "file",
+            "--input-name", str(src),
+            "--input-type", "stream",
+            "--output-dest", "file",
+            "--output-name", str(out),
+        ],
+    )  # fmt: skip
+    assert result.exit_code == 0, result.output
+    assert out.read_text() == "1:x\n2:y\n"
+
+
+def test_async_generator_to_compressed_file(tmp_path):
+    out = tmp_path / "out.txt.gz"
+    args = ["--input-type", "stream", "--output-dest", "file", "--output-name", str(out)]
+    result = CliRunner().invoke(numbered, [*args, "--output-compression", "auto"], input="x\ny\n")
+    assert result.exit_code == 0, result.output
+    assert gzip.decompress(out.read_bytes()) == b"1:x\n2:y\n"
+
+    # The --force check comes before any input is read
+    again = CliRunner().invoke(numbered, args, input="x\n")
+    assert again.exit_code != 0
+    assert "exists" in again.output
+    assert gzip.decompress(out.read_bytes()) == b"1:x\n2:y\n"
+
+
+def test_stream_requires_async_function():
+    result = CliRunner().invoke(sync_echo, ["--input-type", "stream"], input="x")
+    assert result.exit_code != 0
+    assert "needs an async function" in result.output
+
+
+def test_async_rejects_batch():
+    result = CliRunner().invoke(shout, ["--batch", "--input-name", "x"])
+    assert result.exit_code != 0
+    assert "--batch requires a synchronous function" in result.output
+
+
+def test_async_generator_to_env(monkeypatch):
+    async def pieces():
+        yield "ab"
+        yield b"cd"
+
+    monkeypatch.delenv("CLIO_AIO_OUT", raising=False)
+    asyncio.run(write_output_async(pieces(), dest="env", name="CLIO_AIO_OUT"))
+    assert os.environ["CLIO_AIO_OUT"] == "abcd"
+
+
+def test_stream_from_env_path(tmp_path, monkeypatch):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"\x00\x01\x02")
+    monkeypatch.setenv("CLIO_AIO_IN", str(path))
+
+    async def read_all():
+        reader = await get_input_async(Source.ENV, name="CLIO_AIO_IN", as_type=TypeName.STREAM)
+        return await reader.read()
+
+    assert asyncio.run(read_all()) == b"\x00\x01\x02"
+
+
+def test_real_pipes_use_event_loop_transports():
+    # A genuine OS pipe on both ends exercises connect_read_pipe / connect_write_pipe
+    proc = subprocess.run(
+        [sys.executable, "-c", SCRIPT, "--input-type", "stream"],
+        input=b"one\ntwo\n",
+        capture_output=True,
+        check=True,
+    )
+    assert proc.stdout == b"> one\n> two\n"
+
+
+def test_async_metrics():
+    import json
+
+    result = CliRunner().invoke(shout, ["--metrics"], input="hi")
+    assert result.exit_code == 0
+    assert result.stdout == "HI"
+    record = json.loads(result.stderr)
+    assert {"read", "call", "write"} <= set(record["phases"])
+    assert record["bytes_in"] == 2
@@ -0,0 +1,111 @@
+import io
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from clio.batch import BatchItem, expand_names, format_output_name
+from clio.click_utils import command_with_io
+
+
+@command_with_io
+def shout(text):
+    if text.startswith("bad"):
+        msg = "refusing bad input"
+        raise ValueError(msg)
+    return text.upper()
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    for name, text in [("a.txt", "alpha"), ("b.txt", "beta"), ("c.txt", "gamma")]:
+        (tmp_path / name).write_text(text)
+    return tmp_path
+
+
+def test_expand_names_glob_and_manifest(inputs, monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("one\n\n two \n"))
+    names = list(expand_names([str(inputs / "*.txt"), "-"], source="file"))
+    assert names == [str(inputs / n) for n in ("a.txt", "b.txt", "c.txt")] + ["one", "two"]
+
+
+def test_expand_names_keeps_unmatched_glob(tmp_path):
+    pattern = str(tmp_path / "*.none")
+    assert list(expand_names([pattern], source="file")) == [pattern]
+
+
+def test_format_output_name():
+    item = BatchItem(3, "/data/logs/app.log")
+    assert format_output_name("{parent}/{stem}.{index}{suffix}", item) == "/data/logs/app.3.log"
+    with pytest.raises(ValueError, match=r"Unknown placeholder \{nope\}"):
+        format_output_name("{nope}", item)
+
+
+@pytest.mark.parametrize("pool", ["thread", "process"])
+def test_batch_files_to_templated_files(inputs, pool):
+    runner = CliRunner()
+    result = runner.invoke(
+        shout,
+        [
+            "--batch",
+            "--input-source", "file",
+            "--input-name", str(inputs / "*.txt"),
+            "--output-dest", "file",
+            "--output-name", str(inputs / "{stem}.out"),
+            "--jobs", "2",
+            "--pool", pool,
+        ],
+    )  # fmt: skip
+    assert result.exit_code == 0, result.output
+    assert (inputs / "a.out").read_text() == "ALPHA"
+    assert (inputs / "c.out").read_text() == "GAMMA"
+
+
+def test_batch_manifest_to_pipe_in_order(inputs):
+    manifest = "".join(f"{inputs / n}\n" for n in ("c.txt", "a.txt", "b.txt"))
+    runner = CliRunner()
+    result = runner.invoke(shout, ["--batch", "--jobs", "3", "--pool", "thread"], input=manifest)
+    assert result.exit_code == 0, result.output
+    assert result.output == "GAMMAALPHABETA"
+
+
+def test_batch_reports_failures_and_continues(inputs):
+    (inputs / "bad.txt").write_text("bad data")
+    runner = CliRunner()
+    result = runner.invoke(
+        shout,
+        [
+            "--batch",
+            "--input-source",
+            "file",
+            "--input-name",
+            str(inputs / "*.txt"),
+            "--input-name",
+            "missing.txt",
+        ],
+    )
+    assert result.exit_code == 1
+    assert all(word in result.output for word in ("ALPHA", "BETA", "GAMMA"))
+    assert "bad.txt: refusing bad input" in result.output
+    assert "missing.txt" in result.output
+    assert "2 of 5 inputs failed" in result.output
+
+
+def test_batch_requires_output_template(inputs):
+    runner = CliRunner()
+    result = runner.invoke(
+        shout,
+        ["--batch", "--input-source", "file", "--input-name", str(inputs / "a.txt"), "--output-dest", "file",
+         "--output-name", str(inputs / "out.txt")],
+    )  # fmt: skip
+    assert result.exit_code == 1
+    assert "must be a template" in result.output
+
+
+def test_multiple_names_without_batch_fan_in(tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    _ = a.write_text("a\n")
+    _ = b.write_text("b\n")
+    result = CliRunner().invoke(shout, ["--input-name", str(a), "--input-name", str(b)])
+    assert result.exit_code == 0
+    assert result.output == "A\nB\n"
@@ -0,0 +1,172 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from clio.cache import ResultCache, function_key
+from clio.click_utils import command_with_io
+from clio.input import Source, TypeName
+
+calls: list[object] = []
+
+
+@command_with_io
+def shout(text):
+    calls.append(text)
+    return text.upper()
+
+
+@command_with_io
+def upper_lines(lines):
+    calls.append("lines")
+    for line in lines:
+        yield line.upper()
+
+
+@command_with_io
+def tagged(records):
+    calls.append("records")
+    return records
+
+
+@pytest.fixture(autouse=True)
+def _reset_calls():
+    calls.clear()
+
+
+def _run(cmd, cache_dir, *args, input=None):
+    result = CliRunner().invoke(cmd, ["--cache-dir", str(cache_dir), *args], input=input)
+    assert result.exit_code == 0, result.output
+    return result
+
+
+def test_hit_skips_function(tmp_path):
+    assert _run(shout, tmp_path, input="abc").stdout == "ABC"
+    assert _run(shout, tmp_path, input="abc").stdout == "ABC"
+    assert calls == ["abc"]
+    assert _run(shout, tmp_path, input="abd").stdout == "ABD"
+    assert calls == ["abc", "abd"]
+    stats = ResultCache(tmp_path).stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 2, 2)
+
+
+def test_input_type_is_part_of_key(tmp_path):
+    _ = _run(shout, tmp_path, input="a\n")
+    _ = _run(shout, tmp_path, "--input-type", "bytes", input="a\n")
+    assert len(calls) == 2
+
+
+def test_record_settings_are_part_of_key(tmp_path):
+    args = ["--records", "lines", "--batch-size", "2"]
+    _ = _run(tagged, tmp_path, *args, input="a\nb\n")
+    _ = _run(tagged, tmp_path, *args, input="a\nb\n")
+    assert len(calls) == 1
+    _ = _run(tagged, tmp_path, *args, "--unordered", input="a\nb\n")
+    _ = _run(tagged, tmp_path, "--records", "lines", input="a\nb\n")
+    assert len(calls) == 3
+
+
+def test_streaming_pipe_input_is_spilled_once(tmp_path):
+    for _ in range(2):
+        assert _run(upper_lines, tmp_path, "--input-type", "lines", input="a\nb\n").stdout == "A\nB\n"
+    assert calls == ["lines"]
+
+
+def test_file_input_and_compressed_file_output(tmp_path):
+    infile = tmp_path / "in.txt"
+    _ = infile.write_text("hello\n")
+    for n in range(2):
+        out = tmp_path / f"out{n}.txt.gz"
+        args = ["--input-source", "file", "--input-name", str(infile), "--input-type", "textio"]
+        args += ["--output-dest", "file", "--output-name", str(out), "--output-compression", "auto"]
+        _ = _run(upper_lines, tmp_path / "cache", *args)
+        assert gzip.decompress(out.read_bytes()) == b"HELLO\n"
+    assert calls == ["lines"]
+
+    _ = infile.write_text("changed\n")
+    _ = _run(upper_lines, tmp_path / "cache", "--input-source", "file", "--input-name", str(infile))
+    assert calls == ["lines", "lines"]
+
+
+def test_cache_stats_flag(tmp_path):
+    result = _run(shout, tmp_path, "--cache-stats", input="x")
+    assert json.loads(result.stderr)["misses"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=10)
+    for i, payload in enumerate((b"aaaa", b"bbbb", b"cccc")):
+        key, _ = cache.read_input("f", Source.ARG, name="0", as_type=TypeName.BYTES)
+        key = f"{i:02d}{key}"
+        with cache.store(key, payload) as stored:
+            assert stored.read() == payload
+        os.utime(cache._entry(key), (i, i))  # noqa: SLF001
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.size_bytes == 8
+
+
+def test_function_key_tracks_code_and_version():
+    def f(x):
+        return x
+
+    def g(x):
+        return x + x
+
+    g.__qualname__ = f.__qualname__
+    assert function_key(f) != function_key(g)
+    assert function_key(f, "1") == function_key(g, "1")
+
+
+def test_decorator_argument_and_failure_not_cached(tmp_path):
+    @command_with_io(cache_dir=tmp_path)
+    def flaky(text):
+        calls.append(text)
+        if len(calls) == 1:
+            msg = "boom"
+            raise RuntimeError(msg)
+        return text
+
+    assert CliRunner().invoke(flaky, [], input="x").exit_code != 0
+    assert CliRunner().invoke(flaky, [], input="x").stdout == "x"
+    assert CliRunner().invoke(flaky, [], input="x").stdout == "x"
+    assert len(calls) == 2
+
+
+CONCURRENT_SCRIPT = """
+import sys
+from clio.click_utils import command_with_io
+
+@command_with_io
+def double(text):
+    return text * 2
+
+double(["--cache-dir", sys.argv[1]])
+"""
+
+
+def test_concurrent_processes_share_cache(tmp_path):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", CONCURRENT_SCRIPT, str(tmp_path)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        for _ in range(4)
+    ]
+    outputs = [p.communicate(b"ab")[0] for p in procs]
+    assert outputs == [b"abab"] * 4
+    stats = ResultCache(tmp_path).stats()
+    assert stats.hits + stats.misses == 4
+    assert stats.entries == 1
+
+
+def test_clipboard_input_is_read_once(tmp_path, mocker):
+    clipboard = mocker.patch("clio.input.read_clipboard", side_effect=["a\n", "b\n"])
+    result = _run(upper_lines, tmp_path, "--input-source", "clipboard", "--input-type", "lines")
+    assert result.stdout == "A\n"
+    assert clipboard.call_count == 1
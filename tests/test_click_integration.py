@@ -80,3 +80,32 @@ def test_unsupported_return_type():
     result = runner.invoke(bad_return, [], input="ignored")
     assert result.exit_code != 0
     assert "Unsupported return type: <class 'int'>" in result.output
+
+
+@command_with_io
+def stream_upper(lines):
+    return (line.upper() for line in lines)
+
+
+def test_cli_streaming_lines():
+    runner = CliRunner()
+    result = runner.invoke(stream_upper, ["--input-type", "lines"], input="a\nb\n")
+    assert result.exit_code == 0
+    assert result.output == "A\nB\n"
+
+
+@command_with_io
+def stream_chunks(chunks):
+    return (chunk[::-1] for chunk in chunks)
+
+
+def test_cli_streaming_chunks(tmp_path):
+    infile = tmp_path / "in.bin"
+    infile.write_bytes(b"abc")
+    runner = CliRunner()
+    result = runner.invoke(
+        stream_chunks,
+        ["--input-source", "file", "--input-name", str(infile), "--input-type", "chunks"],
+    )
+    assert result.exit_code == 0
+    assert result.output == "cba"
@@ -1,6 +1,19 @@
+import os
+import sys
+import threading
+
 import pytest
 
-from clio.clipboard import read_clipboard, write_clipboard
+from clio.clipboard import (
+    BACKEND_ENV,
+    COPY_ENV,
+    PASTE_ENV,
+    detect_backend,
+    read_clipboard,
+    watch_clipboard,
+    write_clipboard,
+)
+from clio.output import write_output
 
 
 def test_clipboard_not_installed(monkeypatch):
@@ -23,3 +36,84 @@ def test_clipboard_mocked(mocker):
     result = read_clipboard()
     assert result == "mocked"
     mock_paste.assert_called_once()
+
+
+FAKE_BACKEND = """
+import sys
+from pathlib import Path
+
+mode, store = sys.argv[1], Path(sys.argv[2])
+if mode == "copy":
+    data = sys.stdin.buffer.read()
+    if data == b"fail":
+        sys.exit(3)
+    store.write_bytes(data)
+else:
+    sys.stdout.buffer.write(store.read_bytes() if store.exists() else b"")
+"""
+
+
+@pytest.fixture
+def fake_backend(tmp_path, monkeypatch):
+    script = tmp_path / "fake_clip.py"
+    script.write_text(FAKE_BACKEND)
+    store = tmp_path / "clipboard"
+    monkeypatch.setenv(COPY_ENV, f"{sys.executable} {script} copy {store}")
+    monkeypatch.setenv(PASTE_ENV, f"{sys.executable} {script} paste {store}")
+    detect_backend.cache_clear()
+    return store
+
+
+def test_helper_backend_roundtrip(fake_backend):
+    assert detect_backend().name == "custom"
+    write_clipboard("héllo")
+    assert fake_backend.read_bytes() == "héllo".encode()
+    assert read_clipboard() == "héllo"
+
+
+def test_helper_backend_streams_chunks(fake_backend):
+    write_output((f"{i}," for i in range(1000)), dest="clipboard")
+    assert read_clipboard() == "".join(f"{i}," for i in range(1000))
+
+
+def test_helper_backend_failure(fake_backend):
+    with pytest.raises(RuntimeError, match=r"failed \(3\)"):
+        write_clipboard(iter([b"fa", b"il"]))
+
+
+def test_detect_backend_from_path(tmp_path, monkeypatch):
+    for tool in ("xclip", "xsel"):
+        exe = tmp_path / tool
+        exe.write_text("#!/bin/sh\n")
+        exe.chmod(0o755)
+    monkeypatch.setenv("PATH", str(tmp_path))
+    monkeypatch.setenv("DISPLAY", ":0")
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+    monkeypatch.delenv(BACKEND_ENV)
+    detect_backend.cache_clear()
+    assert detect_backend().name == "xclip"
+    # Cached: later PATH changes do not trigger re-detection
+    monkeypatch.setenv("PATH", "")
+    assert detect_backend().name == "xclip"
+
+
+def test_detect_backend_unknown(monkeypatch):
+    monkeypatch.setenv(BACKEND_ENV, "nope")
+    detect_backend.cache_clear()
+    with pytest.raises(ValueError, match="Unknown clipboard backend: nope"):
+        detect_backend()
+
+
+def _replace(path, value):
+    # write_bytes truncates first, so the poller could see an empty clipboard in between
+    temp = path.with_name(path.name + ".tmp")
+    _ = temp.write_bytes(value)
+    _ = os.replace(temp, path)
+
+
+def test_watch_clipboard_dedupes_by_content(fake_backend):
+    fake_backend.write_bytes(b"initial")
+    for delay, value in [(0.1, b"b"), (0.3, b"b"), (0.5, b"c")]:
+        threading.Timer(delay, _replace, (fake_backend, value)).start()
+    values = watch_clipboard(min_interval=0.02, max_interval=0.05)
+    assert [next(values), next(values)] == [b"b", b"c"]
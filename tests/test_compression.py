@@ -0,0 +1,149 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from clio.click_utils import command_with_io
+from clio.compression import (
+    Compression,
+    decompress_stream,
+    detect_compression,
+    infer_compression,
+)
+from clio.input import get_input
+from clio.output import write_output
+
+TEXT = "line one\nline two\n" * 1000
+
+
+@command_with_io
+def shout(text):
+    return text.upper()
+
+
+@pytest.fixture
+def gz_file(tmp_path):
+    path = tmp_path / "data.txt.gz"
+    path.write_bytes(gzip.compress(TEXT.encode()))
+    return path
+
+
+def test_detect_and_infer():
+    assert detect_compression(gzip.compress(b"x")) == Compression.GZIP
+    assert detect_compression(bz2.compress(b"x")) == Compression.BZ2
+    assert detect_compression(lzma.compress(b"x")) == Compression.XZ
+    assert detect_compression(b"plain") == Compression.NONE
+    assert infer_compression("out.JSON.GZ") == Compression.GZIP
+    assert infer_compression("out.txt") == Compression.NONE
+    assert infer_compression("-") == Compression.NONE
+
+
+@pytest.mark.parametrize(
+    ("as_type", "expected"),
+    [
+        ("str", TEXT),
+        ("bytes", TEXT.encode()),
+    ],
+)
+def test_auto_decompresses_file(gz_file, as_type, expected):
+    assert get_input("file", name=str(gz_file), as_type=as_type, compression="auto") == expected
+
+
+def test_compressed_env_and_arg_values_are_data(monkeypatch):
+    monkeypatch.setenv("FOO", "hello")
+    assert get_input("env", name="FOO", as_type="str", compression="auto") == "hello"
+    monkeypatch.setattr(sys, "argv", ["prog", "plain"])
+    assert get_input("arg", name="1", as_type="bytes", compression="auto") == b"plain"
+    monkeypatch.setattr(os, "environb", {b"FOO": gzip.compress(b"packed")})
+    assert get_input("env", name="FOO", as_type="bytes", compression="gzip") == b"packed"
+
+
+def test_decompressed_streaming_types(gz_file):
+    lines = get_input("file", name=str(gz_file), as_type="lines", compression="gzip")
+    assert next(lines) == "line one\n"
+    assert sum(1 for _ in lines) == 1999
+    chunks = get_input("file", name=str(gz_file), as_type="chunks", compression="auto")
+    assert b"".join(chunks) == TEXT.encode()
+    assert get_input("file", name=str(gz_file), as_type="textio", compression="auto").read() == TEXT
+
+
+def test_decompressed_file_types(gz_file):
+    path = get_input("file", name=str(gz_file), as_type="path", compression="auto")
+    assert path.read_text() == TEXT
+    view = get_input("file", name=str(gz_file), as_type="mmap", compression="auto")
+    assert bytes(view[:8]) == b"line one"
+
+
+@pytest.mark.parametrize(
+    ("compression", "compress"),
+    [(Compression.GZIP, gzip.compress), (Compression.BZ2, bz2.compress), (Compression.XZ, lzma.compress)],
+)
+def test_closing_decompressed_stream_closes_source(tmp_path, compression, compress):
+    path = tmp_path / "data.bin"
+    path.write_bytes(compress(b"payload"))
+    source = path.open("rb")
+    with decompress_stream(source, compression) as stream:
+        assert stream.read() == b"payload"
+    assert source.closed
+
+
+@pytest.mark.parametrize("payload", [lzma.compress(TEXT.encode()), TEXT.encode()])
+def test_auto_on_unpeekable_pipe(monkeypatch, payload):
+    # BytesIO has no peek(), so sniffing consumes and replays the head
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(payload)))
+    assert get_input("pipe", as_type="str", compression="auto") == TEXT
+
+
+@pytest.mark.parametrize(
+    ("suffix", "decompress"),
+    [(".gz", gzip.decompress), (".bz2", bz2.decompress), (".xz", lzma.decompress)],
+)
+def test_auto_output_follows_suffix(tmp_path, suffix, decompress):
+    target = tmp_path / f"out{suffix}"
+    lines = (line for line in TEXT.splitlines(keepends=True))
+    write_output(lines, dest="file", name=str(target), compression="auto")
+    assert decompress(target.read_bytes()) == TEXT.encode()
+
+
+def test_compressed_output_rejects_text_destinations():
+    with pytest.raises(ValueError, match="not supported for env"):
+        write_output("x", dest="env", name="CLIO_COMPRESSED", compression="gzip")
+
+
+def test_cli_roundtrip(gz_file, tmp_path):
+    out = tmp_path / "out.bz2"
+    result = CliRunner().invoke(
+        shout,
+        [
+            "--input-source", "file",
+            "--input-name", str(gz_file),
+            "--input-compression", "auto",
+            "--output-dest", "file",
+            "--output-name", str(out),
+            "--output-compression", "auto",
+            "--compression-level", "1",
+        ],
+    )  # fmt: skip
+    assert result.exit_code == 0, result.output
+    assert bz2.decompress(out.read_bytes()) == TEXT.upper().encode()
+
+
+def test_cli_compressed_pipe_output():
+    result = CliRunner().invoke(shout, ["--output-compression", "gzip"], input="hello")
+    assert result.exit_code == 0, result.output
+    assert gzip.decompress(result.stdout_bytes) == b"HELLO"
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz"])
+def test_cli_compression_level_zero(tmp_path, suffix):
+    out = tmp_path / f"out{suffix}"
+    args = ["--output-dest", "file", "--output-name", str(out), "--output-compression", "auto"]
+    result = CliRunner().invoke(shout, [*args, "--compression-level", "0"], input="abc")
+    assert result.exit_code == 0, result.output
+    with {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}[suffix](out) as f:
+        assert f.read() == b"ABC"
@@ -0,0 +1,97 @@
+import gzip
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from clio.click_utils import command_with_io
+from clio.fanin import FanIn, get_inputs
+from clio.input import Source, TypeName
+
+
+@command_with_io
+def tag(lines):
+    for name, line in lines:
+        yield f"{name}: {line}"
+
+
+@command_with_io
+def passthrough(data):
+    return data
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    paths = []
+    for name, text in (("a", "a1\na2\na3\n"), ("b", "b1\n"), ("c", "c1\nc2")):
+        path = tmp_path / name
+        _ = path.write_text(text)
+        paths.append(str(path))
+    return paths
+
+
+def test_concat_every_type(inputs):
+    expected = "a1\na2\na3\nb1\nc1\nc2"
+    assert get_inputs(Source.FILE, inputs) == expected
+    assert get_inputs(Source.FILE, inputs, as_type=TypeName.BYTES) == expected.encode()
+    assert list(get_inputs(Source.FILE, inputs, as_type=TypeName.LINES)) == expected.splitlines(keepends=True)
+    assert b"".join(get_inputs(Source.FILE, inputs, as_type=TypeName.CHUNKS)) == expected.encode()
+    with get_inputs(Source.FILE, inputs, as_type=TypeName.TEXTIO) as f:
+        assert f.read() == expected
+    assert get_inputs(Source.FILE, inputs, as_type=TypeName.PATH).read_text() == expected
+    assert bytes(get_inputs(Source.FILE, inputs, as_type=TypeName.MMAP)) == expected.encode()
+
+
+def test_interleave_round_robin(inputs):
+    lines = list(get_inputs(Source.FILE, inputs, as_type=TypeName.LINES, mode=FanIn.INTERLEAVE))
+    assert lines == ["a1\n", "b1\n", "c1\n", "a2\n", "c2\n", "a3\n"]
+    assert get_inputs(Source.FILE, inputs, mode=FanIn.INTERLEAVE) == "".join(lines)
+
+
+def test_boundaries(inputs):
+    pairs = list(get_inputs(Source.FILE, inputs[:2], as_type=TypeName.LINES, boundaries=True))
+    assert pairs == [(inputs[0], "a1\n"), (inputs[0], "a2\n"), (inputs[0], "a3\n"), (inputs[1], "b1\n")]
+    chunks = list(get_inputs(Source.FILE, inputs[:2], as_type=TypeName.CHUNKS, boundaries=True))
+    assert chunks == [(inputs[0], b"a1\na2\na3\n"), (inputs[1], b"b1\n")]
+    with pytest.raises(ValueError, match="boundaries"):
+        _ = get_inputs(Source.FILE, inputs, as_type=TypeName.STR, boundaries=True)
+
+
+def test_stdin_among_files_and_per_input_decompression(inputs, tmp_path, monkeypatch):
+    gz = tmp_path / "d.gz"
+    _ = gz.write_bytes(gzip.compress(b"d1\n"))
+    stdin = tmp_path / "stdin"
+    _ = stdin.write_bytes(b"s1\n")
+    with stdin.open("rb") as f:
+        monkeypatch.setattr(sys, "stdin", type("Stdin", (), {"buffer": f})())
+        data = get_inputs(Source.PIPE, [str(gz), "-", inputs[1]], compression="auto")
+    assert data == "d1\ns1\nb1\n"
+
+
+def test_stdin_is_left_open(inputs, tmp_path, monkeypatch):
+    stdin = tmp_path / "stdin"
+    _ = stdin.write_bytes(b"s1\n")
+    with stdin.open("rb") as f:
+        monkeypatch.setattr(sys, "stdin", type("Stdin", (), {"buffer": f})())
+        assert get_inputs(Source.FILE, ["-", inputs[1], "-"]) == "s1\nb1\n"
+        assert not f.closed
+
+
+def test_cli_fan_in_with_stdin_and_boundaries(inputs):
+    args = ["--input-name", inputs[1], "--input-name", "-", "--input-type", "lines", "--input-boundaries"]
+    result = CliRunner().invoke(tag, args, input="x\n")
+    assert result.exit_code == 0
+    assert result.output == f"{inputs[1]}: b1\n-: x\n"
+
+
+def test_cli_interleave(inputs):
+    args = ["--input-name", inputs[0], "--input-name", inputs[1], "--fan-in", "interleave"]
+    result = CliRunner().invoke(passthrough, args)
+    assert result.output == "a1\nb1\na2\na3\n"
+
+
+def test_cli_rejects_fan_in_with_cache(inputs, tmp_path):
+    args = ["--input-name", inputs[0], "--input-name", inputs[1], "--cache-dir", str(tmp_path / "cache")]
+    result = CliRunner().invoke(passthrough, args)
+    assert result.exit_code == 1
+    assert "--cache-dir" in result.output
@@ -0,0 +1,131 @@
+import errno
+import gzip
+import os
+import threading
+
+import pytest
+
+import clio.output
+from clio.fastcopy import copy_fd
+from clio.output import write_output
+
+PAYLOAD = bytes(range(256)) * 1024
+
+
+@pytest.fixture
+def src_file(tmp_path):
+    f = tmp_path / "src.bin"
+    f.write_bytes(PAYLOAD)
+    return f
+
+
+def test_copy_file_to_file(src_file, tmp_path):
+    dst = tmp_path / "dst.bin"
+    with src_file.open("rb") as src, dst.open("wb") as out:
+        assert copy_fd(src.fileno(), out.fileno()) == len(PAYLOAD)
+    assert dst.read_bytes() == PAYLOAD
+
+
+def test_copy_from_offset_keeps_position(src_file, tmp_path):
+    dst = tmp_path / "dst.bin"
+    with src_file.open("rb", buffering=0) as src, dst.open("wb") as out:
+        assert copy_fd(src.fileno(), out.fileno(), offset=10) == len(PAYLOAD) - 10
+        assert src.tell() == 0
+    assert dst.read_bytes() == PAYLOAD[10:]
+
+
+def test_copy_advances_position_without_offset(src_file, tmp_path):
+    dst = tmp_path / "dst.bin"
+    with src_file.open("rb", buffering=0) as src, dst.open("wb") as out:
+        _ = src.seek(100)
+        _ = copy_fd(src.fileno(), out.fileno())
+        assert src.tell() == len(PAYLOAD)
+    assert dst.read_bytes() == PAYLOAD[100:]
+
+
+def test_copy_file_to_pipe(src_file):
+    r, w = os.pipe()
+    received = bytearray()
+
+    def drain():
+        while chunk := os.read(r, 1 << 16):
+            received.extend(chunk)
+
+    reader = threading.Thread(target=drain)
+    reader.start()
+    with src_file.open("rb") as src:
+        _ = copy_fd(src.fileno(), w)
+    os.close(w)
+    reader.join()
+    os.close(r)
+    assert bytes(received) == PAYLOAD
+
+
+def test_copy_pipe_to_file(tmp_path):
+    r, w = os.pipe()
+    _ = os.write(w, b"through a pipe")
+    os.close(w)
+    dst = tmp_path / "dst.bin"
+    with dst.open("wb") as out:
+        assert copy_fd(r, out.fileno()) == len(b"through a pipe")
+    os.close(r)
+    assert dst.read_bytes() == b"through a pipe"
+
+
+def test_falls_back_to_chunked_copy(src_file, tmp_path, monkeypatch):
+    def unsupported(*_args):
+        raise OSError(errno.EINVAL, "unsupported")
+
+    monkeypatch.setattr(os, "copy_file_range", unsupported, raising=False)
+    monkeypatch.setattr(os, "sendfile", unsupported, raising=False)
+    dst = tmp_path / "dst.bin"
+    with src_file.open("rb") as src, dst.open("wb") as out:
+        assert copy_fd(src.fileno(), out.fileno()) == len(PAYLOAD)
+    assert dst.read_bytes() == PAYLOAD
+
+
+def test_write_output_path_uses_kernel_copy(src_file, tmp_path, mocker):
+    spy = mocker.spy(clio.output, "copy_fd")
+    dst = tmp_path / "dst.bin"
+    write_output(src_file, dest="file", name=str(dst))
+    assert spy.call_count == 1
+    assert dst.read_bytes() == PAYLOAD
+
+
+def test_write_output_partially_read_stream(src_file, tmp_path):
+    dst = tmp_path / "dst.bin"
+    with src_file.open("rb") as src:
+        _ = src.read(5)  # leaves read-ahead in the Python buffer
+        write_output(src, dest="file", name=str(dst))
+        assert src.read() == b""
+    assert dst.read_bytes() == PAYLOAD[5:]
+
+
+def test_write_output_pipe_reaches_kernel_copy(tmp_path, mocker):
+    r, w = os.pipe()
+
+    def feed():
+        with os.fdopen(w, "wb") as pipe:
+            _ = pipe.write(PAYLOAD)
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    spy = mocker.spy(clio.output, "copy_fd")
+    dst = tmp_path / "dst.bin"
+    with os.fdopen(r, "rb") as src:
+        assert src.read(5) == PAYLOAD[:5]  # leaves read-ahead in the Python buffer
+        write_output(src, dest="file", name=str(dst))
+    writer.join()
+    assert spy.call_count == 1
+    assert dst.read_bytes() == PAYLOAD[5:]
+
+
+def test_write_output_compressed_stream_is_decompressed(src_file, tmp_path, mocker):
+    packed = tmp_path / "src.bin.gz"
+    _ = packed.write_bytes(gzip.compress(PAYLOAD))
+    spy = mocker.spy(clio.output, "copy_fd")
+    dst = tmp_path / "dst.bin"
+    with gzip.open(packed, "rb") as src:
+        write_output(src, dest="file", name=str(dst))
+    assert spy.call_count == 0
+    assert dst.read_bytes() == PAYLOAD
@@ -0,0 +1,125 @@
+import os
+import subprocess
+import sys
+import time
+
+# Microseconds clio's own module bodies may take to import (best of several runs)
+IMPORT_BUDGET_US = 30_000
+# Microseconds the whole `import clio.click_utils` may take, click included
+TOTAL_IMPORT_BUDGET_US = 200_000
+# Seconds a trivial command may add to a bare interpreter's start-up
+RUN_BUDGET_S = 0.25
+RUNS = 3
+
+# Modules only specific code paths need; a plain pipe-to-pipe run must not load them
+LAZY_MODULES = (
+    "pyperclip",
+    "tempfile",
+    "asyncio",
+    "gzip",
+    "bz2",
+    "lzma",
+    "clio.aio",
+    "clio.signal",
+    "clio.batch",
+    "clio.metrics",
+    "clio.cache",
+    "clio.server",
+    "clio.client",
+    "clio.tee",
+    "clio.records",
+    "clio.ranges",
+    "clio.watch",
+    "ctypes",
+    "csv",
+    "clio.profiling",
+    "cProfile",
+    "tracemalloc",
+    "multiprocessing",
+    "concurrent.futures",
+)
+
+RUN_SCRIPT = """
+from clio.click_utils import command_with_io
+
+@command_with_io
+def echo(data):
+    return data
+
+echo([], standalone_mode=False)
+"""
+
+
+def _env() -> dict[str, str]:
+    # Installed packages import from cached bytecode; without it the budgets would measure compile time
+    return {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+
+
+def _importtime_lines(*args: str, stdin: str = "") -> list[tuple[int, int, str]]:
+    """Run Python under ``-X importtime`` and return ``(self, cumulative, module)`` per import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_env(),
+    )
+    entries: list[tuple[int, int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, total, module = line.removeprefix("import time:").split("|")
+        if own.strip().isdigit():
+            # Nested imports are indented under the module that triggered them
+            entries.append((int(own), int(total), module.removeprefix(" ")))
+    return entries
+
+
+def _importtime(*args: str, stdin: str = "") -> dict[str, int]:
+    """Run Python under ``-X importtime`` and return each module's self time in microseconds."""
+    return {module.strip(): own for own, _, module in _importtime_lines(*args, stdin=stdin)}
+
+
+def _wall_time(*args: str) -> float:
+    """Best wall time in seconds of running Python with *args* and empty stdin."""
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        _ = subprocess.run(
+            [sys.executable, *args],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            check=True,
+            env=_env(),
+        )
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_import_budget():
+    overheads = []
+    for _ in range(RUNS):
+        times = _importtime("-c", "import clio.click_utils")
+        overheads.append(sum(us for module, us in times.items() if module.split(".")[0] == "clio"))
+    assert min(overheads) < IMPORT_BUDGET_US
+
+
+def test_total_import_budget():
+    totals = []
+    for _ in range(RUNS):
+        lines = _importtime_lines("-c", "import clio.click_utils")
+        # Top-level entries' cumulative times add up to the whole import
+        totals.append(sum(total for _, total, module in lines if not module.startswith(" ")))
+    assert min(totals) < TOTAL_IMPORT_BUDGET_US
+
+
+def test_trivial_run_startup_budget():
+    overhead = _wall_time("-c", RUN_SCRIPT) - _wall_time("-c", "pass")
+    assert overhead < RUN_BUDGET_S
+
+
+def test_plain_run_skips_lazy_modules():
+    times = _importtime("-c", RUN_SCRIPT, stdin="hello")
+    loaded = [m for m in LAZY_MODULES if m in times]
+    assert loaded == []
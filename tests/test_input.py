@@ -1,4 +1,6 @@
 import io
+import os
+import re
 import signal
 import sys
 from pathlib import Path
@@ -52,13 +54,34 @@ def test_get_input_missing_name(source):
 
 
 def test_get_input_env_bytes(monkeypatch, tmp_path):
-    # env var points at a file containing bytes
+    # bytes never dereferences paths; the env value itself is returned
     f = tmp_path / "data.bin"
     f.write_bytes(b"bar")
     monkeypatch.setenv("FOO", str(f))
     result = get_input("env", name="FOO", as_type="bytes")
     assert isinstance(result, bytes)
-    assert result == b"bar"
+    assert result == str(f).encode()
+
+
+def test_get_input_file_bytes_non_utf8(tmp_path):
+    f = tmp_path / "data.bin"
+    f.write_bytes(b"\xff\xfe\x00")
+    assert get_input("file", name=str(f), as_type="bytes") == b"\xff\xfe\x00"
+
+
+def test_get_input_pipe_bytes_reads_buffer(monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"\xff raw"), encoding="utf-8"))
+    assert get_input("pipe", as_type="bytes") == b"\xff raw"
+
+
+def test_get_input_pipe_bytes_does_not_probe_paths(monkeypatch, temp_text_file):
+    monkeypatch.setattr(sys, "stdin", io.StringIO(temp_text_file))
+    assert get_input("pipe", as_type="bytes") == temp_text_file.encode()
+
+
+def test_get_input_arg_bytes_roundtrips_undecodable(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["prog", os.fsdecode(b"\xffarg")])
+    assert get_input("arg", name="1", as_type="bytes") == b"\xffarg"
 
 
 def test_get_input_as_textio(temp_text_file):
@@ -297,3 +320,136 @@ def test__read_str(source):
     """Missing name errors for textio, bufferedio, and path when source is arg or env."""
     with pytest.raises(ValueError, match=f"Missing name for source '{source}'"):
         get_input(source, name=None)
+
+
+def test_get_input_lines_is_lazy(monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("a\nb\nc"))
+    lines = get_input("pipe", as_type="lines")
+    assert next(lines) == "a\n"
+    assert sys.stdin.tell() == 2
+    assert list(lines) == ["b\n", "c"]
+
+
+def test_get_input_lines_from_file_closes(tmp_path):
+    f = tmp_path / "lines.txt"
+    f.write_text("one\ntwo\n")
+    assert list(get_input("file", name=str(f), as_type="lines")) == ["one\n", "two\n"]
+
+
+def test_get_input_lines_from_clipboard(monkeypatch):
+    monkeypatch.setattr("clio.clipboard.pyperclip.paste", lambda: "x\ny")
+    assert list(get_input("clipboard", as_type="lines")) == ["x\n", "y"]
+
+
+def test_get_input_chunks(monkeypatch, tmp_path):
+    monkeypatch.setattr("clio.input.CHUNK_SIZE", 4)
+    f = tmp_path / "data.bin"
+    f.write_bytes(b"0123456789")
+    assert list(get_input("file", name=str(f), as_type="chunks")) == [b"0123", b"4567", b"89"]
+
+
+def test_get_input_mmap_file(tmp_path):
+    f = tmp_path / "big.log"
+    f.write_bytes(b"INFO ok\nERROR boom\n")
+    view = get_input("file", name=str(f), as_type="mmap")
+    assert isinstance(view, memoryview)
+    assert view.readonly
+    assert re.search(rb"ERROR (\w+)", view).group(1) == b"boom"
+    assert view.obj.find(b"ERROR") == 8
+    assert bytes(view[:4]) == b"INFO"
+
+
+def test_get_input_mmap_empty_file(tmp_path):
+    f = tmp_path / "empty.log"
+    f.write_bytes(b"")
+    assert len(get_input("file", name=str(f), as_type="mmap")) == 0
+
+
+def test_get_input_mmap_env_path(monkeypatch, tmp_path):
+    f = tmp_path / "data.bin"
+    f.write_bytes(b"\x00\xff")
+    monkeypatch.setenv("DATA", str(f))
+    assert bytes(get_input("env", name="DATA", as_type="mmap")) == b"\x00\xff"
+
+
+def test_get_input_mmap_stdin_regular_file(monkeypatch, tmp_path):
+    f = tmp_path / "redirected.txt"
+    f.write_bytes(b"skip|mapped")
+    with f.open("rb") as raw:
+        _ = raw.seek(5)
+        monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(raw))
+        assert bytes(get_input("pipe", as_type="mmap")) == b"mapped"
+
+
+def test_get_input_mmap_stdin_pipe_falls_back(monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("piped"))
+    assert bytes(get_input("pipe", as_type="mmap")) == b"piped"
+
+
+def test_get_input_mmap_signal_unsupported():
+    with pytest.raises(ValueError, match="Unsupported source for mmap: signal"):
+        get_input("signal", name=str(signal.SIGUSR1), as_type="mmap")
+
+
+@command_with_io
+def describe(data):
+    return f"{type(data).__name__}:{data if isinstance(data, str) else data.read()}"
+
+
+def test_max_bytes_keeps_small_input_in_memory(monkeypatch, tmp_path):
+    f = tmp_path / "small.txt"
+    f.write_text("tiny")
+    assert get_input("file", name=str(f), as_type="str", max_bytes=4) == "tiny"
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"tiny")))
+    assert get_input("pipe", as_type="bytes", max_bytes=4) == b"tiny"
+
+
+def test_max_bytes_fails_on_a_large_file(tmp_path):
+    f = tmp_path / "big.txt"
+    f.write_text("x" * 100)
+    with pytest.raises(ValueError, match="larger than the 10-byte limit"):
+        get_input("file", name=str(f), as_type="bytes", max_bytes=10)
+
+
+def test_max_bytes_spills_pipe_input_to_disk(monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"0123456789abc")))
+    spilled = get_input("pipe", as_type="str", max_bytes=5, on_oversize="spill")
+    assert isinstance(spilled, io.TextIOBase)
+    assert spilled.read() == "0123456789abc"
+
+
+def test_max_bytes_spill_hands_over_a_regular_file(tmp_path):
+    f = tmp_path / "big.bin"
+    f.write_bytes(b"\x00" * 50)
+    spilled = get_input("file", name=str(f), as_type="bytes", max_bytes=10, on_oversize="spill")
+    assert spilled.name == str(f)
+    assert spilled.read() == b"\x00" * 50
+    spilled.close()
+
+
+def test_max_bytes_applies_to_decompressed_size(tmp_path):
+    import gzip
+
+    f = tmp_path / "bomb.gz"
+    f.write_bytes(gzip.compress(b"z" * 10_000))
+    with pytest.raises(ValueError, match="limit"):
+        get_input("file", name=str(f), as_type="bytes", compression="auto", max_bytes=1000)
+
+
+def test_cli_reports_spilled_input():
+    runner = CliRunner()
+    small = runner.invoke(describe, ["--max-input-bytes", "10", "--metrics"], input="hello")
+    assert small.exit_code == 0
+    assert small.stdout == "str:hello"
+    assert '"input":"memory"' in small.stderr
+
+    args = ["--max-input-bytes", "3", "--on-oversize", "spill", "--metrics"]
+    big = runner.invoke(describe, args, input="hello")
+    assert big.exit_code == 0
+    assert big.stdout == "TextIOWrapper:hello"
+    assert "exceeds --max-input-bytes" in big.stderr
+    assert '"input":"spilled"' in big.stderr
+
+    failed = runner.invoke(describe, ["--max-input-bytes", "3"], input="hello")
+    assert failed.exit_code == 1
+    assert "3-byte limit" in failed.output
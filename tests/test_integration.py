@@ -48,7 +48,7 @@ def test_env_bytes_to_pipe(monkeypatch, tmp_path, capsys):
     f.write_bytes(b"abc")
     monkeypatch.setenv("BIN", str(f))
 
-    data = get_input("env", name="BIN", as_type="bytes")
+    data = get_input("env", name="BIN", as_type="bufferedio").read()
     write_output(data[::-1], dest="pipe")
 
     assert capsys.readouterr().out == "cba"
@@ -159,7 +159,7 @@ def test_input_matrix_env(py_type, tmp_path, monkeypatch):
     content = "matrix test ✓"
     content_bytes = content.encode()
 
-    if py_type == "str":
+    if py_type in {"str", "bytes"}:
         monkeypatch.setenv("MY_INPUT", content)
     else:
         f = tmp_path / "env_input.txt"
@@ -175,7 +175,7 @@ def test_input_matrix_arg(py_type, tmp_path, monkeypatch):
     content = "matrix test ✓"
     content_bytes = content.encode()
 
-    if py_type == "str":
+    if py_type in {"str", "bytes"}:
         monkeypatch.setattr(sys, "argv", ["prog", content])
     else:
         f = tmp_path / "arg_input.txt"
@@ -0,0 +1,99 @@
+import io
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from clio.click_utils import command_with_io
+from clio.metrics import Metrics, measure
+
+PHASES = {"resolve", "read", "call", "write"}
+
+
+@command_with_io
+def shout(text):
+    return text.upper()
+
+
+@command_with_io
+def count_lines(lines):
+    for line in lines:
+        yield line.upper()
+
+
+def test_measure():
+    assert measure("abc") == 3
+    assert measure("héllo") == 6
+    assert measure(b"\x00\x01") == 2
+    assert measure(memoryview(b"abcd")[1:]) == 3
+    assert measure(iter([b"x"])) is None
+    buf = io.BytesIO(b"abcdef")
+    assert measure(buf) is None
+
+
+def test_measure_file_handle_counts_unread_bytes(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"0123456789")
+    assert measure(path) == 10
+    with path.open("rb") as f:
+        _ = f.read(4)
+        assert measure(f) == 6
+
+
+def test_metrics_to_stderr():
+    result = CliRunner().invoke(shout, ["--metrics"], input="héllo\n")
+    assert result.exit_code == 0
+    assert result.stdout == "HÉLLO\n"
+    record = json.loads(result.stderr)
+    assert record["command"] == "shout"
+    assert record["source"] == "pipe"
+    assert set(record["phases"]) == PHASES
+    assert record["bytes_in"] == record["bytes_out"] == 7
+    assert record["wall_s"] >= record["phases"]["call"]["wall_s"]
+
+
+def test_metrics_file_appends(tmp_path):
+    metrics_file = tmp_path / "metrics.jsonl"
+    for _ in range(2):
+        result = CliRunner().invoke(shout, ["--metrics-file", str(metrics_file)], input="x")
+        assert result.exit_code == 0
+        assert not result.stderr
+    records = [json.loads(line) for line in metrics_file.read_text().splitlines()]
+    assert len(records) == 2
+    assert all(r["bytes_out"] == 1 for r in records)
+
+
+def test_lazy_input_and_output_are_counted_as_consumed():
+    result = CliRunner().invoke(count_lines, ["--input-type", "lines", "--metrics"], input="ab\ncd\n")
+    assert result.exit_code == 0
+    assert result.stdout == "AB\nCD\n"
+    record = json.loads(result.stderr)
+    assert record["bytes_in"] == 6
+    assert record["bytes_out"] == 6
+
+
+def test_metrics_hook_sees_every_run_without_flag():
+    seen: list[Metrics] = []
+
+    @command_with_io(metrics_hook=seen.append)
+    def upper(text):
+        return text.upper()
+
+    result = CliRunner().invoke(upper, [], input="abc")
+    assert result.exit_code == 0
+    assert not result.stderr
+    (recorder,) = seen
+    assert set(recorder.phases) == PHASES
+    assert recorder.bytes_in == 3
+    assert recorder.as_dict()["command"] == "upper"
+
+
+def test_metrics_emitted_on_failure(tmp_path):
+    out = tmp_path / "exists.txt"
+    _ = out.write_text("keep")
+    args = ["--output-dest", "file", "--output-name", str(out), "--metrics"]
+    result = CliRunner().invoke(shout, args, input="x")
+    assert result.exit_code != 0
+    record = json.loads(result.stderr.splitlines()[0])
+    assert "read" not in record["phases"]
+    assert Path(out).read_text() == "keep"
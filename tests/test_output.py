@@ -105,3 +105,118 @@ def test_write_output_file_dash_writes_stdout(monkeypatch):
     monkeypatch.setattr(sys, "stdout", buffer)
     write_output("HELLO-DASH", dest="file", name="-")
     assert buffer.getvalue() == "HELLO-DASH"
+
+
+def test_write_output_generator_flushes_each_piece(monkeypatch):
+    flushed: list[str] = []
+
+    class Recorder(io.StringIO):
+        def flush(self):
+            flushed.append(self.getvalue())
+
+    monkeypatch.setattr(sys, "stdout", Recorder())
+
+    def produce():
+        yield "a"
+        yield b"\xe2\x9c"  # first half of a multibyte character
+        yield b"\x93"
+
+    write_output(produce(), dest="pipe")
+    assert flushed == ["a", "a", "a✓"]
+
+
+def test_write_output_generator_to_file(tmp_path):
+    out = tmp_path / "gen.txt"
+    write_output((f"{i}\n" for i in range(3)), dest="file", name=str(out))
+    assert out.read_text() == "0\n1\n2\n"
+
+
+def test_write_output_generator_invalid_item():
+    with pytest.raises(TypeError, match="Unsupported data type for output"):
+        write_output(iter([1]), dest="env", name="MY_OUTPUT")
+
+
+NON_UTF8 = b"\xff\x00\xfe binary"
+
+
+def test_write_output_bytes_to_file_is_not_decoded(tmp_path):
+    out = tmp_path / "out.bin"
+    write_output(NON_UTF8, dest="file", name=str(out))
+    assert out.read_bytes() == NON_UTF8
+
+
+@pytest.mark.parametrize("wrap", [bytearray, memoryview])
+def test_write_output_buffer_types(tmp_path, wrap):
+    out = tmp_path / "out.bin"
+    write_output(wrap(NON_UTF8), dest="file", name=str(out))
+    assert out.read_bytes() == NON_UTF8
+
+
+def test_write_output_binary_stream_to_stdout_buffer(monkeypatch, tmp_path):
+    src = tmp_path / "in.bin"
+    src.write_bytes(NON_UTF8 * 10)
+    monkeypatch.setattr("clio.output.CHUNK_SIZE", 7)
+    raw = io.BytesIO()
+    monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(raw, encoding="utf-8"))
+    with src.open("rb") as reader:
+        write_output(reader, dest="pipe")
+    assert raw.getvalue() == NON_UTF8 * 10
+
+
+def test_write_output_mixed_pieces_keep_order(monkeypatch):
+    raw = io.BytesIO()
+    monkeypatch.setattr(sys, "stdout", io.TextIOWrapper(raw, encoding="utf-8"))
+    write_output(iter(["text ", b"\xff", " more"]), dest="pipe")
+    sys.stdout.flush()
+    assert raw.getvalue() == b"text \xff more"
+
+
+def test_write_output_path_copies_bytes(tmp_path):
+    src = tmp_path / "in.bin"
+    src.write_bytes(NON_UTF8)
+    out = tmp_path / "out.bin"
+    write_output(src, dest="file", name=str(out))
+    assert out.read_bytes() == NON_UTF8
+
+
+def test_file_output_is_atomic_on_failure(tmp_path):
+    target = tmp_path / "out.txt"
+    target.write_text("old")
+
+    def broken():
+        yield "new "
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        write_output(broken(), dest="file", name=str(target))
+    assert target.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.txt"]
+
+
+def test_file_output_keeps_mode_and_leaves_no_temp(tmp_path):
+    target = tmp_path / "out.txt"
+    target.write_text("old")
+    target.chmod(0o640)
+    write_output("new", dest="file", name=str(target))
+    assert target.read_text() == "new"
+    assert target.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["out.txt"]
+
+
+def test_file_output_chunks_with_stateful_codec(tmp_path):
+    target = tmp_path / "out.txt"
+    text = "héllo wörld " * 100
+    write_output(text, dest="file", name=str(target), encoding="utf-16", buffer_size=7)
+    assert target.read_text(encoding="utf-16") == text
+
+
+def test_file_output_fsync(tmp_path, mocker):
+    spy = mocker.spy(os, "fsync")
+    write_output("durable", dest="file", name=str(tmp_path / "out.txt"), fsync=True)
+    assert spy.call_count == 2  # the file, then its directory
+
+
+def test_file_output_to_special_file_is_in_place():
+    write_output("discarded", dest="file", name=os.devnull)
+    assert os.path.exists(os.devnull)
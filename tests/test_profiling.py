@@ -0,0 +1,52 @@
+import pstats
+
+from click.testing import CliRunner
+
+from clio.click_utils import command_with_io
+
+
+@command_with_io
+def repeat(text):
+    return text * 1000
+
+
+def test_profile_out_writes_pstats(tmp_path):
+    stats_path = tmp_path / "run.pstats"
+    result = CliRunner().invoke(repeat, ["--profile-out", str(stats_path)], input="ab")
+    assert result.exit_code == 0
+    assert len(result.stdout) == 2000
+    stats = pstats.Stats(str(stats_path)).stats  # pyright:ignore[reportAttributeAccessIssue]
+    functions = {name for _, _, name in stats}
+    assert {"repeat", "get_input", "write_output"} <= functions
+
+
+def test_memprofile_out_reports_each_phase(tmp_path):
+    report_path = tmp_path / "mem.txt"
+    result = CliRunner().invoke(repeat, ["--memprofile-out", str(report_path)], input="x" * 1000)
+    assert result.exit_code == 0
+    report = report_path.read_text()
+    for phase in ("resolve", "read", "call", "write"):
+        assert f"== {phase}: peak " in report
+    # The repeated string is allocated by the wrapped function
+    assert "test_profiling.py" in report
+
+
+def test_profiles_written_when_command_fails(tmp_path):
+    stats_path = tmp_path / "run.pstats"
+    report_path = tmp_path / "mem.txt"
+    result = CliRunner().invoke(
+        repeat,
+        [
+            "--input-source",
+            "file",
+            "--input-name",
+            str(tmp_path / "missing"),
+            "--profile-out",
+            str(stats_path),
+            "--memprofile-out",
+            str(report_path),
+        ],
+    )
+    assert result.exit_code != 0
+    assert stats_path.stat().st_size > 0
+    assert "== read: peak " in report_path.read_text()
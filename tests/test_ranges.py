@@ -0,0 +1,99 @@
+import gzip
+import json
+from itertools import pairwise
+
+import pytest
+from click.testing import CliRunner
+
+from clio.click_utils import command_with_io
+from clio.ranges import open_range, split_ranges
+
+
+@command_with_io
+def upper(data):
+    return bytes(data).upper() if isinstance(data, memoryview) else data.upper()
+
+
+@command_with_io
+def numbered(lines):
+    return (f"{len(line)}:{line}" for line in lines)
+
+
+@command_with_io
+def doubled(records):
+    return [{"n": r["n"] * 2} for r in records]
+
+
+@pytest.fixture
+def big(tmp_path):
+    path = tmp_path / "big.txt"
+    _ = path.write_text("".join(f"line {n} {'x' * (n % 7)}\n" for n in range(500)))
+    return path
+
+
+def test_ranges_are_record_aligned_and_cover_the_file(big):
+    data = big.read_bytes()
+    spans = split_ranges(big, 7)
+    assert len(spans) == 7
+    assert spans[0][0] == 0
+    assert spans[-1][1] == len(data)
+    for (_, end), (start, _) in pairwise(spans):
+        assert end == start
+        assert data[start - 1 : start] == b"\n"
+    assert b"".join(open_range(big, start, end).read() for start, end in spans) == data
+
+
+def test_fewer_ranges_than_requested_when_records_are_long(tmp_path):
+    path = tmp_path / "one.txt"
+    _ = path.write_bytes(b"a" * 1000 + b"\nb\n")
+    assert split_ranges(path, 4) == [(0, 1001), (1001, 1003)]
+    assert split_ranges(path, 4, delimiter=b"\0") == [(0, 1003)]
+
+
+@pytest.mark.parametrize("input_type", ["str", "bytes", "mmap"])
+def test_cli_concatenates_in_order(big, input_type):
+    args = ["--input-source", "file", "--input-name", str(big), "--input-type", input_type]
+    result = CliRunner().invoke(upper, [*args, "--ranges", "5", "--jobs", "2"])
+    assert result.exit_code == 0, result.output
+    assert result.output == big.read_text().upper()
+
+
+def test_cli_concatenates_compressed_file_output(big, tmp_path):
+    out = tmp_path / "out.txt.gz"
+    args = ["--input-source", "file", "--input-name", str(big), "--ranges", "4"]
+    options = ["--output-dest", "file", "--output-name", str(out)]
+    result = CliRunner().invoke(upper, [*args, *options, "--output-compression", "auto"])
+    assert result.exit_code == 0, result.output
+    assert gzip.decompress(out.read_bytes()).decode() == big.read_text().upper()
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_cli_writes_one_shard_per_range(big, tmp_path):
+    template = str(tmp_path / "{stem}.{index}.out")
+    args = ["--input-source", "file", "--input-name", str(big), "--input-type", "lines", "--ranges", "3"]
+    result = CliRunner().invoke(numbered, [*args, "--output-dest", "file", "--output-name", template])
+    assert result.exit_code == 0, result.output
+    shards = [tmp_path / f"big.{i}.out" for i in range(3)]
+    expected = "".join(f"{len(line)}:{line}" for line in big.read_text().splitlines(keepends=True))
+    assert "".join(shard.read_text() for shard in shards) == expected
+
+
+def test_cli_records_per_range(tmp_path):
+    path = tmp_path / "in.ndjson"
+    _ = path.write_text("".join(json.dumps({"n": n}) + "\n" for n in range(100)))
+    args = ["--input-source", "file", "--input-name", str(path), "--records", "ndjson", "--batch-size", "7"]
+    result = CliRunner().invoke(doubled, [*args, "--ranges", "4", "--jobs", "2", "--pool", "thread"])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line)["n"] for line in result.output.splitlines()] == [n * 2 for n in range(100)]
+
+
+def test_cli_rejects_unsplittable_input(big):
+    runner = CliRunner()
+    piped = runner.invoke(upper, ["--ranges", "2"], input="x\n")
+    assert piped.exit_code != 0
+    assert "single uncompressed --input-source file" in piped.output
+
+    args = ["--input-source", "file", "--input-name", str(big), "--ranges", "2"]
+    csv = runner.invoke(doubled, [*args, "--records", "csv"])
+    assert csv.exit_code != 0
+    assert "CSV records" in csv.output
@@ -0,0 +1,192 @@
+import io
+import json
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from clio.click_utils import command_with_io
+from clio.pool import PoolKind
+from clio.records import RecordFormat, dump_records, iter_records, map_records
+
+sizes = []
+
+
+@command_with_io
+def adults(people):
+    sizes.append(len(people))
+    return [{**p, "adult": True} for p in people if p["age"] >= 18]
+
+
+@command_with_io
+def swap(rows):
+    return [row[::-1] for row in rows]
+
+
+@command_with_io
+def squares(numbers):
+    return [int(n) ** 2 for n in numbers]
+
+
+@command_with_io
+def same(records):
+    return records
+
+
+def _records(data, record_format):
+    return list(iter_records(io.BytesIO(data), record_format))
+
+
+def test_parse_every_format():
+    assert _records(b"a\r\nb\n\nc", RecordFormat.LINES) == ["a\r", "b", "", "c"]
+    assert _records(b'{"a": 1}\n\n[2]\n', RecordFormat.NDJSON) == [{"a": 1}, [2]]
+    assert _records(b'x,"y\nz"\n1,2\n', RecordFormat.CSV) == [["x", "y\nz"], ["1", "2"]]
+    assert _records(b"one\0two words\0", RecordFormat.NUL) == ["one", "two words"]
+
+
+def test_iter_records_leaves_the_stream_open():
+    for record_format in RecordFormat:
+        stream = io.BytesIO(b'"a"\n')
+        _ = list(iter_records(stream, record_format))
+        assert not stream.closed
+
+
+def test_cli_keeps_crlf_records():
+    data = b"a\r\nb\r\n"
+    result = CliRunner().invoke(same, ["--records", "lines"], input=data)
+    assert result.exit_code == 0, result.output
+    assert result.stdout_bytes == data
+
+
+def test_nul_records_span_read_blocks(monkeypatch):
+    monkeypatch.setattr("clio.records._BLOCK_SIZE", 3)
+    assert _records(b"alpha\0be\0gamma", RecordFormat.NUL) == ["alpha", "be", "gamma"]
+
+
+@pytest.mark.parametrize(
+    ("record_format", "records"),
+    [
+        (RecordFormat.LINES, ["a", "b c"]),
+        (RecordFormat.NDJSON, [{"k": "é"}, [1, None], "s"]),
+        (RecordFormat.CSV, [["a,b", 'say "hi"'], ["x\ny", ""]]),
+        (RecordFormat.NUL, ["with\nnewline", "x"]),
+    ],
+)
+def test_dump_round_trips(record_format, records):
+    assert _records(dump_records(records, record_format), record_format) == records
+
+
+def test_map_records_batches_and_reports_bad_input():
+    seen = []
+
+    def evens(batch):
+        seen.append(len(batch))
+        return [n for n in batch if n % 2 == 0]
+
+    data = b"".join(f"{n}\n".encode() for n in range(5))
+    assert b"".join(map_records(evens, io.BytesIO(data), RecordFormat.NDJSON, batch_size=2)) == b"0\n2\n4\n"
+    assert seen == [2, 2, 1]
+
+    with pytest.raises(ValueError, match="line 2"):
+        _ = list(map_records(evens, io.BytesIO(b"1\n{\n"), RecordFormat.NDJSON, batch_size=2))
+    with pytest.raises(TypeError, match="iterable of records"):
+        _ = list(map_records(lambda _batch: "x", io.BytesIO(b"1\n"), RecordFormat.LINES))
+
+
+def test_cli_ndjson_in_batches():
+    sizes.clear()
+    people = [{"name": n, "age": a} for n, a in (("ann", 30), ("bo", 9), ("cy", 18))]
+    data = "".join(json.dumps(p) + "\n" for p in people)
+    result = CliRunner().invoke(adults, ["--records", "ndjson", "--batch-size", "2"], input=data)
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line)["name"] for line in result.output.splitlines()] == ["ann", "cy"]
+    assert sizes == [2, 1]
+
+
+def test_cli_csv_from_file(tmp_path):
+    path = tmp_path / "in.csv"
+    _ = path.write_text('a,"b,c"\n1,2\n')
+    args = ["--records", "csv", "--input-source", "file", "--input-name", str(path)]
+    result = CliRunner().invoke(swap, args)
+    assert result.exit_code == 0, result.output
+    assert result.output == '"b,c",a\n2,1\n'
+
+
+def test_cli_rejects_records_with_batch():
+    result = CliRunner().invoke(swap, ["--records", "lines", "--batch"])
+    assert result.exit_code != 0
+    assert "--records needs" in result.output
+
+
+def test_cli_rejects_records_from_signal_daemon():
+    args = ["--records", "lines", "--input-source", "signal", "--on-signal", "USR1"]
+    result = CliRunner().invoke(same, args)
+    assert result.exit_code != 0
+    assert "--records cannot frame signal input" in result.output
+    assert "--input-type" not in result.output
+
+
+def test_cli_rejects_jobs_without_a_parallel_mode():
+    result = CliRunner().invoke(same, ["--jobs", "2"], input="x\n")
+    assert result.exit_code == 2
+    assert "--jobs needs --batch, --records or --ranges" in result.output
+
+
+def test_cli_choices_match_formats():
+    [option] = [p for p in swap.params if p.name == "records"]
+    assert list(option.type.choices) == [f.value for f in RecordFormat]
+
+
+def test_cli_parallel_map_keeps_input_order():
+    data = "".join(f"{n}\n" for n in range(50))
+    args = ["--records", "lines", "--batch-size", "3", "--jobs", "3"]
+    result = CliRunner().invoke(squares, args, input=data)
+    assert result.exit_code == 0, result.output
+    assert result.output == "".join(f"{n * n}\n" for n in range(50))
+
+
+def test_parallel_map_streams_with_a_bounded_window():
+    class Counting(io.RawIOBase):
+        def __init__(self, data):
+            self.data = io.BytesIO(data)
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            return self.data.readinto(buffer)
+
+    data = b"".join(f"{n:099d}\n".encode() for n in range(20_000))
+    raw = Counting(data)
+    options = {"batch_size": 10, "jobs": 2, "pool": PoolKind.THREAD}
+    blocks = map_records(list, io.BufferedReader(raw), RecordFormat.LINES, **options)
+    first = next(blocks)
+    assert first == data[:1000]
+    # Only a few batches per worker have been read ahead of the output
+    assert raw.data.tell() < len(data) // 10
+    blocks.close()
+
+
+def test_parallel_map_unordered_and_failures():
+    def slow_first(batch):
+        if batch[0] == "0":
+            time.sleep(0.2)
+        return batch
+
+    data = b"".join(f"{n}\n".encode() for n in range(8))
+    options = {"batch_size": 2, "jobs": 2, "pool": PoolKind.THREAD}
+    mapped = map_records(slow_first, io.BytesIO(data), RecordFormat.LINES, ordered=False, **options)
+    unordered = b"".join(mapped)
+    assert sorted(unordered.splitlines()) == sorted(data.splitlines())
+    assert not unordered.startswith(b"0\n")
+
+    def fail(batch):
+        if "5" in batch:
+            msg = "bad record"
+            raise ValueError(msg)
+        return batch
+
+    with pytest.raises(ValueError, match="bad record"):
+        _ = list(map_records(fail, io.BytesIO(data), RecordFormat.LINES, **options))
+    with pytest.raises(ValueError, match="module level"):
+        _ = list(map_records(fail, io.BytesIO(data), RecordFormat.LINES, batch_size=2, jobs=2))
@@ -0,0 +1,153 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from clio.server import _bind  # pyright:ignore[reportPrivateUsage]
+
+SERVER_SCRIPT = """
+import os
+import sys
+
+from clio.click_utils import command_with_io
+from clio.server import serve
+
+@command_with_io
+def shout(text):
+    return text.upper()
+
+@command_with_io
+def where(text):
+    return f"{os.getcwd()}|{os.environ.get('GREETING')}|{text}"
+
+def ready():
+    print("ready", file=sys.stderr, flush=True)
+
+serve({"shout": shout, "where": where}, sys.argv[1], on_ready=ready)
+"""
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = tmp_path / "clio.sock"
+    argv = [sys.executable, "-c", SERVER_SCRIPT, str(path)]
+    proc = subprocess.Popen(argv, stderr=subprocess.PIPE, text=True)
+    assert proc.stderr is not None
+    assert proc.stderr.readline() == "ready\n"
+    yield path
+    proc.terminate()
+    assert proc.wait(timeout=1) == 0
+    assert not path.exists()
+
+
+def _client(path, *args, stdin="", **kwargs):
+    return subprocess.run(
+        [sys.executable, "-m", "clio.client", str(path), *args],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        check=False,
+        **kwargs,
+    )
+
+
+def test_roundtrip_matches_direct_run(server):
+    result = _client(server, "shout", stdin="héllo\n")
+    assert (result.returncode, result.stdout, result.stderr) == (0, "HÉLLO\n", "")
+
+
+def test_forwards_argv_env_and_cwd(server, tmp_path):
+    env = {**os.environ, "GREETING": "hi"}
+    # sys.argv[2] of a direct `where --input-source arg --input-name 2` run is "arg"
+    args = ["where", "--input-source", "arg", "--input-name", "2"]
+    result = _client(server, *args, env=env, cwd=tmp_path)
+    assert result.stdout == f"{tmp_path}|hi|arg"
+
+
+def test_exit_codes_and_errors(server, tmp_path):
+    usage = _client(server, "shout", "--bogus")
+    assert usage.returncode == 2
+    assert "No such option" in usage.stderr
+
+    failed = _client(server, "shout", "--input-source", "file", "--input-name", str(tmp_path / "missing"))
+    assert failed.returncode == 1
+    assert failed.stderr.startswith("Error:")
+
+    unknown = _client(server, "nope")
+    assert unknown.returncode == 2
+    assert "serving: shout, where" in unknown.stderr
+
+
+def test_file_output_is_written_by_the_worker(server, tmp_path):
+    out = tmp_path / "out.txt"
+    result = _client(server, "shout", "--output-dest", "file", "--output-name", str(out), stdin="x")
+    assert result.returncode == 0
+    assert out.read_text() == "X"
+
+
+def test_stale_socket_is_replaced_but_live_one_is_not(tmp_path, server):
+    with pytest.raises(RuntimeError, match="already listening"):
+        _ = _bind(server)
+
+    stale = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX) as dead:
+        dead.bind(str(stale))
+    listener = _bind(stale)
+    listener.close()
+    assert stale.stat().st_mode & 0o777 == 0o600
+
+
+def test_silent_client_does_not_block_others(server):
+    with socket.socket(socket.AF_UNIX) as silent:
+        silent.connect(str(server))
+        result = _client(server, "shout", stdin="x", timeout=3)
+        assert result.stdout == "X"
+
+
+def test_client_without_server(tmp_path):
+    result = _client(tmp_path / "absent.sock", "shout")
+    assert result.returncode == 1
+    assert "cannot reach clio server" in result.stderr
+
+
+def test_signals_are_relayed_to_the_worker(server):
+    env = {**os.environ, "GREETING": "hi"}
+    args = ["shout", "--on-signal", "SIGUSR1", "--input-source", "env", "--input-name", "GREETING"]
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "clio.client", str(server), *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        text=True,
+    )
+    assert proc.stdout is not None
+    assert proc.stderr is not None
+    try:
+        assert proc.stderr.readline().startswith("Waiting for SIGUSR1")
+        proc.send_signal(signal.SIGUSR1)
+        assert proc.stdout.read(2) == "HI"
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=1) == 0
+    finally:
+        proc.kill()
+
+
+def test_worker_killed_by_signal_exits_128_plus_n(server):
+    args = ["shout", "--on-signal", "SIGUSR1", "--input-source", "arg", "--input-name", "1"]
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "clio.client", str(server), *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert proc.stderr is not None
+    try:
+        assert proc.stderr.readline().startswith("Waiting for SIGUSR1")
+        # SIGQUIT is relayed to the worker, whose default action is to die from it
+        proc.send_signal(signal.SIGQUIT)
+        assert proc.wait(timeout=5) == 128 + signal.SIGQUIT
+    finally:
+        proc.kill()
@@ -1,9 +1,14 @@
 import os
 import signal
+import subprocess
+import sys
 import threading
 import time
+from pathlib import Path
 
-from clio.signal import wait_for_signal
+import pytest
+
+from clio.signal import iter_signals, parse_signal, wait_for_signal
 
 
 def test_wait_for_signal():
@@ -17,3 +22,110 @@ def test_wait_for_signal():
     result = wait_for_signal(signal.SIGUSR1)
     assert result == "SIGUSR1"
     t.join()
+
+
+def test_wait_for_signal_restores_handler():
+    previous = signal.getsignal(signal.SIGUSR2)
+    threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGUSR2)).start()
+    assert wait_for_signal(signal.SIGUSR2) == "SIGUSR2"
+    assert signal.getsignal(signal.SIGUSR2) == previous
+
+
+def test_parse_signal():
+    assert parse_signal("SIGUSR1") is signal.SIGUSR1
+    assert parse_signal("hup") is signal.SIGHUP
+    assert parse_signal(str(int(signal.SIGUSR2))) is signal.SIGUSR2
+    with pytest.raises(ValueError, match="Unknown signal: NOPE"):
+        parse_signal("NOPE")
+
+
+def test_iter_signals_coalesces_while_busy():
+    signals = iter_signals([signal.SIGUSR1, signal.SIGUSR2], stop_on=())
+    threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGUSR1)).start()
+    assert next(signals) == "SIGUSR1"
+
+    # Delivered while the consumer is "running": three USR1 collapse into one
+    for signum in (signal.SIGUSR1, signal.SIGUSR1, signal.SIGUSR2, signal.SIGUSR1):
+        os.kill(os.getpid(), signum)
+    assert next(signals) == "SIGUSR1"
+    assert next(signals) == "SIGUSR2"
+    signals.close()
+    assert signal.getsignal(signal.SIGUSR1) is signal.SIG_DFL
+
+
+DAEMON_SCRIPT = """
+from clio.click_utils import command_with_io
+
+runs = []
+
+@command_with_io
+def trigger(name):
+    runs.append(name)
+    return f"{len(runs)} {name}\\n"
+
+trigger()
+"""
+
+
+def test_daemon_reruns_per_signal():
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            DAEMON_SCRIPT,
+            "--input-source",
+            "signal",
+            "--on-signal",
+            "USR1",
+            "--on-signal",
+            "HUP",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert "Waiting for SIGUSR1, SIGHUP" in proc.stderr.readline()
+        proc.send_signal(signal.SIGUSR1)
+        assert proc.stdout.readline() == "1 SIGUSR1\n"
+        proc.send_signal(signal.SIGHUP)
+        assert proc.stdout.readline() == "2 SIGHUP\n"
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=5) == 0
+    finally:
+        proc.kill()
+
+
+PATH_DAEMON_SCRIPT = """
+from clio.click_utils import command_with_io
+
+@command_with_io
+def where(path):
+    return f"{path}\\n"
+
+where()
+"""
+
+
+def test_daemon_releases_spilled_input_per_run():
+    args = ["--input-source", "pipe", "--input-type", "path", "--on-signal", "USR1"]
+    proc = subprocess.Popen(
+        [sys.executable, "-c", PATH_DAEMON_SCRIPT, *args],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert "Waiting for SIGUSR1" in proc.stderr.readline()
+        proc.send_signal(signal.SIGUSR1)
+        first = proc.stdout.readline().strip()
+        proc.send_signal(signal.SIGUSR1)
+        second = proc.stdout.readline().strip()
+        assert first
+        assert second
+        assert not Path(first).exists()
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=5) == 0
+    finally:
+        proc.kill()
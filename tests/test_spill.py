@@ -0,0 +1,78 @@
+import io
+import os
+from pathlib import Path
+
+from clio.spill import SpillStore, current_store, spill_scope
+from clio.utils import persist_to_tempfile
+
+
+def test_small_payloads_stay_in_memory():
+    with SpillStore(spool_limit=16) as store:
+        assert isinstance(store.stream(b"tiny"), io.BytesIO)
+        big = store.stream(b"x" * 32)
+        assert not isinstance(big, io.BytesIO)
+        assert big.read() == b"x" * 32
+
+
+def test_file_has_descriptor_and_is_closed_on_release():
+    store = SpillStore()
+    f = store.file(b"payload")
+    assert os.fstat(f.fileno()).st_size == 7
+    assert f.read() == b"payload"
+    store.release()
+    assert f.closed
+
+
+def test_closed_files_are_dropped():
+    store = SpillStore()
+    for _ in range(3):
+        store.file(b"mapped").close()
+    kept = store.overflow(b"head", io.BytesIO(b"rest"))
+    assert store._files == [kept]
+    store.release()
+    assert kept.closed
+
+
+def test_path_prefers_ram_and_is_removed_on_release():
+    store = SpillStore()
+    path = store.path("héllo", suffix=".txt")
+    assert path.read_text(encoding="utf-8") == "héllo"
+    if Path("/dev/shm").is_dir():
+        assert path.parent == Path("/dev/shm").resolve()
+    store.release()
+    assert not path.exists()
+
+
+def test_above_ram_limit_goes_to_disk():
+    with SpillStore(ram_limit=4) as store:
+        path = store.path(b"too big for ram")
+        assert not str(path).startswith("/dev/shm")
+        assert path.read_bytes() == b"too big for ram"
+
+
+def test_stream_above_ram_limit_moves_to_disk():
+    payload = b"0123456789" * 20_000
+    with SpillStore(ram_limit=1000) as store:
+        path = store.path(io.BytesIO(payload))
+        assert not str(path).startswith("/dev/shm")
+        assert path.read_bytes() == payload
+        f = store.file(io.BytesIO(payload))
+        if Path("/proc/self/fd").is_dir():
+            assert not os.readlink(f"/proc/self/fd/{f.fileno()}").startswith(("/memfd:", "/dev/shm"))
+        assert f.read() == payload
+        assert store.file(io.BytesIO(b"small")).read() == b"small"
+    assert not path.exists()
+
+
+def test_scope_releases_only_its_own_spills():
+    outer = persist_to_tempfile("outer")
+    with spill_scope() as store:
+        assert current_store() is store
+        inner = persist_to_tempfile("inner")
+    assert not inner.exists()
+    assert outer.exists()
+    assert current_store() is not store
+
+
+def test_process_store_is_shared():
+    assert current_store() is current_store()
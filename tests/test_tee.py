@@ -0,0 +1,96 @@
+import gzip
+import threading
+
+import pytest
+from click.testing import CliRunner
+
+import clio.tee
+from clio.click_utils import command_with_io
+from clio.compression import Compression
+from clio.output import OutputDest
+from clio.tee import write_outputs
+
+
+@command_with_io
+def shout(lines):
+    for line in lines:
+        yield line.upper()
+
+
+def test_one_pass_to_pipe_and_files(tmp_path, capfdbinary):
+    produced = []
+
+    def result():
+        for i in range(3):
+            produced.append(i)
+            yield f"line {i}\n"
+
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt.gz"
+    targets = [(OutputDest.PIPE, None), (OutputDest.FILE, str(a)), (OutputDest.FILE, str(b))]
+    write_outputs(result(), targets, compression=Compression.AUTO)
+    assert produced == [0, 1, 2]
+    expected = "line 0\nline 1\nline 2\n"
+    assert capfdbinary.readouterr().out == expected.encode()
+    assert a.read_text() == expected
+    # Each sink infers its own compression from its name
+    assert gzip.decompress(b.read_bytes()).decode() == expected
+
+
+def test_slow_sink_does_not_stall_the_others_within_its_buffer(monkeypatch):
+    fast_done = threading.Event()
+    received = {}
+
+    def fake_write(data, dest, name, **_options):
+        if name == "slow":
+            assert fast_done.wait(timeout=1)
+        received[name] = b"".join(bytes(piece) for piece in data)
+        if name == "fast":
+            fast_done.set()
+
+    monkeypatch.setattr(clio.tee, "write_output", fake_write)
+    data = b"x" * 10_000
+    targets = [(OutputDest.FILE, "slow"), (OutputDest.FILE, "fast")]
+    write_outputs(data, targets, max_buffered=len(data), buffer_size=100)
+    assert received == {"slow": data, "fast": data}
+
+
+def test_failing_result_commits_no_file(tmp_path):
+    def result():
+        yield "partial\n"
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    with pytest.raises(RuntimeError, match="boom"):
+        write_outputs(result(), [(OutputDest.FILE, str(a)), (OutputDest.FILE, str(b))])
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failing_sink_is_reported_after_the_others_finish(tmp_path):
+    out = tmp_path / "out.txt"
+    with pytest.raises(ValueError, match="env var"):
+        write_outputs("data", [(OutputDest.ENV, None), (OutputDest.FILE, str(out))])
+    assert out.read_text() == "data"
+
+
+def test_cli_pairs_names_with_destinations(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    runner = CliRunner()
+    args = ["--output-dest", "pipe", "--output-dest", "file", "--output-dest", "file"]
+    result = runner.invoke(shout, [*args, "--output-name", str(a), "--output-name", str(b)], input="hi\n")
+    assert result.exit_code == 0, result.output
+    assert result.output == "HI\n"
+    assert a.read_text() == b.read_text() == "HI\n"
+
+    # Existing files still need --force, and nothing is read before that check
+    refused = runner.invoke(shout, [*args, "--output-name", str(a), "--output-name", str(b)], input="x\n")
+    assert refused.exit_code != 0
+    assert a.read_text() == "HI\n"
+
+    mismatched = runner.invoke(shout, [*args, "--output-name", str(a)], input="x\n")
+    assert mismatched.exit_code != 0
+    assert "one --output-name per" in mismatched.output
+
+    batch = runner.invoke(shout, ["--batch", *args, "--output-name", str(a), "--output-name", str(b)])
+    assert batch.exit_code != 0
+    assert "Several --output-dest" in batch.output
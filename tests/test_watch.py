@@ -0,0 +1,153 @@
+import gzip
+import io
+import signal
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+from clio.click_utils import command_with_io
+from clio.compression import Compression
+from clio.input import TypeName
+from clio.output import OutputDest
+from clio.watch import FileTail, append_output, as_input
+
+
+@command_with_io
+def upper(data):
+    return data.upper()
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "app.log"
+    _ = path.write_text("one\n")
+    return path
+
+
+def _append(path, text):
+    with path.open("a") as f:
+        _ = f.write(text)
+
+
+def test_tail_waits_for_complete_lines(log):
+    tail = FileTail(log)
+    assert tail.read_available() == b"one\n"
+    assert tail.read_available() == b""
+    _append(log, "two\nthr")
+    assert tail.read_available() == b"two\n"
+    _append(log, "ee\n")
+    assert tail.read_available() == b"three\n"
+
+
+def test_large_backlog_is_cut_at_newlines(log, monkeypatch):
+    monkeypatch.setattr("clio.watch.MAX_BLOCK", 10)
+    _ = log.write_bytes(b"aaa\nbbb\nccc\n\xe2\x82\xac\xe2\x82\xac\n" + b"x" * 12)
+    tail = FileTail(log)
+    blocks = [tail.read_available() for _ in range(5)]
+    assert blocks == [b"aaa\nbbb\n", b"ccc\n", "€€\n".encode(), b"x" * 10, b""]
+    assert as_input(blocks[2], TypeName.STR) == "€€\n"
+
+
+def test_tail_follows_truncation_and_rotation(log):
+    tail = FileTail(log)
+    assert tail.read_available() == b"one\n"
+    _ = log.write_text("1\n")
+    assert tail.read_available() == b"1\n"
+
+    _append(log, "last")
+    _ = log.rename(log.with_suffix(".1"))
+    _ = log.write_text("fresh\n")
+    # The rest of the old file comes first, even without a final newline
+    assert tail.read_available() == b"last"
+    assert tail.read_available() == b"fresh\n"
+
+
+def test_checkpoint_resumes_on_the_same_file(log, tmp_path):
+    state = tmp_path / "state.json"
+    tail = FileTail(log, checkpoint=state)
+    assert tail.read_available() == b"one\n"
+    tail.commit()
+    _append(log, "two\n")
+    assert FileTail(log, checkpoint=state).read_available() == b"two\n"
+
+    # A different file under the same name is read from the start
+    _ = log.unlink()
+    _ = log.write_text("other\n")
+    assert FileTail(log, checkpoint=state).read_available() == b"other\n"
+
+
+def test_as_input_types():
+    assert as_input(b"a\nb\n", TypeName.STR) == "a\nb\n"
+    assert list(as_input(b"a\nb\n", TypeName.LINES)) == ["a\n", "b\n"]
+    assert as_input(b"x", TypeName.BUFFEREDIO).read() == b"x"
+    assert isinstance(as_input(b"", TypeName.TEXTIO), io.TextIOWrapper)
+    with pytest.raises(ValueError, match="not available in watch mode"):
+        _ = as_input(b"x", TypeName.PATH)
+
+
+def test_append_output_keeps_existing_content(tmp_path):
+    path = tmp_path / "out.txt.gz"
+    for text in ("a\n", "b\n"):
+        append_output(text, [(OutputDest.FILE, str(path))], {"compression": Compression.AUTO})
+    assert gzip.decompress(path.read_bytes()) == b"a\nb\n"
+
+    with pytest.raises(ValueError, match="file or pipe"):
+        append_output("x", [(OutputDest.CLIPBOARD, "-")], {})
+
+
+def test_cli_rejects_unwatchable_input(log):
+    runner = CliRunner()
+    piped = runner.invoke(upper, ["--watch"], input="x\n")
+    assert piped.exit_code != 0
+    assert "single uncompressed --input-source file" in piped.output
+
+    args = ["--input-source", "file", "--input-name", str(log), "--watch"]
+    mapped = runner.invoke(upper, [*args, "--input-type", "mmap"])
+    assert mapped.exit_code != 0
+    assert "--input-type mmap" in mapped.output
+
+
+WATCH_SCRIPT = """
+from clio.click_utils import command_with_io
+
+@command_with_io
+def upper(data):
+    return data.upper()
+
+upper()
+"""
+
+
+def _watch(log, state):
+    args = ["--input-source", "file", "--input-name", str(log), "--watch", "--watch-checkpoint", str(state)]
+    return subprocess.Popen(
+        [sys.executable, "-c", WATCH_SCRIPT, *args, "--watch-interval", "0.05"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+def test_watch_appends_and_resumes_after_restart(log, tmp_path):
+    state = tmp_path / "state.json"
+    proc = _watch(log, state)
+    try:
+        assert "Watching" in proc.stderr.readline()
+        assert proc.stdout.readline() == "ONE\n"
+        _append(log, "two\n")
+        assert proc.stdout.readline() == "TWO\n"
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=5) == 0
+    finally:
+        proc.kill()
+
+    _append(log, "three\n")
+    proc = _watch(log, state)
+    try:
+        assert proc.stdout.readline() == "THREE\n"
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=5) == 0
+    finally:
+        proc.kill()